@@ -0,0 +1,165 @@
+# alignment.py
+# Speaker alignment between Whisper text segments and diarization turns
+# This module contains:
+# 1. A sweep-line matcher that assigns a speaker to any list of timed intervals.
+# 2. Segment-level alignment (one speaker per Whisper segment).
+# 3. Word-level alignment that splits a segment when the speaker changes mid-sentence.
+#
+# The result is a Transcript (utils/transcript.py) that keeps each turn's times.
+
+import heapq
+from utils.logger import get_logger
+from utils.transcript import Transcript
+
+logger = get_logger("Alignment")
+
+UNKNOWN_SPEAKER = "Unknown Speaker"
+
+
+def assign_speakers(intervals, speaker_segments):
+    """
+    Finds the best-overlapping speaker for every (start, end) interval.
+
+    Both lists are sorted once and walked together, so the cost is
+    O((n + m) log m) plus the number of genuinely overlapping pairs,
+    instead of comparing every interval with every speaker turn.
+
+    Args:
+        intervals (list): (start, end) tuples, in any order.
+        speaker_segments (list): Dicts with 'start', 'end' and 'speaker' keys.
+
+    Returns:
+        list: One speaker label per interval, in the input order.
+    """
+    speakers = [UNKNOWN_SPEAKER] * len(intervals)
+    if not intervals or not speaker_segments:
+        return speakers
+
+    # Keep the original index so ties resolve exactly like the old nested loop
+    # (the earliest speaker turn in the input wins).
+    turns = sorted(
+        (ps['start'], ps['end'], idx, ps['speaker'])
+        for idx, ps in enumerate(speaker_segments)
+    )
+    order = sorted(range(len(intervals)), key=lambda i: intervals[i][0])
+
+    active = []  # min-heap of (end, idx, start, speaker) for turns already started
+    next_turn = 0
+    for i in order:
+        i_start, i_end = intervals[i]
+
+        # Admit every turn that starts before this interval ends
+        while next_turn < len(turns) and turns[next_turn][0] < i_end:
+            t_start, t_end, t_idx, t_speaker = turns[next_turn]
+            heapq.heappush(active, (t_end, t_idx, t_start, t_speaker))
+            next_turn += 1
+
+        # Drop turns that finished before this interval started; later
+        # intervals start even later, so they can never overlap again.
+        while active and active[0][0] <= i_start:
+            heapq.heappop(active)
+
+        best_overlap = 0
+        best_idx = None
+        for t_end, t_idx, t_start, t_speaker in active:
+            overlap = min(i_end, t_end) - max(i_start, t_start)
+            if overlap <= 0:
+                continue
+            if overlap > best_overlap or (overlap == best_overlap and t_idx < best_idx):
+                best_overlap = overlap
+                best_idx = t_idx
+                speakers[i] = t_speaker
+
+    return speakers
+
+
+def _bucket_words(whisper_segments, words):
+    """
+    Distributes top-level word timestamps onto the Whisper segments they belong to.
+    Words are matched by their midpoint so boundary words land in a single segment.
+    """
+    buckets = [[] for _ in whisper_segments]
+    if not words:
+        return buckets
+
+    seg_order = sorted(range(len(whisper_segments)), key=lambda i: whisper_segments[i].get('start', 0))
+    sorted_words = sorted(words, key=lambda w: w.get('start', 0))
+
+    pos = 0
+    for word in sorted_words:
+        mid = (word.get('start', 0) + word.get('end', 0)) / 2
+        # Advance to the first segment that has not ended before this word
+        while pos < len(seg_order) - 1 and whisper_segments[seg_order[pos]].get('end', 0) < mid:
+            pos += 1
+        buckets[seg_order[pos]].append(word)
+    return buckets
+
+
+def _split_by_words(segment_words, segment_speakers):
+    """
+    Groups consecutive words spoken by the same speaker into (speaker, start, end, text) pieces.
+    """
+    pieces = []
+    for word, speaker in zip(segment_words, segment_speakers):
+        text = word.get('word', word.get('text', "")).strip()
+        if not text:
+            continue
+        if pieces and pieces[-1][0] == speaker:
+            pieces[-1][2] = word.get('end', pieces[-1][2])
+            pieces[-1][3].append(text)
+        else:
+            pieces.append([speaker, word.get('start', 0), word.get('end', 0), [text]])
+    return [(speaker, start, end, " ".join(tokens)) for speaker, start, end, tokens in pieces]
+
+
+def align_segments(whisper_segments, pyannote_segments, words=None):
+    """
+    Aligns Whisper text segments with Pyannote speaker labels based on timestamps.
+
+    When word timestamps are available (either as a 'words' list on each
+    segment or as the top-level 'words' list of a verbose_json response),
+    a segment that spans a speaker change is split between the speakers.
+
+    Args:
+        whisper_segments (list): Whisper segments with 'start', 'end' and 'text'.
+        pyannote_segments (list): Speaker turns with 'start', 'end' and 'speaker'.
+        words (list, optional): Word timestamps with 'word', 'start' and 'end'.
+
+    Returns:
+        Transcript: One turn per segment, or per speaker piece of a split segment.
+    """
+    logger.info("Aligning Whisper transcription with Pyannote diarization...")
+
+    segment_speakers = assign_speakers(
+        [(ws.get('start', 0), ws.get('end', 0)) for ws in whisper_segments],
+        pyannote_segments
+    )
+
+    # Word-level pass: collect every word once so all of them are matched in a single sweep
+    if words:
+        segment_words = _bucket_words(whisper_segments, words)
+    else:
+        segment_words = [ws.get('words') or [] for ws in whisper_segments]
+
+    flat_words = [w for seg in segment_words for w in seg]
+    word_speakers = assign_speakers(
+        [(w.get('start', 0), w.get('end', 0)) for w in flat_words],
+        pyannote_segments
+    ) if flat_words else []
+
+    aligned_transcript = Transcript()
+    cursor = 0
+    for ws, best_speaker, seg_words in zip(whisper_segments, segment_speakers, segment_words):
+        w_text = ws.get('text', "").strip()
+        seg_word_speakers = word_speakers[cursor:cursor + len(seg_words)]
+        cursor += len(seg_words)
+
+        # Keep Whisper's punctuated segment text unless the speaker really changes inside it
+        pieces = _split_by_words(seg_words, seg_word_speakers) if seg_words else []
+        if len(pieces) > 1:
+            for speaker, start, end, text in pieces:
+                aligned_transcript.append(speaker, text, start, end)
+        else:
+            aligned_transcript.append(best_speaker, w_text, ws.get('start', 0), ws.get('end', 0))
+
+    return aligned_transcript
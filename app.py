@@ -1,17 +1,46 @@
 import gradio as gr
 import os
-from logic import process_meeting, send_email
+import threading
+from utils.env import load_env
+
+# .env must be loaded before the modules below read their configuration
+load_env()
+
+from backend_router import ROUTER_HEDGING
+from logic import process_meeting, send_email, get_email_status, stream_live_audio, stop_live_meeting, \
+    search_meetings, SEARCH_PERIODS
+
+
+def _stream_live_audio(chunk, live_id, session_id):
+    # None means "unchanged": a late chunk must not overwrite the final report being streamed
+    transcript, summary, live_id, session_id = stream_live_audio(chunk, live_id, session_id)
+    return (gr.skip() if transcript is None else transcript, gr.skip() if summary is None else summary,
+            live_id, session_id)
 
 
 # Build Gradio UI
 with gr.Blocks(title="AI Meeting Assistant") as demo:
+    # Per-browser-session id; jobs and reports are looked up through it
+    session_state = gr.State(None)
+    # Id of the live meeting currently being recorded, if any
+    live_state = gr.State(None)
     gr.Markdown("# 🎧 AI Meeting Assistant")
     gr.Markdown("Upload your meeting audio to get an automated transcript, professional summary, and downloadable PDF report.")
     
     with gr.Row():
         with gr.Column(scale=1):
             audio_input = gr.Audio(sources=["upload", "microphone"], type="filepath", label="Upload Meeting Audio")
+            latency_critical = gr.Checkbox(
+                value=ROUTER_HEDGING,
+                label="⚡ Latency-critical",
+                info="Run the local flow and Deepgram in parallel and use whichever finishes first (uses more API budget)"
+            )
             process_btn = gr.Button("Transcribe & Summarize", variant="primary")
+            
+            # Live mode: transcript and rolling summary update while the meeting is recorded
+            gr.Markdown("### 🎙️ Live Meeting")
+            live_audio = gr.Audio(sources=["microphone"], type="numpy", streaming=True, label="Record Live")
+            
             pdf_output = gr.File(label="Download PDF Report")
             
             # Email sending section
@@ -19,10 +48,12 @@ with gr.Blocks(title="AI Meeting Assistant") as demo:
             gr.Markdown("### 📧 Email Report (Optional)")
             email_input = gr.Textbox(
                 label="Recipient Email", 
-                placeholder="example@email.com",
-                info="Enter email to send the report"
+                placeholder="example@email.com, colleague@email.com",
+                info="Enter one or more emails (comma-separated) to send the report"
             )
-            send_email_btn = gr.Button("Send Email", variant="secondary")
+            with gr.Row():
+                send_email_btn = gr.Button("Send Email", variant="secondary")
+                email_status_btn = gr.Button("Check Email Status", variant="secondary")
             email_status = gr.Markdown(label="Email Status")
             
         with gr.Column(scale=2):
@@ -31,25 +62,82 @@ with gr.Blocks(title="AI Meeting Assistant") as demo:
                     summary_output = gr.Markdown(label="Meeting Summary")
                 with gr.TabItem("Full Transcript"):
                     transcript_output = gr.Textbox(label="Transcript", lines=15, interactive=False)
+                with gr.TabItem("🔎 Search Meetings"):
+                    # Every processed meeting is indexed locally (transcript turns and summary)
+                    with gr.Row():
+                        search_query = gr.Textbox(label="Search", placeholder="which meeting decided the billing migration?",
+                                                  scale=3)
+                        search_speaker = gr.Textbox(label="Speaker", placeholder="Speaker 1", scale=1)
+                        search_period = gr.Dropdown(choices=list(SEARCH_PERIODS), value="Any time", label="When", scale=1)
+                    search_btn = gr.Button("Search", variant="secondary")
+                    search_results = gr.Markdown()
 
     # Event binding
+    # Handlers only wait on background jobs, so many sessions can be served at once;
+    # the actual processing concurrency is bounded by JOB_WORKERS.
     process_btn.click(
         fn=process_meeting,
-        inputs=[audio_input],
-        outputs=[transcript_output, summary_output, pdf_output, email_status]
+        inputs=[audio_input, session_state, latency_critical],
+        outputs=[transcript_output, summary_output, pdf_output, email_status, session_state],
+        concurrency_limit=int(os.getenv("UI_CONCURRENCY", 32))
+    )
+    
+    # Microphone chunks are transcribed as they arrive; the handler only enqueues work,
+    # so it is not limited to one call at a time across users
+    live_audio.stream(
+        fn=_stream_live_audio,
+        inputs=[live_audio, live_state, session_state],
+        outputs=[transcript_output, summary_output, live_state, session_state],
+        stream_every=float(os.getenv("LIVE_STREAM_EVERY", 0.5)),
+        time_limit=None,
+        concurrency_limit=None,
+        show_progress="hidden"
     )
     
+    live_audio.stop_recording(
+        fn=stop_live_meeting,
+        inputs=[live_state, session_state],
+        outputs=[transcript_output, summary_output, pdf_output, email_status, live_state, session_state],
+        concurrency_limit=int(os.getenv("UI_CONCURRENCY", 32))
+    )
+    
+    # Emails are queued in the background outbox; the status button reports delivery
     send_email_btn.click(
         fn=send_email,
-        inputs=[email_input],
+        inputs=[email_input, session_state],
+        outputs=[email_status]
+    )
+    
+    email_status_btn.click(
+        fn=get_email_status,
+        inputs=[session_state],
         outputs=[email_status]
     )
     
+    # Searches only read the local index, so they run without a concurrency limit
+    for trigger in (search_btn.click, search_query.submit):
+        trigger(
+            fn=search_meetings,
+            inputs=[search_query, search_speaker, search_period],
+            outputs=[search_results],
+            concurrency_limit=None
+        )
+    
     gr.Markdown("---")
     gr.Markdown("*Powered by Groq (Whisper-v3 & LLaMA-3.3)*")
 
 if __name__ == "__main__":
 
+    # Optionally warm the Pyannote pipeline so the first meeting doesn't pay the model load time.
+    # It loads in the background so the port is bound (and health checks pass) right away.
+    if os.getenv("PRELOAD_DIARIZATION", "false").lower() in ("1", "true", "yes"):
+        from diarization import preload_pipeline
+        threading.Thread(target=preload_pipeline, name="preload-diarization", daemon=True).start()
+
+    # Prometheus scrape endpoint on its own port (METRICS_PORT=0 disables it)
+    from utils.telemetry import start_metrics_server
+    start_metrics_server()
+
     # ⚠️ Always use server_name="0.0.0.0" on HF Spaces so the external health check can reach the app!
     demo.launch(
         server_name="0.0.0.0",
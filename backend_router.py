@@ -0,0 +1,429 @@
+# backend_router.py
+# Health-aware routing between speech-to-text backends
+# This module contains:
+# 1. The BackendStrategy interface every transcription backend implements.
+# 2. Per-backend health tracking: success rate, EWMA latency per audio minute
+#    and a circuit breaker that trips after repeated failures.
+# 3. A BackendRouter that sends each job to the healthy backend expected to be fastest.
+# 4. Optional hedging for latency-critical jobs: the two best backends race and the first
+#    valid transcript wins.
+
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from utils.logger import get_logger
+from utils.telemetry import span, propagate, increment
+
+logger = get_logger("BackendRouter")
+
+# Weight of the newest observation in the moving averages
+ROUTER_EWMA_ALPHA = float(os.getenv("ROUTER_EWMA_ALPHA", 0.3))
+# Consecutive failures that open a backend's circuit breaker
+ROUTER_BREAKER_FAILURES = int(os.getenv("ROUTER_BREAKER_FAILURES", 3))
+# Seconds an open breaker waits before letting a single trial request through
+ROUTER_BREAKER_COOLDOWN = float(os.getenv("ROUTER_BREAKER_COOLDOWN", 120))
+# Number of recent routing decisions kept for inspection
+ROUTER_DECISION_HISTORY = int(os.getenv("ROUTER_DECISION_HISTORY", 50))
+# Hedge every job by default (jobs can also opt in individually)
+ROUTER_HEDGING = os.getenv("ROUTER_HEDGING", "false").lower() in ("1", "true", "yes")
+# Seconds the preferred backend runs alone before the second one is launched (0 = race right away)
+ROUTER_HEDGE_DELAY = float(os.getenv("ROUTER_HEDGE_DELAY", 0))
+# Threads running hedged backend calls, shared by all jobs
+ROUTER_HEDGE_WORKERS = int(os.getenv("ROUTER_HEDGE_WORKERS", 8))
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+class BackendStrategy:
+    """
+    A pluggable transcription backend.
+
+    Subclasses set `name` and `priority` (lower is preferred while there is no
+    latency data yet) and implement `is_available()` and `transcribe()`.
+    """
+    name = "backend"
+    priority = 100
+
+    def is_available(self):
+        """
+        Returns True if the backend can be used at all (dependencies and credentials present).
+        Implementations should cache the answer; it is asked on every job.
+        """
+        return True
+
+    def transcribe(self, file_path, offsets=None, waveform=None):
+        """
+        Returns a speaker-labeled Transcript (utils/transcript.py), or None on failure.
+        Exceptions are treated as failures by the router.
+
+        `offsets` (an OffsetMap, or None) maps times in file_path back to the
+        original recording when the audio was trimmed before upload. `waveform`
+        (16 kHz mono int16 samples of file_path, or None) lets local models skip decoding.
+        """
+        raise NotImplementedError
+
+
+class BackendHealth:
+    """
+    Rolling health statistics and circuit breaker for one backend.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.successes = 0
+        self.failures = 0
+        self.success_ewma = None          # EWMA of 1.0 (success) / 0.0 (failure)
+        self.latency_per_minute = None    # EWMA of seconds spent per minute of audio
+        self.consecutive_failures = 0
+        self.state = CLOSED
+        self.opened_at = None
+        self.trial_in_flight = False
+
+    def _ewma(self, current, value):
+        return value if current is None else ROUTER_EWMA_ALPHA * value + (1 - ROUTER_EWMA_ALPHA) * current
+
+    def allows_request(self, now):
+        """
+        Returns True if the breaker lets a request through right now.
+        An open breaker moves to half-open after the cooldown and admits one trial:
+        the caller holds it until the outcome is recorded or it is given back with
+        release_trial(). Callers hold the router lock.
+        """
+        if self.state == CLOSED:
+            return True
+        if self.state == OPEN and now - self.opened_at >= ROUTER_BREAKER_COOLDOWN:
+            self.state = HALF_OPEN
+        if self.state == HALF_OPEN and not self.trial_in_flight:
+            self.trial_in_flight = True
+            return True
+        return False
+
+    def release_trial(self):
+        # The admitted trial was not run after all (an earlier backend succeeded)
+        self.trial_in_flight = False
+
+    def record_success(self, elapsed, audio_minutes):
+        self.successes += 1
+        self.success_ewma = self._ewma(self.success_ewma, 1.0)
+        if audio_minutes > 0:
+            self.latency_per_minute = self._ewma(self.latency_per_minute, elapsed / audio_minutes)
+        self.consecutive_failures = 0
+        self.trial_in_flight = False
+        if self.state != CLOSED:
+            logger.info(f"🟢 Circuit for '{self.name}' closed after a successful trial")
+        self.state = CLOSED
+        self.opened_at = None
+
+    def record_failure(self, now):
+        self.failures += 1
+        self.success_ewma = self._ewma(self.success_ewma, 0.0)
+        self.consecutive_failures += 1
+        self.trial_in_flight = False
+        if self.state == HALF_OPEN or self.consecutive_failures >= ROUTER_BREAKER_FAILURES:
+            if self.state != OPEN:
+                logger.warning(f"🔴 Circuit for '{self.name}' opened after "
+                               f"{self.consecutive_failures} consecutive failures")
+            self.state = OPEN
+            self.opened_at = now
+
+    def expected_latency(self, audio_minutes):
+        if self.latency_per_minute is None:
+            return None
+        return self.latency_per_minute * max(audio_minutes, 0.0)
+
+    def to_dict(self):
+        return {
+            "state": self.state,
+            "successes": self.successes,
+            "failures": self.failures,
+            "success_rate": round(self.success_ewma, 3) if self.success_ewma is not None else None,
+            "latency_per_audio_minute": round(self.latency_per_minute, 3) if self.latency_per_minute is not None else None,
+            "consecutive_failures": self.consecutive_failures,
+            "opened_at": self.opened_at,
+        }
+
+
+def _when_done(futures, callback):
+    """
+    Calls `callback` once every future is done (cancelled ones included), or right away.
+    """
+    remaining = [len(futures)]
+    lock = threading.Lock()
+
+    def on_done(_):
+        with lock:
+            remaining[0] -= 1
+            last = remaining[0] == 0
+        if last:
+            callback()
+
+    if not futures:
+        callback()
+    for future in futures:
+        future.add_done_callback(on_done)
+
+
+class BackendRouter:
+    """
+    Routes each job to the healthy backend with the lowest expected latency.
+
+    Backends without latency data yet are ordered by priority, so the first jobs
+    follow the configured preference and later ones follow measurements.
+    Backends with an open breaker are skipped unless nothing else is left.
+
+    Args:
+        backends (list): BackendStrategy instances.
+    """
+
+    def __init__(self, backends):
+        self.backends = list(backends)
+        self._health = {backend.name: BackendHealth(backend.name) for backend in self.backends}
+        self._lock = threading.Lock()
+        self._decisions = deque(maxlen=ROUTER_DECISION_HISTORY)
+        self._hedge_executor = None
+
+    def plan(self, audio_minutes):
+        """
+        Returns the backends to try, in order, for audio of the given length, and the
+        names of half-open backends whose single trial the plan now holds (see
+        release_trials()).
+        """
+        now = time.time()
+        with self._lock:
+            healthy, tripped, trials = [], [], set()
+            for backend in self.backends:
+                if not backend.is_available():
+                    continue
+                health = self._health[backend.name]
+                state = health.state
+                if health.allows_request(now):
+                    healthy.append(backend)
+                    if state != CLOSED:
+                        trials.add(backend.name)
+                else:
+                    tripped.append(backend)
+
+            def sort_key(backend):
+                expected = self._health[backend.name].expected_latency(audio_minutes)
+                # Unmeasured backends go first (ordered by priority) so they get explored
+                return (expected is not None, expected or 0.0, backend.priority)
+
+            healthy.sort(key=sort_key)
+            tripped.sort(key=lambda backend: backend.priority)
+            return healthy + tripped, trials
+
+    def _admitted(self, backend, trials):
+        with self._lock:
+            return self._health[backend.name].state == CLOSED or backend.name in trials
+
+    def release_trials(self, names):
+        """
+        Gives back half-open trials a plan held but did not run.
+        """
+        with self._lock:
+            for name in names:
+                self._health[name].release_trial()
+
+    def run(self, backend, file_path, audio_minutes, offsets=None, waveform=None):
+        """
+        Runs one backend and records the outcome in its health statistics.
+
+        Returns:
+            tuple: (transcript or None if the backend failed, elapsed seconds)
+        """
+        health = self._health[backend.name]
+        with span(f"backend.{backend.name}", log=False, audio_minutes=round(audio_minutes, 2)) as attempt:
+            try:
+                result = backend.transcribe(file_path, offsets=offsets, waveform=waveform)
+            except Exception as e:
+                logger.error(f"❌ Backend '{backend.name}' raised: {str(e)}")
+                result = None
+            attempt.set(ok=bool(result))
+        elapsed = attempt.duration
+
+        with self._lock:
+            if result:
+                health.record_success(elapsed, audio_minutes)
+            else:
+                health.record_failure(time.time())
+        return result, elapsed
+
+    def route(self, file_path, audio_minutes, offsets=None, hedge=False, hedge_delay=None, waveform=None,
+              on_settled=None):
+        """
+        Transcribes the file with the best available backend, falling through
+        the plan until one succeeds.
+
+        With `hedge`, the first two backends of the plan race (the second one starts
+        after `hedge_delay` seconds, default ROUTER_HEDGE_DELAY) and the first valid
+        transcript wins; the rest of the plan is only tried if both fail.
+
+        `on_settled` is called once no attempt uses the file any more: right away, or
+        when the loser of a hedged race finishes. Temporary input should be removed
+        there rather than when route() returns.
+
+        Returns:
+            tuple: (transcript or None, name of the backend that produced it or None)
+        """
+        plan, trials = self.plan(audio_minutes)
+        decision = {
+            "time": time.time(),
+            "file": os.path.basename(file_path),
+            "audio_minutes": round(audio_minutes, 2),
+            "plan": [backend.name for backend in plan],
+            "attempts": [],
+            "chosen": None,
+        }
+        logger.info(f"🧭 Routing {audio_minutes:.1f} min of audio: plan={decision['plan']}"
+                    f"{' (hedged)' if hedge and len(plan) > 1 else ''}")
+
+        result = None
+        remaining = plan
+        launched = []  # futures of hedged attempts, which may outlive route()
+        started = set()  # backends that were (or are being) tried
+        try:
+            # Only backends the breakers admitted race; tripped ones stay a sequential last resort
+            if hedge and len(plan) > 1 and self._admitted(plan[1], trials):
+                delay = ROUTER_HEDGE_DELAY if hedge_delay is None else hedge_delay
+                result = self._race(plan[0], plan[1], file_path, audio_minutes, offsets, delay,
+                                    decision, waveform, launched, started)
+                remaining = plan[2:]
+
+            for backend in remaining:
+                if decision["chosen"]:
+                    break
+                started.add(backend.name)
+                result, elapsed = self.run(backend, file_path, audio_minutes, offsets, waveform)
+                decision["attempts"].append({
+                    "backend": backend.name,
+                    "ok": bool(result),
+                    "elapsed": round(elapsed, 3),
+                })
+                if result:
+                    decision["chosen"] = backend.name
+                    break
+                logger.warning(f"⚠️ Backend '{backend.name}' failed, trying next option")
+        finally:
+            self.release_trials(trials - started)
+            if on_settled is not None:
+                _when_done(launched, on_settled)
+
+        with self._lock:
+            self._decisions.append(decision)
+        return (result if decision["chosen"] else None), decision["chosen"]
+
+    def _get_hedge_executor(self):
+        with self._lock:
+            if self._hedge_executor is None:
+                self._hedge_executor = ThreadPoolExecutor(max_workers=ROUTER_HEDGE_WORKERS,
+                                                          thread_name_prefix="hedge")
+            return self._hedge_executor
+
+    def _race(self, primary, secondary, file_path, audio_minutes, offsets, delay, decision, waveform,
+              futures, started):
+        """
+        Races two backends and returns the first valid transcript (or None if both fail).
+
+        Every launched call is appended to `futures` and its backend added to `started`
+        as soon as it is submitted (both owned by the caller, so they are complete even
+        if the race raises); a call cancelled before it ran is taken out of `started`.
+
+        The secondary starts after `delay` seconds, or as soon as the primary fails.
+        The losing call is cancelled if it has not started yet; otherwise it is left to
+        finish in the background, its result discarded but its outcome still recorded
+        in the backend's health statistics.
+        """
+        executor = self._get_hedge_executor()
+        race_start = time.perf_counter()
+        launched = {}  # future -> (backend, seconds after start when it was launched)
+
+        def attempt(backend):
+            outcome, elapsed = self.run(backend, file_path, audio_minutes, offsets, waveform)
+            return outcome, elapsed, time.perf_counter() - race_start
+
+        def launch(backend):
+            started.add(backend.name)
+            future = executor.submit(propagate(attempt), backend)
+            futures.append(future)
+            launched[future] = (backend, time.perf_counter() - race_start)
+            return future
+
+        primary_future = launch(primary)
+        if delay > 0:
+            wait([primary_future], timeout=delay)
+        if not (primary_future.done() and primary_future.result()[0]):
+            launch(secondary)
+
+        winner, result = None, None
+        pending = set(launched)
+        while pending and winner is None:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                backend, _ = launched[future]
+                outcome, elapsed, _ = future.result()
+                decision["attempts"].append({"backend": backend.name, "ok": bool(outcome),
+                                             "elapsed": round(elapsed, 3), "hedged": True})
+                if outcome and winner is None:
+                    winner, result = future, outcome
+
+        for future in pending:
+            if future.cancel():
+                started.discard(launched[future][0].name)
+
+        hedge = {
+            "delay": delay,
+            "launched": len(launched) > 1,
+            "winner": launched[winner][0].name if winner else None,
+            "seconds_saved": None,
+        }
+        decision["hedge"] = hedge
+        if winner is None:
+            return None
+
+        decision["chosen"] = hedge["winner"]
+        won_at = winner.result()[2]
+        logger.info(f"🏁 Hedged race won by '{hedge['winner']}' after {won_at:.2f}s")
+        increment("meeting_hedged_requests_total", winner=hedge["winner"], launched=str(hedge["launched"]).lower())
+
+        if winner is primary_future:
+            self._record_savings(hedge, 0.0)
+        else:
+            # What the job would have waited without hedging is only known once the primary
+            # finishes: its own time if it succeeds, or its time plus a sequential fallback.
+            secondary_started = launched[winner][1]
+
+            def on_primary_done(future):
+                if future.cancelled() or future.exception() is not None:
+                    return
+                outcome, _, finished_at = future.result()
+                without_hedge = finished_at + (0.0 if outcome else won_at - secondary_started)
+                self._record_savings(hedge, max(0.0, without_hedge - won_at))
+
+            primary_future.add_done_callback(on_primary_done)
+        return result
+
+    def _record_savings(self, hedge, seconds):
+        with self._lock:
+            hedge["seconds_saved"] = round(seconds, 3)
+        increment("meeting_hedge_seconds_saved_total", seconds, winner=hedge["winner"])
+        if seconds > 0:
+            logger.info(f"⏱️ Hedging to '{hedge['winner']}' saved {seconds:.2f}s")
+
+    def state(self):
+        """
+        Returns per-backend health/breaker state and the most recent routing decisions.
+        """
+        with self._lock:
+            return {
+                "backends": {
+                    backend.name: dict(
+                        self._health[backend.name].to_dict(),
+                        available=backend.is_available(),
+                        priority=backend.priority,
+                    )
+                    for backend in self.backends
+                },
+                "recent_decisions": list(self._decisions),
+            }
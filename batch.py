@@ -0,0 +1,254 @@
+# batch.py
+# Headless batch processing of recorded meetings
+# This module contains:
+# 1. Input discovery: directories (optionally recursive) and glob patterns of audio files.
+# 2. A Manifest: an append-only JSONL log of finished files, so an interrupted run resumes
+#    where it stopped and files that changed since are processed again.
+# 3. The CLI: runs logic.process_meeting over every pending file with separate I/O and CPU
+#    concurrency, stores each report in the output directory and prints per-file and total timings.
+#
+# The Gradio UI (app.py) is never imported in this mode.
+#
+# Usage:
+#   python batch.py recordings/ --output-dir reports/
+#   python batch.py "recordings/**/*.mp3" --io-workers 8 --cpu-workers 2 --retry-failed
+
+import argparse
+import glob
+import json
+import os
+import shutil
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# Extensions picked up when a directory is given
+AUDIO_EXTENSIONS = (".mp3", ".wav", ".m4a", ".flac", ".ogg", ".webm", ".mp4", ".aac")
+MANIFEST_NAME = "manifest.jsonl"
+# Stages reported per file, in pipeline order
+STAGES = ("queue_wait", "transcription", "summarization", "pdf", "total")
+
+
+def collect_inputs(sources, recursive=False):
+    """
+    Expands directories and glob patterns into a sorted list of unique audio file paths.
+    """
+    found = set()
+    for source in sources:
+        if os.path.isdir(source):
+            if recursive:
+                candidates = (os.path.join(root, name) for root, _, names in os.walk(source) for name in names)
+            else:
+                candidates = (os.path.join(source, name) for name in os.listdir(source))
+            found.update(path for path in candidates
+                         if path.lower().endswith(AUDIO_EXTENSIONS) and os.path.isfile(path))
+        else:
+            found.update(path for path in glob.glob(source, recursive=True) if os.path.isfile(path))
+    return sorted(os.path.abspath(path) for path in found)
+
+
+def _fingerprint(path):
+    stat = os.stat(path)
+    return {"size": stat.st_size, "mtime": int(stat.st_mtime)}
+
+
+class Manifest:
+    """
+    Append-only record of finished files (one JSON object per line, the latest wins).
+
+    Every record is flushed and fsynced before the next file is reported, so a crash or
+    Ctrl-C loses at most the files that were still running.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # a line cut short by an interrupted run
+                    self.entries[entry["file"]] = entry
+
+    def is_finished(self, path, retry_failed=False):
+        """
+        True if the file was already processed and has not changed since.
+        """
+        entry = self.entries.get(path)
+        if entry is None or (retry_failed and entry["status"] != "done"):
+            return False
+        try:
+            return {"size": entry.get("size"), "mtime": entry.get("mtime")} == _fingerprint(path)
+        except OSError:
+            return False
+
+    def record(self, entry):
+        with self._lock:
+            self.entries[entry["file"]] = entry
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, sort_keys=True) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+
+
+def _artifact_dir(output_dir, path):
+    # Same-named recordings from different folders must not overwrite each other
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(output_dir, f"{stem}-{uuid.uuid5(uuid.NAMESPACE_URL, path).hex[:8]}")
+
+
+def process_file(path, output_dir):
+    """
+    Runs the full pipeline on one recording and moves its report into the output directory.
+
+    Returns:
+        dict: The manifest entry (status, error, artifact paths and stage timings).
+    """
+    import logic
+    from jobs import job_manager
+
+    entry = {"file": path, **_fingerprint(path)}
+    session_id = uuid.uuid4().hex
+    started = time.perf_counter()
+    summary = None
+    for _, summary, _, _, _ in logic.process_meeting(path, session_id):
+        pass
+    entry["seconds"] = round(time.perf_counter() - started, 3)
+
+    job = job_manager.latest_for_session(session_id, status=None)
+    if job is None:
+        # Rejected before a job was created (queue full)
+        entry.update(status="failed", error=summary, timings={})
+        return entry
+
+    entry.update(job_id=job.job_id, status=job.status, error=job.error,
+                 timings={stage: round(job.timings[stage], 3) for stage in STAGES if stage in job.timings})
+    if job.status == "done":
+        target = _artifact_dir(output_dir, path)
+        os.makedirs(target, exist_ok=True)
+        entry["pdf"] = shutil.move(job.pdf_path, os.path.join(target, "meeting_report.pdf"))
+        entry["transcript"] = os.path.join(target, "transcript.txt")
+        with open(entry["transcript"], "w", encoding="utf-8") as f:
+            f.write(str(job.transcript))
+        entry["summary"] = os.path.join(target, "summary.md")
+        with open(entry["summary"], "w", encoding="utf-8") as f:
+            f.write(job.summary)
+    # The job directory only held the report, which now lives in the output directory
+    shutil.rmtree(job.output_dir, ignore_errors=True)
+    return entry
+
+
+def _format_timings(timings):
+    return ", ".join(f"{stage} {timings[stage]:.1f}s" for stage in STAGES if stage in timings and stage != "total")
+
+
+def _configure(args):
+    """
+    Sizes the app's pools before it is imported; their sizes are read from the
+    environment at import time.
+    """
+    # I/O: meetings in flight (API calls and their waits)
+    os.environ["JOB_WORKERS"] = str(args.io_workers)
+    os.environ["JOB_QUEUE_SIZE"] = str(max(args.io_workers, int(os.getenv("JOB_QUEUE_SIZE", 32))))
+    os.environ["LOCAL_FLOW_WORKERS"] = str(2 * args.io_workers)
+    # CPU: local diarization and PDF rendering processes
+    os.environ["DIARIZATION_CONCURRENCY"] = str(args.cpu_workers)
+    os.environ["PDF_WORKERS"] = str(args.cpu_workers)
+
+
+def run(args):
+    from utils.env import load_env
+    load_env()
+
+    files = collect_inputs(args.sources, recursive=args.recursive)
+    os.makedirs(args.output_dir, exist_ok=True)
+    manifest = Manifest(os.path.join(args.output_dir, MANIFEST_NAME))
+    pending = [path for path in files if not manifest.is_finished(path, retry_failed=args.retry_failed)]
+    skipped = len(files) - len(pending)
+    print(f"{len(files)} recording(s) found, {skipped} already processed, {len(pending)} to go "
+          f"(io-workers={args.io_workers}, cpu-workers={args.cpu_workers})")
+    if not pending:
+        return 0
+
+    _configure(args)
+    import logic  # noqa: F401 (imported once here, after the pools are sized)
+
+    results = []
+    started = time.perf_counter()
+    executor = ThreadPoolExecutor(max_workers=args.io_workers, thread_name_prefix="batch")
+    futures = {executor.submit(process_file, path, args.output_dir): path for path in pending}
+
+    def report_finished(future):
+        path = futures[future]
+        try:
+            entry = future.result()
+        except Exception as e:
+            entry = {"file": path, **_fingerprint(path), "status": "failed", "error": f"Error: {str(e)}", "timings": {}}
+        entry["finished_at"] = time.time()
+        manifest.record(entry)
+        results.append(entry)
+        mark = "✅" if entry["status"] == "done" else "❌"
+        detail = _format_timings(entry["timings"]) if entry["status"] == "done" else entry["error"]
+        print(f"{mark} [{len(results)}/{len(pending)}] {os.path.relpath(path)} "
+              f"{entry.get('seconds', 0):.1f}s ({detail})", flush=True)
+
+    try:
+        for future in as_completed(futures):
+            report_finished(future)
+    except KeyboardInterrupt:
+        # Files not started yet are dropped; the running ones finish and are recorded
+        executor.shutdown(wait=False, cancel_futures=True)
+        running = [future for future in futures if not future.done()]
+        print(f"⏹️ Interrupted; finishing {len(running)} running file(s). Run again to resume.", flush=True)
+        for future in as_completed(running):
+            if not future.cancelled():
+                report_finished(future)
+        raise
+    executor.shutdown()
+
+    wall = time.perf_counter() - started
+    done = [entry for entry in results if entry["status"] == "done"]
+    totals = {stage: round(sum(entry["timings"].get(stage, 0) for entry in done), 3) for stage in STAGES}
+    report = {
+        "files": len(files),
+        "skipped": skipped,
+        "done": len(done),
+        "failed": len(results) - len(done),
+        "wall_seconds": round(wall, 3),
+        "files_per_minute": round(len(results) / wall * 60, 2) if wall else None,
+        "stage_seconds": totals,
+    }
+    print(f"🏁 {report['done']} done, {report['failed']} failed, {skipped} skipped in {wall:.1f}s "
+          f"({report['files_per_minute']} files/min; {_format_timings(totals)})")
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump({"summary": report, "results": results}, f, indent=2, sort_keys=True)
+    return 1 if report["failed"] else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Process a directory or glob of meeting recordings without the UI.")
+    parser.add_argument("sources", nargs="+", help="Directories or glob patterns of audio files.")
+    parser.add_argument("--output-dir", default="batch_output", help="Where reports and the manifest are written.")
+    parser.add_argument("--recursive", action="store_true", help="Also search subdirectories of directory sources.")
+    parser.add_argument("--io-workers", type=int, default=4, help="Meetings processed at the same time.")
+    parser.add_argument("--cpu-workers", type=int, default=2, help="Concurrent diarization runs and PDF render processes.")
+    parser.add_argument("--retry-failed", action="store_true", help="Process files that failed in an earlier run again.")
+    parser.add_argument("--report", help="Also write per-file results and totals as JSON here.")
+    args = parser.parse_args()
+    if args.io_workers < 1 or args.cpu_workers < 1:
+        parser.error("--io-workers and --cpu-workers must be at least 1")
+
+    try:
+        sys.exit(run(args))
+    except KeyboardInterrupt:
+        sys.exit(130)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+# benchmarks/bench_alignment.py
+# Micro-benchmark for speaker alignment
+# Compares the original nested-loop aligner with the sweep-line aligner in alignment.py
+# on synthetic Whisper/Pyannote segment lists of increasing size.
+#
+# Usage:
+#   python benchmarks/bench_alignment.py
+#   python benchmarks/bench_alignment.py --sizes 1000 10000 100000 --legacy-max 20000
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from alignment import align_segments  # noqa: E402
+
+
+def legacy_align_segments(whisper_segments, pyannote_segments):
+    """
+    The original O(n*m) implementation, kept here as the baseline.
+    """
+    aligned_transcript = []
+    for ws in whisper_segments:
+        w_start = ws.get('start', 0)
+        w_end = ws.get('end', 0)
+        w_text = ws.get('text', "").strip()
+        best_speaker = "Unknown Speaker"
+        max_overlap = 0
+        for ps in pyannote_segments:
+            overlap = min(w_end, ps['end']) - max(w_start, ps['start'])
+            if overlap > max_overlap:
+                max_overlap = overlap
+                best_speaker = ps['speaker']
+        aligned_transcript.append(f"{best_speaker}: {w_text}")
+    return "\n".join(aligned_transcript)
+
+
+def make_segments(count, speakers=6, seed=0):
+    """
+    Builds `count` Whisper segments and `count` speaker turns over a shared timeline.
+    Turns occasionally overlap to mimic cross-talk.
+    """
+    rng = random.Random(seed)
+    whisper, turns = [], []
+    t = 0.0
+    for i in range(count):
+        duration = rng.uniform(1.5, 8.0)
+        whisper.append({"start": t, "end": t + duration, "text": f" segment {i}"})
+        t += duration + rng.uniform(0.0, 0.5)
+
+    t = 0.0
+    for _ in range(count):
+        duration = rng.uniform(1.0, 9.0)
+        turns.append({"start": t, "end": t + duration, "speaker": f"SPEAKER_{rng.randrange(speakers):02d}"})
+        t += duration - rng.uniform(0.0, 0.8)
+    return whisper, turns
+
+
+def time_call(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark speaker alignment scaling.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 5000, 10000, 50000, 100000])
+    parser.add_argument("--legacy-max", type=int, default=5000,
+                        help="Largest size to run the nested-loop baseline on (it is quadratic).")
+    args = parser.parse_args()
+
+    print(f"{'segments':>10} {'legacy (s)':>12} {'sweep (s)':>12} {'speedup':>10}")
+    for size in args.sizes:
+        whisper, turns = make_segments(size)
+        sweep_time, sweep_result = time_call(align_segments, whisper, turns)
+
+        if size <= args.legacy_max:
+            legacy_time, legacy_result = time_call(legacy_align_segments, whisper, turns)
+            assert legacy_result == sweep_result.to_text(), f"Aligners disagree at size {size}"
+            print(f"{size:>10} {legacy_time:>12.4f} {sweep_time:>12.4f} {legacy_time / sweep_time:>9.1f}x")
+        else:
+            print(f"{size:>10} {'skipped':>12} {sweep_time:>12.4f} {'-':>10}")
+
+
+if __name__ == "__main__":
+    main()
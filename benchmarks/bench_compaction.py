@@ -0,0 +1,199 @@
+# benchmarks/bench_compaction.py
+# Size and quality benchmark for transcript compaction
+# Generates sample meeting transcripts with realistic noise (fillers, stutters, backchannels,
+# one speaker's thought split over several lines) and planted facts (decisions, owners, dates),
+# then compacts them with the standard and aggressive rules and reports:
+#   - size: estimated tokens before/after, turns before/after, compaction time,
+#   - quality: share of planted facts whose words all survive, share of content words kept
+#     (everything except fillers and backchannels), and answers to questions kept.
+# It also cleans a fixed set of sentences with units, acronyms and grammatical repeats that
+# look like fillers or stutters ("5 mm", "ER doctor", "had had") and exits with 1 if any
+# of them comes out different from the expected text.
+#
+# Usage:
+#   python benchmarks/bench_compaction.py
+#   python benchmarks/bench_compaction.py --minutes 10 60 180 --noise 0.5
+
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.transcript import Transcript  # noqa: E402
+from utils.transcript_compaction import CompactionRules, compact_transcript, estimate_tokens  # noqa: E402
+
+NAMES = ("Dana", "Priya", "Marco", "Wen", "Olu", "Sasha")
+TOPICS = ("billing migration", "dashboard rollout", "hiring plan", "Q3 budget", "incident review", "API deprecation")
+DATES = ("Monday", "Tuesday", "March 3", "the 15th", "end of sprint", "next Friday")
+SENTENCES = (
+    "I looked at the {topic} numbers again this morning",
+    "the main risk with the {topic} is the timeline",
+    "we should loop in the platform team on the {topic}",
+    "customers have been asking about the {topic} for a while",
+    "the last update on the {topic} was pretty positive",
+    "I'm not sure the {topic} needs another review",
+)
+FACTS = (
+    "we decided to ship the {topic} on {date}",
+    "{name} will own the {topic} and report back by {date}",
+    "{name} is going to draft the {topic} proposal before {date}",
+)
+QUESTIONS = ("Can you take the {topic}?", "Is {date} realistic for the {topic}?")
+FILLERS = ("um", "uh", "you know", "I mean", "hmm", "er")
+BACKCHANNELS = ("Yeah.", "Mm-hmm.", "Okay.", "Right.", "Sure.", "Got it.", "Yeah, yeah.", "Uh-huh.")
+ANSWERS = ("Yes.", "Sure.", "Yeah.")
+# (text, expected after cleaning with the standard and aggressive rules)
+CLEAN_CASES = (
+    ("The gap is 5 mm wide.", "The gap is 5 mm wide."),
+    ("The 3 mm screws, uh, arrived.", "The 3 mm screws arrived."),
+    ("Order 2 ah batteries, um, today.", "Order 2 ah batteries today."),
+    ("Call the ER doctor before noon.", "Call the ER doctor before noon."),
+    ("She moved to the UM campus.", "She moved to the UM campus."),
+    ("Um, the budget is 30 mm over.", "The budget is 30 mm over."),
+    ("I agree, um.", "I agree."),
+    ("Hmm. Let's ship it.", "Let's ship it."),
+    ("She had had enough of it.", "She had had enough of it."),
+    ("I think that that is fine.", "I think that that is fine."),
+    ("We we we need a plan.", "We need a plan."),
+)
+_WORD = re.compile(r"[\w'-]+")
+
+
+def _noisy(sentence, rng, noise):
+    words = sentence.split()
+    out = []
+    for index, word in enumerate(words):
+        if rng.random() < noise * 0.15:
+            out.append(rng.choice(FILLERS) + ",")
+        if index == 0 and rng.random() < noise * 0.2:
+            out.append(word)  # stutter
+        out.append(word)
+    text = " ".join(out)
+    return text[0].upper() + text[1:] + "."
+
+
+def sample_transcript(minutes, noise, seed):
+    """
+    Returns (Transcript, planted facts, answers to questions) for a meeting of `minutes`.
+    """
+    rng = random.Random(seed)
+    speakers = [f"Speaker {index}" for index in range(4)]
+    transcript, facts, answers = Transcript(), [], []
+    clock = 0.0
+    while clock < minutes * 60:
+        speaker = rng.choice(speakers)
+        values = {"topic": rng.choice(TOPICS), "name": rng.choice(NAMES), "date": rng.choice(DATES)}
+        roll = rng.random()
+        if roll < 0.08:
+            fact = rng.choice(FACTS).format(**values)
+            facts.append(fact)
+            lines = [_noisy(fact, rng, noise)]
+        elif roll < 0.12:
+            lines = [rng.choice(QUESTIONS).format(**values)]
+            listener = rng.choice([s for s in speakers if s != speaker])
+            for line in lines:
+                transcript.append(speaker, line, clock, clock + 3)
+                clock += 3
+            answer = rng.choice(ANSWERS)
+            answers.append(answer)
+            transcript.append(listener, answer, clock, clock + 0.6)
+            clock += 0.8
+            continue
+        else:
+            # One thought, often split over several lines by the transcription backend
+            lines = [_noisy(rng.choice(SENTENCES).format(**values), rng, noise) for _ in range(rng.randint(1, 3))]
+        for line in lines:
+            duration = len(line.split()) / 2.5
+            transcript.append(speaker, line, clock, clock + duration)
+            clock += duration + 0.2
+            if rng.random() < noise * 0.5:
+                listener = rng.choice([s for s in speakers if s != speaker])
+                transcript.append(listener, rng.choice(BACKCHANNELS), clock, clock + 0.5)
+                clock += 0.6
+    return transcript, facts, answers
+
+
+def _content_words(text, rules):
+    noise = set(rules.fillers) | {word for phrase in rules.fillers + rules.backchannels for word in phrase.split()}
+    return Counter(word for word in (w.lower() for w in _WORD.findall(text)) if word not in noise)
+
+
+def evaluate(transcript, facts, answers, rules, level):
+    started = time.perf_counter()
+    result = compact_transcript(transcript, rules, level=level)
+    seconds = time.perf_counter() - started
+
+    compacted = result.text.lower()
+    compacted_words = set(_WORD.findall(compacted))
+    kept_facts = sum(1 for fact in facts if all(word.lower() in compacted_words for word in _WORD.findall(fact)))
+    # Speaker labels are not content; merging turns is meant to drop repeated ones
+    before_words = _content_words(" ".join(segment.text for segment in transcript), rules)
+    after_words = _content_words(" ".join(segment.text for segment in result.transcript), rules)
+    kept_words = sum(min(count, after_words[word]) for word, count in before_words.items())
+    kept_answers = sum(1 for segment in result.transcript for answer in ANSWERS if segment.text.startswith(answer))
+    return {
+        **result.to_dict(),
+        "compaction_ms": round(seconds * 1000, 2),
+        "fact_recall": round(kept_facts / len(facts), 4) if facts else None,
+        "content_word_recall": round(kept_words / sum(before_words.values()), 4),
+        "answers_kept": min(kept_answers, len(answers)),
+        "answers": len(answers),
+    }
+
+
+def check_clean_cases(rules):
+    """
+    Returns the CLEAN_CASES whose cleaned text differs from the expected one, with what came out.
+    """
+    return [{"text": text, "expected": expected, "got": rules.clean(text)[0]}
+            for text, expected in CLEAN_CASES if rules.clean(text)[0] != expected]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Transcript compaction size/quality benchmark.")
+    parser.add_argument("--minutes", type=float, nargs="+", default=[10, 60, 180], help="Sample meeting lengths.")
+    parser.add_argument("--noise", type=float, default=0.5, help="0 = clean speech, 1 = very disfluent.")
+    parser.add_argument("--seed", type=int, default=11, help="Random seed for the sample transcripts.")
+    parser.add_argument("--output", help="Write the JSON results here instead of stdout.")
+    args = parser.parse_args()
+
+    rules = CompactionRules()
+    results = []
+    for minutes in args.minutes:
+        transcript, facts, answers = sample_transcript(minutes, args.noise, args.seed)
+        for level, level_rules in (("standard", rules), ("aggressive", rules.aggressive())):
+            result = {"minutes": minutes, "facts": len(facts),
+                      **evaluate(transcript, facts, answers, level_rules, level)}
+            results.append(result)
+            print(f"{minutes:>6g} min {level:<10}  tokens {result['tokens_before']:>7} -> {result['tokens_after']:>7} "
+                  f"(-{result['reduction']:.0%})  turns {result['turns_before']} -> {result['turns_after']}  "
+                  f"facts {result['fact_recall']:.0%}  content words {result['content_word_recall']:.1%}  "
+                  f"answers {result['answers_kept']}/{result['answers']}  {result['compaction_ms']:.0f} ms",
+                  file=sys.stderr)
+        assert estimate_tokens(transcript.to_text()) == results[-1]["tokens_before"]
+
+    mismatches = check_clean_cases(rules) + check_clean_cases(rules.aggressive())
+    for mismatch in mismatches:
+        print(f"clean case {mismatch['text']!r}: expected {mismatch['expected']!r}, got {mismatch['got']!r}",
+              file=sys.stderr)
+    print(f"clean cases: {2 * len(CLEAN_CASES) - len(mismatches)}/{2 * len(CLEAN_CASES)} as expected", file=sys.stderr)
+
+    document = json.dumps({"benchmark": "compaction", "config": vars(args), "results": results,
+                           "clean_case_mismatches": mismatches}, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(document + "\n")
+    else:
+        print(document)
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
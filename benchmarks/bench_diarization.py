@@ -0,0 +1,213 @@
+# benchmarks/bench_diarization.py
+# Real-time factor of local Pyannote diarization against its CPU settings
+# Generates a synthetic multi-speaker conversation (benchmarks/audio_fixtures.py) and runs
+# diarization.diarize_audio on it once per combination of:
+#   - input: the file path (Pyannote decodes it) or the pre-decoded waveform,
+#   - DIARIZATION_TORCH_THREADS, DIARIZATION_SEGMENTATION_BATCH_SIZE,
+#     DIARIZATION_EMBEDDING_BATCH_SIZE and DIARIZATION_MAX_SPEAKERS.
+# Each combination runs in a fresh subprocess (torch threads are per process) and reports the
+# pipeline load time, RTF (processing seconds / audio seconds, best of --repeats), peak RSS,
+# speakers found and the share of reference speech attributed to the right speaker.
+# The best RTF is compared with --target-rtf.
+#
+# Needs pyannote.audio and HUGGINGFACE_TOKEN (with the model's user agreement accepted).
+#
+# Usage:
+#   python benchmarks/bench_diarization.py
+#   python benchmarks/bench_diarization.py --minutes 10 --speakers 5 --threads 1 2 4 8 \
+#       --embedding-batch-sizes 8 32 64 --max-speakers 0 5 --inputs waveform
+
+import argparse
+import itertools
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+from audio_fixtures import make_speech_fixture  # noqa: E402
+
+# Resolution of the speaker-attribution score
+FRAME_SECONDS = 0.01
+
+
+def ensure_speech_fixture(directory, minutes, speakers):
+    """
+    Returns (path, reference turns), generating the conversation if it is not there yet.
+    """
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"speech_{minutes:g}min_{speakers}spk.wav")
+    reference_path = path + ".json"
+    if not (os.path.exists(path) and os.path.exists(reference_path)):
+        turns = make_speech_fixture(path, minutes, speakers, seed=speakers * 1000 + int(minutes))
+        with open(reference_path, "w") as f:
+            json.dump(turns, f)
+    with open(reference_path) as f:
+        return path, json.load(f)
+
+
+def _frames(turns, count):
+    labels = [None] * count
+    for turn in turns:
+        for frame in range(int(turn["start"] / FRAME_SECONDS), min(count, int(turn["end"] / FRAME_SECONDS))):
+            labels[frame] = turn["speaker"]
+    return labels
+
+
+def speaker_accuracy(reference, hypothesis, seconds):
+    """
+    Share of reference speech frames labelled with the right speaker, after mapping each
+    found speaker to the reference speaker it overlaps most (greedy, one-to-one).
+    """
+    count = int(seconds / FRAME_SECONDS) + 1
+    truth, found = _frames(reference, count), _frames(hypothesis, count)
+    overlap = {}
+    for expected, label in zip(truth, found):
+        if expected is not None and label is not None:
+            overlap[(label, expected)] = overlap.get((label, expected), 0) + 1
+    mapping, used = {}, set()
+    for (label, expected), _ in sorted(overlap.items(), key=lambda item: -item[1]):
+        if label not in mapping and expected not in used:
+            mapping[label] = expected
+            used.add(expected)
+    speech = sum(1 for expected in truth if expected is not None)
+    correct = sum(1 for expected, label in zip(truth, found) if expected is not None and mapping.get(label) == expected)
+    return correct / speech if speech else 0.0
+
+
+def decode_waveform(path):
+    """
+    Reads a 16-bit mono WAV into int16 samples, as utils/audio_preprocessing.py hands them over.
+    """
+    import wave
+    import numpy as np
+
+    with wave.open(path, "rb") as wav:
+        return np.frombuffer(wav.readframes(wav.getnframes()), dtype="<i2"), wav.getframerate()
+
+
+def run_config(fixture, reference_path, input_kind, repeats):
+    """
+    Child-process entry point: diarizes the fixture `repeats` times with the settings
+    from the environment and prints one JSON result line.
+    """
+    sys.path.insert(0, REPO_ROOT)
+    import diarization
+
+    started = time.perf_counter()
+    diarization.get_diarization_pipeline()
+    load_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    waveform, sample_rate = decode_waveform(fixture)
+    decode_seconds = time.perf_counter() - started
+    seconds = len(waveform) / sample_rate
+    if input_kind == "file":
+        waveform = None
+
+    runs, segments = [], None
+    for _ in range(repeats):
+        started = time.perf_counter()
+        segments = diarization.diarize_audio(fixture, waveform=waveform, sample_rate=sample_rate)
+        runs.append(time.perf_counter() - started)
+        if not isinstance(segments, list):
+            raise SystemExit(f"Diarization failed: {segments}")
+
+    with open(reference_path) as f:
+        reference = json.load(f)
+    import torch
+    print(json.dumps({
+        "torch_threads": torch.get_num_threads(),
+        "load_seconds": round(load_seconds, 3),
+        "decode_seconds": round(decode_seconds, 4),
+        "audio_seconds": round(seconds, 2),
+        "runs_seconds": [round(run, 3) for run in runs],
+        "rtf": round(min(runs) / seconds, 4),
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "speakers_found": len({segment["speaker"] for segment in segments}),
+        "segments": len(segments),
+        "speaker_accuracy": round(speaker_accuracy(reference, segments, seconds), 4),
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Diarization real-time factor benchmark.")
+    parser.add_argument("--minutes", type=float, default=5, help="Length of the synthetic conversation.")
+    parser.add_argument("--speakers", type=int, default=4, help="Voices in the conversation.")
+    parser.add_argument("--inputs", nargs="+", choices=("file", "waveform"), default=["file", "waveform"])
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 0],
+                        help="DIARIZATION_TORCH_THREADS values (0 = cores / DIARIZATION_CONCURRENCY).")
+    parser.add_argument("--segmentation-batch-sizes", type=int, nargs="+", default=[32])
+    parser.add_argument("--embedding-batch-sizes", type=int, nargs="+", default=[8, 32])
+    parser.add_argument("--max-speakers", type=int, nargs="+", default=[0], help="DIARIZATION_MAX_SPEAKERS values.")
+    parser.add_argument("--repeats", type=int, default=2, help="Runs per combination (the fastest counts).")
+    parser.add_argument("--target-rtf", type=float, default=0.15, help="Best real-time factor to reach.")
+    parser.add_argument("--fixtures-dir", default=os.path.join(tempfile.gettempdir(), "meeting_bench_fixtures"),
+                        help="Where synthetic audio is generated and reused between runs.")
+    parser.add_argument("--output", help="Write the JSON results here instead of stdout.")
+    parser.add_argument("--verbose", action="store_true", help="Show the diarization logs of each run.")
+    parser.add_argument("--child", nargs=4, metavar=("FIXTURE", "REFERENCE", "INPUT", "REPEATS"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        fixture, reference_path, input_kind, repeats = args.child
+        run_config(fixture, reference_path, input_kind, int(repeats))
+        return
+
+    if not os.getenv("HUGGINGFACE_TOKEN"):
+        raise SystemExit("HUGGINGFACE_TOKEN is not set; the Pyannote pipeline cannot be downloaded.")
+    fixture, _ = ensure_speech_fixture(args.fixtures_dir, args.minutes, args.speakers)
+
+    results = []
+    grid = itertools.product(args.inputs, args.threads, args.segmentation_batch_sizes,
+                             args.embedding_batch_sizes, args.max_speakers)
+    with tempfile.TemporaryDirectory(prefix="diarization_bench_") as workdir:
+        for input_kind, threads, segmentation_batch, embedding_batch, max_speakers in grid:
+            settings = {
+                "DIARIZATION_TORCH_THREADS": threads,
+                "DIARIZATION_SEGMENTATION_BATCH_SIZE": segmentation_batch,
+                "DIARIZATION_EMBEDDING_BATCH_SIZE": embedding_batch,
+                "DIARIZATION_MAX_SPEAKERS": max_speakers,
+            }
+            env = dict(os.environ, RESULT_CACHE_DISABLED="true", PYTHONPATH=REPO_ROOT,
+                       **{name: str(value) for name, value in settings.items()})
+            cmd = [sys.executable, os.path.abspath(__file__), "--child", fixture, fixture + ".json",
+                   input_kind, str(args.repeats)]
+            completed = subprocess.run(cmd, cwd=workdir, env=env, text=True, stdout=subprocess.PIPE,
+                                       stderr=None if args.verbose else subprocess.PIPE)
+            if completed.returncode != 0:
+                sys.stderr.write(completed.stderr or "")
+                raise SystemExit(f"Run {settings} failed (exit {completed.returncode})")
+
+            result = {"input": input_kind, "settings": settings,
+                      **json.loads(completed.stdout.strip().splitlines()[-1])}
+            results.append(result)
+            print(f"{input_kind:<8} threads={result['torch_threads']:<3} seg_batch={segmentation_batch:<4} "
+                  f"emb_batch={embedding_batch:<4} max_speakers={max_speakers or '-':<3} RTF={result['rtf']:.4f} "
+                  f"speakers={result['speakers_found']}/{args.speakers} accuracy={result['speaker_accuracy']:.1%} "
+                  f"peak={result['peak_rss_mb']} MB", file=sys.stderr)
+
+    best = min(results, key=lambda result: result["rtf"])
+    meets_target = best["rtf"] <= args.target_rtf
+    print(f"best RTF {best['rtf']:.4f} ({best['input']} input, {best['settings']}); "
+          f"target {args.target_rtf:g}: {'met' if meets_target else 'MISSED'}", file=sys.stderr)
+    document = json.dumps({"benchmark": "diarization", "config": vars(args), "cpu_count": os.cpu_count(),
+                           "results": results, "best": best, "meets_target": meets_target},
+                          indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(document + "\n")
+    else:
+        print(document)
+    if not meets_target:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,280 @@
+# benchmarks/bench_e2e.py
+# End-to-end pipeline benchmark against local stand-in services
+# Drives logic.process_meeting (transcription -> summarization -> PDF) and the email
+# step for synthetic meetings of several lengths at several concurrency levels, with
+# Groq, Deepgram and SMTP replaced by the fakes in benchmarks/fake_services.py.
+#
+# Each scenario runs in a fresh subprocess (so peak RSS is per scenario) and reports
+# job latency percentiles, throughput, peak memory, per-stage timings and the traffic
+# seen by the fake services. Results are written as sorted JSON so two runs can be diffed.
+#
+# Usage:
+#   python benchmarks/bench_e2e.py
+#   python benchmarks/bench_e2e.py --minutes 1 10 --concurrency 1 4 --output results.json
+#   python benchmarks/bench_e2e.py --deepgram-latency 2 --error-rate 0.1 --baseline results.json
+
+import argparse
+import json
+import math
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+from audio_fixtures import DEFAULT_MINUTES, ensure_fixtures  # noqa: E402
+from fake_services import FakeAPIServer, FakeAPIState, FakeSMTPServer, ServiceProfile  # noqa: E402
+
+QUANTILES = (0.5, 0.95, 0.99)
+# Metrics compared by --baseline (higher is better for throughput, lower for the rest)
+COMPARED = ("latency_p50", "latency_p95", "jobs_per_second", "peak_rss_mb")
+
+
+def percentiles(values):
+    """
+    Nearest-rank p50/p95/p99 of a list of numbers (None when empty).
+    """
+    ordered = sorted(values)
+    result = {}
+    for q in QUANTILES:
+        key = f"p{int(q * 100)}"
+        if not ordered:
+            result[key] = None
+            continue
+        index = min(len(ordered) - 1, max(0, math.ceil(q * len(ordered)) - 1))
+        result[key] = round(ordered[index], 4)
+    return result
+
+
+def run_scenario(fixture, minutes, concurrency, jobs, email_to):
+    """
+    Child-process entry point: runs `jobs` meetings with `concurrency` callers and
+    prints one JSON result line.
+    """
+    sys.path.insert(0, REPO_ROOT)
+    import logic
+    from outbox import outbox
+    from utils import telemetry
+
+    base_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    def one_job(_):
+        start = time.perf_counter()
+        first_output = None
+        transcript = summary = pdf_path = session_id = None
+        for transcript, summary, pdf_path, _, session_id in logic.process_meeting(fixture):
+            if first_output is None and transcript:
+                first_output = time.perf_counter() - start
+        outcome = {
+            "ok": bool(pdf_path),
+            "latency": time.perf_counter() - start,
+            "first_output": first_output,
+            "email_latency": None,
+            "email_ok": None,
+        }
+        if outcome["ok"] and email_to:
+            # Emails go through the background outbox; measure until the delivery finishes
+            email_start = time.perf_counter()
+            logic.send_email(email_to, session_id)
+            delivery = outbox.latest_for_session(session_id)
+            if delivery is not None:
+                outbox.wait(delivery.delivery_id, timeout=120)
+            outcome["email_latency"] = time.perf_counter() - email_start
+            outcome["email_ok"] = delivery is not None and delivery.status == "sent"
+        return outcome
+
+    wall_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        outcomes = list(pool.map(one_job, range(jobs)))
+    wall = time.perf_counter() - wall_start
+
+    succeeded = [outcome for outcome in outcomes if outcome["ok"]]
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    result = {
+        "audio_minutes": minutes,
+        "concurrency": concurrency,
+        "jobs": jobs,
+        "succeeded": len(succeeded),
+        "failed": jobs - len(succeeded),
+        "wall_seconds": round(wall, 4),
+        "jobs_per_second": round(len(succeeded) / wall, 4) if wall else None,
+        "audio_minutes_per_second": round(len(succeeded) * minutes / wall, 4) if wall else None,
+        "latency": percentiles([outcome["latency"] for outcome in succeeded]),
+        "first_output": percentiles([outcome["first_output"] for outcome in succeeded if outcome["first_output"]]),
+        "email_latency": percentiles([outcome["email_latency"] for outcome in succeeded if outcome["email_latency"]]),
+        "emails_failed": sum(1 for outcome in succeeded if outcome["email_ok"] is False),
+        "base_rss_mb": round(base_rss / 1024, 1),
+        "peak_rss_mb": round(peak_rss / 1024, 1),
+        "stages": telemetry.get_stage_stats(),
+    }
+    print(json.dumps(result))
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline_path):
+    """
+    Prints the relative change of the main metrics against a previous results file.
+    """
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {(r["audio_minutes"], r["concurrency"]): r for r in json.load(f)["results"]}
+
+    def flatten(result):
+        return {
+            "latency_p50": result["latency"]["p50"],
+            "latency_p95": result["latency"]["p95"],
+            "jobs_per_second": result["jobs_per_second"],
+            "peak_rss_mb": result["peak_rss_mb"],
+        }
+
+    print(f"\nChange vs {baseline_path}:", file=sys.stderr)
+    print(f"{'minutes':>8} {'conc':>5} " + " ".join(f"{name:>16}" for name in COMPARED), file=sys.stderr)
+    for result in results:
+        previous = baseline.get((result["audio_minutes"], result["concurrency"]))
+        if previous is None:
+            continue
+        current, before = flatten(result), flatten(previous)
+        cells = []
+        for name in COMPARED:
+            if current[name] is None or not before[name]:
+                cells.append(f"{'n/a':>16}")
+            else:
+                cells.append(f"{(current[name] - before[name]) / before[name]:>+16.1%}")
+        print(f"{result['audio_minutes']:>8g} {result['concurrency']:>5} " + " ".join(cells), file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end pipeline benchmark with local fake services.")
+    parser.add_argument("--minutes", type=float, nargs="+", default=list(DEFAULT_MINUTES), help="Fixture lengths in minutes.")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 8], help="Concurrent callers per scenario.")
+    parser.add_argument("--jobs-per-caller", type=int, default=2, help="Meetings submitted by each caller.")
+    parser.add_argument("--job-workers", type=int, help="JOB_WORKERS for the app (default: the scenario's concurrency).")
+    parser.add_argument("--fixtures-dir", default=os.path.join(tempfile.gettempdir(), "meeting_bench_fixtures"),
+                        help="Where synthetic audio is generated and reused between runs.")
+    parser.add_argument("--whisper-latency", type=float, default=0.3, help="Groq transcription latency (s).")
+    parser.add_argument("--deepgram-latency", type=float, default=0.5, help="Deepgram latency (s).")
+    parser.add_argument("--per-minute-latency", type=float, default=0.02, help="Extra transcription latency per audio minute (s).")
+    parser.add_argument("--chat-latency", type=float, default=0.2, help="Groq chat time to first token (s).")
+    parser.add_argument("--tokens-per-second", type=float, default=400, help="Streaming speed of fake completions.")
+    parser.add_argument("--summary-tokens", type=int, default=400, help="Approximate length of fake summaries.")
+    parser.add_argument("--segments-per-minute", type=int, default=12, help="Transcript segments per audio minute.")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Probability of an injected 500 on every API call.")
+    parser.add_argument("--smtp-latency", type=float, default=0.05, help="Fake SMTP delivery time (s).")
+    parser.add_argument("--no-email", action="store_true", help="Skip the email step.")
+    parser.add_argument("--output", help="Write the JSON results here instead of stdout.")
+    parser.add_argument("--baseline", help="Previous results file to compare against.")
+    parser.add_argument("--verbose", action="store_true", help="Show the pipeline logs of each scenario.")
+    parser.add_argument("--child", nargs=4, metavar=("FIXTURE", "MINUTES", "CONCURRENCY", "JOBS"), help=argparse.SUPPRESS)
+    parser.add_argument("--email-to", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        fixture, minutes, concurrency, jobs = args.child
+        run_scenario(fixture, float(minutes), int(concurrency), int(jobs), args.email_to)
+        return
+
+    print(f"Preparing fixtures in {args.fixtures_dir}...", file=sys.stderr)
+    fixtures = ensure_fixtures(args.fixtures_dir, args.minutes)
+
+    state = FakeAPIState(
+        profiles={
+            "whisper": ServiceProfile(args.whisper_latency, args.per_minute_latency, args.error_rate),
+            "chat": ServiceProfile(args.chat_latency, 0.0, args.error_rate),
+            "deepgram": ServiceProfile(args.deepgram_latency, args.per_minute_latency, args.error_rate),
+        },
+        segments_per_minute=args.segments_per_minute,
+        summary_tokens=args.summary_tokens,
+        tokens_per_second=args.tokens_per_second,
+    )
+
+    results = []
+    with FakeAPIServer(state) as api, FakeSMTPServer(latency=args.smtp_latency) as smtp, \
+            tempfile.TemporaryDirectory(prefix="meeting_bench_") as workdir:
+        for minutes in args.minutes:
+            for concurrency in args.concurrency:
+                jobs = concurrency * args.jobs_per_caller
+                env = dict(
+                    os.environ,
+                    GROQ_API_KEY="bench", GROQ_BASE_URL=api.base_url,
+                    DEEPGRAM_API_KEY="bench", DEEPGRAM_BASE_URL=api.base_url,
+                    SMTP_SERVER="127.0.0.1", SMTP_PORT=str(smtp.server_port), SMTP_STARTTLS="false",
+                    SENDER_EMAIL="bench@example.com", SENDER_PASSWORD="bench",
+                    JOB_WORKERS=str(args.job_workers or concurrency),
+                    JOB_QUEUE_SIZE=str(max(jobs, 32)),
+                    RESULT_CACHE_DISABLED="true",
+                    # The fakes have no rate limits (see bench_rate_limits.py); the scheduler still runs
+                    GROQ_WHISPER_RPM="0", GROQ_WHISPER_AUDIO_SECONDS_PER_HOUR="0",
+                    GROQ_CHAT_RPM="0", GROQ_CHAT_TPM="0",
+                    PYTHONPATH=REPO_ROOT,
+                )
+                cmd = [sys.executable, os.path.abspath(__file__), "--child",
+                       fixtures[minutes], str(minutes), str(concurrency), str(jobs)]
+                if not args.no_email:
+                    cmd += ["--email-to", "team@example.com,lead@example.com"]
+
+                api_before, smtp_before = api.state.snapshot(), smtp.snapshot()
+                completed = subprocess.run(cmd, cwd=workdir, env=env, text=True, stdout=subprocess.PIPE,
+                                           stderr=None if args.verbose else subprocess.PIPE)
+                if completed.returncode != 0:
+                    sys.stderr.write(completed.stderr or "")
+                    raise SystemExit(f"Scenario {minutes:g} min x {concurrency} failed (exit {completed.returncode})")
+
+                result = json.loads(completed.stdout.strip().splitlines()[-1])
+                api_after = api.state.snapshot()
+                result["services"] = {
+                    name: {key: api_after[name][key] - api_before[name][key] for key in api_after[name]}
+                    for name in api_after
+                }
+                smtp_after = smtp.snapshot()
+                result["services"]["smtp"] = {key: smtp_after[key] - smtp_before[key] for key in smtp_after}
+                results.append(result)
+
+                latency = result["latency"]
+                print(f"{minutes:>6g} min x {concurrency:<3} jobs={result['succeeded']}/{jobs} "
+                      f"p50={latency['p50']}s p95={latency['p95']}s "
+                      f"throughput={result['jobs_per_second']} jobs/s peak={result['peak_rss_mb']} MB",
+                      file=sys.stderr)
+
+    document = {
+        "benchmark": "e2e",
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {
+            "minutes": args.minutes,
+            "concurrency": args.concurrency,
+            "jobs_per_caller": args.jobs_per_caller,
+            "job_workers": args.job_workers,
+            "email": not args.no_email,
+            "smtp_latency": args.smtp_latency,
+            "services": state.config(),
+        },
+        "results": results,
+    }
+    output = json.dumps(document, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+        print(f"Results written to {args.output}", file=sys.stderr)
+    else:
+        print(output)
+
+    if args.baseline:
+        compare(results, args.baseline)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+# benchmarks/bench_live.py
+# Live-mode benchmark against local stand-in services
+# Replays a synthetic meeting through logic.stream_live_audio as microphone chunks
+# (48 kHz stereo by default, like a browser microphone) with the local streaming backend
+# and the fake Groq API, then stops the meeting and measures:
+#   - how long after an utterance is spoken it appears in the live transcript,
+#   - how long after stopping the final summary and PDF are ready,
+#   - how long the upload flow (logic.process_meeting) takes on the same recording.
+#
+# Audio is fed faster than real time (--speed) so long meetings finish quickly. Utterances
+# then queue up for Whisper faster than they would live, so lag is an upper bound;
+# use --speed 1 for a real-time run.
+#
+# Usage:
+#   python benchmarks/bench_live.py
+#   python benchmarks/bench_live.py --minutes 10 30 --speed 20 --summary-interval 5
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import wave
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+from audio_fixtures import ensure_fixtures  # noqa: E402
+from bench_e2e import percentiles  # noqa: E402
+from fake_services import FakeAPIServer, FakeAPIState, ServiceProfile  # noqa: E402
+
+
+def run_scenario(fixture, speed, chunk_seconds, mic_rate):
+    """
+    Child-process entry point: records one live meeting, stops it, then runs the
+    upload flow on the recording, and prints one JSON result line.
+    """
+    import numpy as np
+
+    sys.path.insert(0, REPO_ROOT)
+    import logic
+    from live import live_manager
+
+    with wave.open(fixture, "rb") as wav:
+        pcm = np.frombuffer(wav.readframes(wav.getnframes()), dtype=np.int16)
+    factor = mic_rate // 16000
+    step = int(16000 * chunk_seconds)
+
+    live_id = session_id = None
+    fed_at = []  # (audio seconds fed, wall time)
+    lags, seen = [], 0
+    start = time.perf_counter()
+    for offset in range(0, len(pcm), step):
+        block = np.repeat(pcm[offset:offset + step], factor)
+        chunk = (mic_rate, np.stack([block, block], axis=1))
+        _, _, live_id, session_id = logic.stream_live_audio(chunk, live_id, session_id)
+        now = time.perf_counter()
+        fed_at.append(((offset + step) / 16000, now))
+
+        live = live_manager.get(live_id)
+        for utterance in live.utterances[seen:]:
+            # Wall time since the utterance's last sample was recorded
+            recorded = next(wall for audio, wall in fed_at if audio >= utterance["end"])
+            lags.append(now - recorded)
+        seen = len(live.utterances)
+
+        target = start + (offset + step) / 16000 / speed
+        if target > now:
+            time.sleep(target - now)
+    recorded_seconds = time.perf_counter() - start
+
+    live = live_manager.get(live_id)
+    covered_before_stop = live.summary_until
+    stop_start = time.perf_counter()
+    transcript = summary = pdf_path = None
+    for transcript, summary, pdf_path, _, _, session_id in logic.stop_live_meeting(live_id, session_id):
+        pass
+    stop_to_report = time.perf_counter() - stop_start
+
+    batch_start = time.perf_counter()
+    batch_pdf = None
+    for _, _, batch_pdf, _, _ in logic.process_meeting(live.recording_path, session_id):
+        pass
+    batch_after_end = time.perf_counter() - batch_start
+
+    status = live.to_dict()
+    print(json.dumps({
+        "audio_minutes": round(status["audio_seconds"] / 60, 2),
+        "speed": speed,
+        "recorded_seconds": round(recorded_seconds, 2),
+        "utterances": status["utterances"],
+        "speakers": status["speakers"],
+        "transcript_lines": len(transcript.splitlines()) if transcript else 0,
+        "utterance_lag_seconds": percentiles(lags),
+        "summary_minutes_before_stop": round(covered_before_stop / 60, 2),
+        "stop_to_report_seconds": round(stop_to_report, 3),
+        "report_ok": bool(pdf_path),
+        "upload_flow_after_end_seconds": round(batch_after_end, 3),
+        "upload_flow_ok": bool(batch_pdf),
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Live-mode benchmark with local fake services.")
+    parser.add_argument("--minutes", type=float, nargs="+", default=[10, 30], help="Meeting lengths in minutes.")
+    parser.add_argument("--speed", type=float, default=20, help="Feed audio this many times faster than real time.")
+    parser.add_argument("--chunk-seconds", type=float, default=0.5, help="Microphone chunk length (s).")
+    parser.add_argument("--mic-rate", type=int, default=48000, help="Microphone sample rate (a multiple of 16000).")
+    parser.add_argument("--summary-interval", type=float, default=5, help="LIVE_SUMMARY_INTERVAL_MINUTES.")
+    parser.add_argument("--fixtures-dir", default=os.path.join(tempfile.gettempdir(), "meeting_bench_fixtures"),
+                        help="Where synthetic audio is generated and reused between runs.")
+    parser.add_argument("--whisper-latency", type=float, default=0.3, help="Groq transcription latency (s).")
+    parser.add_argument("--per-minute-latency", type=float, default=0.02, help="Extra transcription latency per audio minute (s).")
+    parser.add_argument("--chat-latency", type=float, default=0.2, help="Groq chat time to first token (s).")
+    parser.add_argument("--tokens-per-second", type=float, default=400, help="Streaming speed of fake completions.")
+    parser.add_argument("--output", help="Write the JSON results here instead of stdout.")
+    parser.add_argument("--verbose", action="store_true", help="Show the pipeline logs of each scenario.")
+    parser.add_argument("--child", nargs=4, metavar=("FIXTURE", "SPEED", "CHUNK", "RATE"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        fixture, speed, chunk_seconds, mic_rate = args.child
+        run_scenario(fixture, float(speed), float(chunk_seconds), int(mic_rate))
+        return
+
+    print(f"Preparing fixtures in {args.fixtures_dir}...", file=sys.stderr)
+    fixtures = ensure_fixtures(args.fixtures_dir, args.minutes)
+    state = FakeAPIState(profiles={
+        "whisper": ServiceProfile(args.whisper_latency, args.per_minute_latency),
+        "chat": ServiceProfile(args.chat_latency),
+        "deepgram": ServiceProfile(args.whisper_latency, args.per_minute_latency),
+    }, tokens_per_second=args.tokens_per_second)
+
+    results = []
+    with FakeAPIServer(state) as api, tempfile.TemporaryDirectory(prefix="meeting_bench_") as workdir:
+        for minutes in args.minutes:
+            env = dict(os.environ, GROQ_API_KEY="bench", GROQ_BASE_URL=api.base_url,
+                       DEEPGRAM_API_KEY="bench", DEEPGRAM_BASE_URL=api.base_url,
+                       LIVE_BACKEND="local", LIVE_SUMMARY_INTERVAL_MINUTES=str(args.summary_interval),
+                       RESULT_CACHE_DISABLED="true", PYTHONPATH=REPO_ROOT)
+            cmd = [sys.executable, os.path.abspath(__file__), "--child", fixtures[minutes],
+                   str(args.speed), str(args.chunk_seconds), str(args.mic_rate)]
+            before = api.state.snapshot()
+            completed = subprocess.run(cmd, cwd=workdir, env=env, text=True, stdout=subprocess.PIPE,
+                                       stderr=None if args.verbose else subprocess.PIPE)
+            if completed.returncode != 0:
+                sys.stderr.write(completed.stderr or "")
+                raise SystemExit(f"Scenario {minutes:g} min failed (exit {completed.returncode})")
+
+            result = json.loads(completed.stdout.strip().splitlines()[-1])
+            after = api.state.snapshot()
+            result["services"] = {name: {key: after[name][key] - before[name][key] for key in after[name]}
+                                  for name in after}
+            results.append(result)
+            print(f"{minutes:>6g} min  lag p50={result['utterance_lag_seconds']['p50']}s "
+                  f"p95={result['utterance_lag_seconds']['p95']}s  "
+                  f"stop->report={result['stop_to_report_seconds']}s  "
+                  f"upload flow={result['upload_flow_after_end_seconds']}s  "
+                  f"speakers={result['speakers']}", file=sys.stderr)
+
+    document = json.dumps({"benchmark": "live", "config": vars(args), "results": results}, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(document + "\n")
+    else:
+        print(document)
+
+
+if __name__ == "__main__":
+    main()
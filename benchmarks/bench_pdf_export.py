@@ -0,0 +1,138 @@
+# benchmarks/bench_pdf_export.py
+# Render-time and peak-memory benchmark for PDF reports
+# Compares the original single multi_cell transcript rendering with the batched,
+# metric-caching renderer in utils/pdf_export.py on synthetic transcripts.
+#
+# Every measurement runs in a fresh subprocess so peak RSS is per render.
+#
+# Usage:
+#   python benchmarks/bench_pdf_export.py
+#   python benchmarks/bench_pdf_export.py --words 10000 100000 500000 --legacy-max 100000
+
+import argparse
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_WORDS = ("we", "should", "ship", "the", "release", "next", "week", "after", "review", "budget",
+          "roadmap", "customer", "feedback", "agreed", "follow", "up", "on", "metrics", "team", "plan",
+          "infrastructure", "migration", "quarterly", "objectives", "onboarding", "documentation")
+
+SUMMARY = """## Executive Summary
+- The team reviewed the release plan and the quarterly objectives.
+
+## Key Decisions
+- Ship the release next week after the final review.
+
+## Action Items
+- Speaker 1 to update the roadmap by Friday.
+
+## Next Steps
+- Follow-up meeting next Tuesday.
+"""
+
+
+def make_transcript(words, speakers=4, seed=0):
+    """
+    Builds a transcript of about `words` words in "Speaker N: text" turns.
+    """
+    rng = random.Random(seed)
+    turns, count = [], 0
+    while count < words:
+        length = rng.randint(3, 90)
+        text = " ".join(rng.choice(_WORDS) for _ in range(length))
+        turns.append(f"Speaker {rng.randrange(speakers)}: {text.capitalize()}.")
+        count += length
+    return "\n".join(turns)
+
+
+def legacy_render(summary, transcript, output_path):
+    """
+    The original export: the whole transcript in one multi_cell call.
+    """
+    from utils.pdf_export import MeetingPDF
+
+    pdf = MeetingPDF()
+    pdf.alias_nb_pages()
+    pdf.add_page()
+    pdf.set_font('helvetica', 'B', 14)
+    pdf.cell(0, 10, "Meeting Summary", ln=True)
+    pdf.set_font('helvetica', '', 11)
+    pdf.multi_cell(0, 7, summary.replace('#', ''))
+    pdf.ln(10)
+    pdf.set_font('helvetica', 'B', 14)
+    pdf.cell(0, 10, "Full Transcript", ln=True)
+    pdf.set_font('helvetica', '', 10)
+    pdf.multi_cell(0, 6, transcript)
+    pdf.output(output_path)
+
+
+def run_render(mode, words, output_path):
+    """
+    Child-process entry point: renders one report and prints time and peak RSS.
+    """
+    import warnings
+
+    sys.path.insert(0, REPO_ROOT)
+    warnings.simplefilter("ignore", DeprecationWarning)
+    from utils.pdf_export import render_pdf
+
+    transcript = make_transcript(words)
+    base_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    if mode == "legacy":
+        legacy_render(SUMMARY, transcript, output_path)
+    else:
+        render_pdf(SUMMARY, transcript, output_path)
+    elapsed = time.perf_counter() - start
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({
+        "seconds": elapsed,
+        "base_mb": base_rss / 1024,
+        "peak_mb": peak_rss / 1024,
+        "pdf_mb": os.path.getsize(output_path) / (1024 * 1024),
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark PDF report rendering.")
+    parser.add_argument("--words", type=int, nargs="+", default=[10000, 50000, 100000, 250000, 500000],
+                        help="Transcript lengths in words.")
+    parser.add_argument("--legacy-max", type=int, default=100000, help="Skip the legacy renderer above this size.")
+    parser.add_argument("--child", nargs=3, metavar=("MODE", "WORDS", "OUTPUT"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        mode, words, output_path = args.child
+        run_render(mode, int(words), output_path)
+        return
+
+    print(f"{'words':>8} {'legacy (s)':>11} {'legacy peak':>12} {'batched (s)':>12} {'batched peak':>13} {'pages MB':>9} {'speedup':>8}")
+    with tempfile.TemporaryDirectory(prefix="pdf_bench_") as tmp:
+        for words in args.words:
+            results = {}
+            modes = ("legacy", "batched") if words <= args.legacy_max else ("batched",)
+            for mode in modes:
+                output_path = os.path.join(tmp, f"{mode}_{words}.pdf")
+                cmd = [sys.executable, os.path.abspath(__file__), "--child", mode, str(words), output_path]
+                output = subprocess.run(cmd, capture_output=True, text=True, check=True, cwd=tmp).stdout
+                results[mode] = json.loads(output.strip().splitlines()[-1])
+
+            batched = results["batched"]
+            legacy = results.get("legacy")
+            legacy_time = f"{legacy['seconds']:.2f}" if legacy else "-"
+            legacy_peak = f"{legacy['peak_mb']:.1f} MB" if legacy else "-"
+            speedup = f"{legacy['seconds'] / batched['seconds']:.1f}x" if legacy else "-"
+            print(f"{words:>8} {legacy_time:>11} {legacy_peak:>12} {batched['seconds']:>12.2f} "
+                  f"{batched['peak_mb']:>10.1f} MB {batched['pdf_mb']:>9.1f} {speedup:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+# benchmarks/bench_rate_limits.py
+# Burst-load benchmark for the rate-limit-aware API scheduler
+# Starts the fake Groq API with requests/tokens/audio-seconds limits (429 + Retry-After when
+# exceeded, like the real service), then fires a burst of meetings at it at once: every
+# meeting transcribes a fixture with Whisper and summarizes the transcript, and one "heavy"
+# meeting uploads many chunks at the same time, as a long recording does.
+#
+# Each mode runs in a fresh subprocess with the same limits configured on both sides:
+#   - scheduled: API_SCHEDULER_ENABLED=true (token buckets, fair queuing, 429 backoff),
+#   - direct:    API_SCHEDULER_ENABLED=false (the SDKs' own retries only).
+# Reported per mode: failed meetings, 429s received, share of each rate limit used over the
+# run (1.0 = every unit the limits allowed), latency of the light meetings next to the heavy
+# one, and scheduler wait times.
+#
+# A second case uploads one long recording (--long-minutes, chunked as usual) against Groq's
+# default limits (20 requests/min, 7200 audio seconds/hour), to check that its chunks are not
+# spread over the hour: the scheduler may wait at most --long-max-wait seconds in total.
+#
+# Exits with 1 if a meeting failed in the scheduled mode (an occasional 429 is fine: the
+# scheduler pauses the lane and retries it) or the long upload waited longer than allowed.
+#
+# Usage:
+#   python benchmarks/bench_rate_limits.py
+#   python benchmarks/bench_rate_limits.py --meetings 60 --heavy-chunks 30 --modes scheduled
+#   python benchmarks/bench_rate_limits.py --long-minutes 0   # burst only
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+from audio_fixtures import ensure_fixtures  # noqa: E402
+from bench_e2e import percentiles  # noqa: E402
+from fake_services import FakeAPIServer, FakeAPIState, ServiceProfile  # noqa: E402
+
+MODES = {"scheduled": "true", "direct": "false"}
+# Limits set from the command line for the burst; the long upload runs with the defaults
+LIMIT_VARIABLES = ("GROQ_WHISPER_RPM", "GROQ_WHISPER_AUDIO_SECONDS_PER_HOUR", "GROQ_CHAT_RPM", "GROQ_CHAT_TPM")
+
+
+def run_burst(fixture, meetings, heavy_chunks):
+    """
+    Child-process entry point: runs the burst and prints one JSON result line.
+    """
+    sys.path.insert(0, REPO_ROOT)
+    import summarization
+    import transcription
+    from utils.api_scheduler import api_scheduler
+    from utils.telemetry import get_stage_stats, propagate, span
+
+    def light(number):
+        started = time.perf_counter()
+        with span("job", job_id=f"light-{number}"):
+            result = transcription.transcribe_audio(fixture)
+            if not isinstance(result, dict):
+                return {"ok": False, "error": result, "latency": time.perf_counter() - started}
+            summary = summarization.summarize_text(result["text"])
+        ok = not summary.startswith("Error")
+        return {"ok": ok, "error": None if ok else summary, "latency": time.perf_counter() - started}
+
+    def heavy():
+        # One meeting uploading its chunks concurrently, all in the same job
+        started = time.perf_counter()
+        with span("job", job_id="heavy"):
+            with ThreadPoolExecutor(max_workers=heavy_chunks) as pool:
+                results = list(pool.map(propagate(lambda _: transcription.transcribe_audio(fixture)),
+                                        range(heavy_chunks)))
+        failed = [result for result in results if not isinstance(result, dict)]
+        return {"ok": not failed, "error": failed[0] if failed else None, "latency": time.perf_counter() - started}
+
+    wall_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=meetings + 1) as pool:
+        heavy_future = pool.submit(heavy) if heavy_chunks else None
+        outcomes = list(pool.map(light, range(meetings)))
+        heavy_outcome = heavy_future.result() if heavy_future else None
+    wall = time.perf_counter() - wall_start
+
+    errors = [outcome["error"] for outcome in outcomes + [heavy_outcome] if outcome and not outcome["ok"]]
+    waits = {stage.split(".", 1)[1]: stats for stage, stats in get_stage_stats().items() if stage.startswith("api_wait.")}
+    print(json.dumps({
+        "wall_seconds": round(wall, 3),
+        "meetings": meetings,
+        "failed": len(errors),
+        "first_error": str(errors[0])[:300] if errors else None,
+        "light_latency": percentiles([outcome["latency"] for outcome in outcomes if outcome["ok"]]),
+        "heavy_latency": round(heavy_outcome["latency"], 3) if heavy_outcome else None,
+        "scheduler_wait": waits,
+        "lanes": api_scheduler.stats(),
+    }))
+
+
+def run_long_upload(fixture):
+    """
+    Child-process entry point: transcribes one long recording (split into chunks uploaded
+    concurrently) and prints one JSON result line.
+    """
+    sys.path.insert(0, REPO_ROOT)
+    import transcription
+    from utils.api_scheduler import api_scheduler
+    from utils.telemetry import get_stage_stats, span
+
+    started = time.perf_counter()
+    with span("job", job_id="long-upload"):
+        result = transcription.transcribe_audio(fixture)
+    wall = time.perf_counter() - started
+
+    waits = {stage.split(".", 1)[1]: stats for stage, stats in get_stage_stats().items() if stage.startswith("api_wait.")}
+    lanes = api_scheduler.stats()
+    print(json.dumps({
+        "wall_seconds": round(wall, 3),
+        "failed": int(not isinstance(result, dict)),
+        "first_error": None if isinstance(result, dict) else str(result)[:300],
+        "requests": sum(lane["requests"] for lane in lanes.values()),
+        "wait_seconds": round(sum(lane["wait_seconds"] for lane in lanes.values()), 3),
+        "scheduler_wait": waits,
+        "lanes": lanes,
+    }))
+
+
+def utilization(profile, usage, wall):
+    """
+    Share of each limit used over the run: units consumed / (one window of burst + refill over the run).
+    """
+    consumed = {"requests": usage["requests"] - usage["rate_limited"], "tokens": usage["tokens"],
+                "audio_seconds": usage["audio_seconds"]}
+    return {unit: round(consumed[unit] / (limit * (1 + wall / window)), 3)
+            for unit, (limit, window) in profile.limits().items()}
+
+
+def run_child(args, api, env, label, *child_args):
+    """
+    Runs one case in a fresh subprocess against `api` and returns its JSON result.
+    """
+    with tempfile.TemporaryDirectory(prefix="rate_limit_bench_") as workdir:
+        env = dict(env, GROQ_API_KEY="bench", GROQ_BASE_URL=api.base_url, RESULT_CACHE_DISABLED="true",
+                   PYTHONPATH=REPO_ROOT)
+        cmd = [sys.executable, os.path.abspath(__file__), *child_args]
+        completed = subprocess.run(cmd, cwd=workdir, env=env, text=True, stdout=subprocess.PIPE,
+                                   stderr=None if args.verbose else subprocess.PIPE)
+    if completed.returncode != 0:
+        sys.stderr.write(completed.stderr or "")
+        raise SystemExit(f"{label} failed (exit {completed.returncode})")
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="API rate-limit burst benchmark with the fake Groq API.")
+    parser.add_argument("--meetings", type=int, default=40, help="Light meetings started at once.")
+    parser.add_argument("--heavy-chunks", type=int, default=40,
+                        help="Concurrent uploads of the heavy meeting (0 = none).")
+    parser.add_argument("--minutes", type=float, default=1, help="Length of the fixture each upload sends.")
+    parser.add_argument("--modes", nargs="+", choices=sorted(MODES), default=["scheduled", "direct"])
+    parser.add_argument("--whisper-rpm", type=float, default=60, help="Whisper requests per minute.")
+    parser.add_argument("--whisper-ash", type=float, default=108000, help="Whisper audio seconds per hour.")
+    parser.add_argument("--chat-rpm", type=float, default=30, help="Chat requests per minute.")
+    parser.add_argument("--chat-tpm", type=float, default=30000, help="Chat tokens per minute.")
+    parser.add_argument("--latency", type=float, default=0.2, help="Fake API latency (s).")
+    parser.add_argument("--long-minutes", type=float, default=120,
+                        help="Length of the recording uploaded in the long-upload case (0 = skip it).")
+    parser.add_argument("--long-max-wait", type=float, default=60,
+                        help="Total scheduler wait allowed for the long upload (s).")
+    parser.add_argument("--fixtures-dir", default=os.path.join(tempfile.gettempdir(), "meeting_bench_fixtures"),
+                        help="Where synthetic audio is generated and reused between runs.")
+    parser.add_argument("--output", help="Write the JSON results here instead of stdout.")
+    parser.add_argument("--verbose", action="store_true", help="Show the pipeline logs of each mode.")
+    parser.add_argument("--child", nargs=3, metavar=("FIXTURE", "MEETINGS", "HEAVY_CHUNKS"), help=argparse.SUPPRESS)
+    parser.add_argument("--child-long", metavar="FIXTURE", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        fixture, meetings, heavy_chunks = args.child
+        run_burst(fixture, int(meetings), int(heavy_chunks))
+        return
+    if args.child_long:
+        run_long_upload(args.child_long)
+        return
+
+    fixtures = ensure_fixtures(args.fixtures_dir, [args.minutes] + ([args.long_minutes] if args.long_minutes else []))
+    base_env = {name: value for name, value in os.environ.items() if name not in LIMIT_VARIABLES}
+    results = {}
+    for mode in args.modes:
+        # A fresh server per mode, so each starts with full rate-limit windows
+        profiles = {
+            "whisper": ServiceProfile(args.latency, rpm=args.whisper_rpm, audio_seconds_per_hour=args.whisper_ash),
+            "chat": ServiceProfile(args.latency, rpm=args.chat_rpm, tpm=args.chat_tpm),
+        }
+        with FakeAPIServer(FakeAPIState(profiles=profiles)) as api:
+            env = dict(
+                base_env,
+                API_SCHEDULER_ENABLED=MODES[mode],
+                GROQ_WHISPER_RPM=str(args.whisper_rpm), GROQ_WHISPER_AUDIO_SECONDS_PER_HOUR=str(args.whisper_ash),
+                GROQ_CHAT_RPM=str(args.chat_rpm), GROQ_CHAT_TPM=str(args.chat_tpm),
+            )
+            result = run_child(args, api, env, f"Mode {mode}", "--child", fixtures[args.minutes],
+                               str(args.meetings), str(args.heavy_chunks))
+            usage = api.state.snapshot()
+
+        result["services"] = {name: {**usage[name], "utilization": utilization(profile, usage[name],
+                                                                               result["wall_seconds"])}
+                              for name, profile in profiles.items()}
+        results[mode] = result
+        rate_limited = sum(service["rate_limited"] for service in result["services"].values())
+        used = ", ".join(f"{name} {unit} {share:.0%}" for name, service in result["services"].items()
+                         for unit, share in service["utilization"].items())
+        print(f"{mode:<10} failed={result['failed']}/{args.meetings + bool(args.heavy_chunks)} "
+              f"429s={rate_limited} wall={result['wall_seconds']:.1f}s "
+              f"light p50={result['light_latency']['p50']}s p95={result['light_latency']['p95']}s "
+              f"heavy={result['heavy_latency']}s  limits used: {used}", file=sys.stderr)
+
+    long_upload = None
+    if args.long_minutes:
+        # Groq's default Whisper limits on both sides (the app's defaults from utils/api_scheduler.py)
+        profile = ServiceProfile(args.latency, rpm=20, audio_seconds_per_hour=7200)
+        with FakeAPIServer(FakeAPIState(profiles={"whisper": profile})) as api:
+            long_upload = run_child(args, api, dict(base_env, API_SCHEDULER_ENABLED="true"), "Long upload",
+                                    "--child-long", fixtures[args.long_minutes])
+            usage = api.state.snapshot()["whisper"]
+        long_upload["service"] = {**usage, "utilization": utilization(profile, usage, long_upload["wall_seconds"])}
+        long_upload["meets_target"] = not long_upload["failed"] and long_upload["wait_seconds"] <= args.long_max_wait
+        print(f"{'long':<10} {args.long_minutes:g} min in {long_upload['requests']} requests, "
+              f"failed={long_upload['failed']} 429s={usage['rate_limited']} wall={long_upload['wall_seconds']:.1f}s "
+              f"waited {long_upload['wait_seconds']:.1f}s (max {args.long_max_wait:g}s): "
+              f"{'ok' if long_upload['meets_target'] else 'THROTTLED'}", file=sys.stderr)
+
+    scheduled = results.get("scheduled")
+    clean = (scheduled is None or scheduled["failed"] == 0) and (long_upload is None or long_upload["meets_target"])
+    document = json.dumps({"benchmark": "rate_limits", "config": vars(args), "results": results,
+                           "long_upload": long_upload, "clean": clean}, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(document + "\n")
+    else:
+        print(document)
+    if not clean:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
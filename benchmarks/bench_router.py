@@ -0,0 +1,185 @@
+# benchmarks/bench_router.py
+# Routing and hedging benchmark for backend_router.BackendRouter with stand-in backends
+# Each scenario routes jobs through a fresh router whose backends only sleep for a set
+# latency, then read the input file (like a real upload) and succeed or fail as configured:
+#   - hedged races where the primary wins, the secondary wins, the primary fails, or both
+#     fail and the rest of the plan takes over,
+#   - one wave of concurrent hedged jobs while one backend's circuit breaker is half-open
+#     (only one of them may get the trial).
+# Every job's input lives in a temporary directory removed from route()'s on_settled
+# callback, as transcription_manager.process_meeting_audio does.
+#
+# Reported per scenario: the backend chosen, route latency percentiles, calls per backend,
+# failures recorded against each backend, and whether the input outlived every call.
+# Exits with 1 if the expected backend does not win most jobs of a scenario (unmeasured
+# backends are tried first, so a delayed hedge may let the other one win a few), penalizes a backend that did not
+# fail, removes the input while a call still needed it, or lets more than one trial
+# through a half-open breaker.
+#
+# Usage:
+#   python benchmarks/bench_router.py
+#   python benchmarks/bench_router.py --jobs 50 --concurrency 8 --hedge-delay 0.05
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, REPO_ROOT)
+sys.path.insert(0, BENCH_DIR)
+
+import backend_router  # noqa: E402
+from backend_router import BackendRouter, BackendStrategy  # noqa: E402
+from bench_e2e import percentiles  # noqa: E402
+
+
+class StubBackend(BackendStrategy):
+    """
+    Sleeps for `latency`, then reads the input and returns a transcript (or None if `ok` is False).
+    """
+
+    def __init__(self, name, priority, latency, ok=True):
+        self.name = name
+        self.priority = priority
+        self.latency = latency
+        self.ok = ok
+        self.calls = 0
+        self.missing_input = 0
+        self._lock = threading.Lock()
+
+    def is_available(self):
+        return True
+
+    def transcribe(self, file_path, offsets=None, waveform=None):
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.latency)
+        if not os.path.exists(file_path):
+            with self._lock:
+                self.missing_input += 1
+            return None
+        with open(file_path, "rb") as f:
+            f.read()
+        return {"text": self.name} if self.ok else None
+
+
+# name -> (backends as (name, latency, ok), expected winner, open the first backend's breaker)
+SCENARIOS = {
+    "hedged_primary_wins": ([("a", 0.05, True), ("b", 0.3, True)], "a", False),
+    "hedged_secondary_wins": ([("a", 0.3, True), ("b", 0.05, True)], "b", False),
+    "hedged_primary_fails": ([("a", 0.02, False), ("b", 0.1, True)], "b", False),
+    "hedged_both_fail": ([("a", 0.02, False), ("b", 0.05, False), ("c", 0.05, True)], "c", False),
+    "half_open_trial": ([("a", 0.3, True), ("b", 0.05, True)], None, True),
+}
+
+
+def run_scenario(name, jobs, concurrency, hedge_delay):
+    specs, expected, half_open = SCENARIOS[name]
+    backends = [StubBackend(backend, priority, latency, ok)
+                for priority, (backend, latency, ok) in enumerate(specs)]
+    router = BackendRouter(backends)
+    if half_open:
+        # The first backend tripped long enough ago that its breaker admits one trial; the
+        # trial outlasts the wave, so every job plans while it is in flight
+        health = router._health[backends[0].name]
+        health.state, health.opened_at = backend_router.OPEN, time.time() - backend_router.ROUTER_BREAKER_COOLDOWN - 1
+        jobs = concurrency
+    barrier = threading.Barrier(min(jobs, concurrency))
+
+    settled = []
+
+    def one_job(_):
+        workdir = tempfile.mkdtemp(prefix="router_bench_")
+        path = os.path.join(workdir, "prepared.wav")
+        with open(path, "wb") as f:
+            f.write(b"\0" * 1024)
+        done = threading.Event()
+        try:
+            barrier.wait(1)
+        except threading.BrokenBarrierError:
+            pass
+
+        def on_settled():
+            shutil.rmtree(workdir, ignore_errors=True)
+            done.set()
+
+        started = time.perf_counter()
+        result, chosen = router.route(path, 1.0, hedge=True, hedge_delay=hedge_delay, on_settled=on_settled)
+        latency = time.perf_counter() - started
+        settled.append(done)
+        return {"chosen": chosen, "ok": bool(result), "latency": latency}
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        outcomes = list(pool.map(one_job, range(jobs)))
+    all_settled = all(done.wait(10) for done in settled)
+
+    state = router.state()["backends"]
+    failing = {spec[0] for spec in specs if not spec[2]}
+    wins = {}
+    for outcome in outcomes:
+        wins[outcome["chosen"]] = wins.get(outcome["chosen"], 0) + 1
+    chosen = sorted(wins, key=str)
+    problems = []
+    if any(not outcome["ok"] for outcome in outcomes):
+        problems.append("a job got no transcript")
+    if expected and wins.get(expected, 0) <= jobs / 2:
+        problems.append(f"wins {wins}, expected mostly {expected}")
+    if not all_settled:
+        problems.append("on_settled was not called for every job")
+    for backend in backends:
+        if backend.missing_input:
+            problems.append(f"{backend.name}: input removed under {backend.missing_input} call(s)")
+        if backend.name not in failing and state[backend.name]["failures"]:
+            problems.append(f"{backend.name}: {state[backend.name]['failures']} failure(s) recorded")
+    if half_open and backends[0].calls > 1:
+        problems.append(f"half-open breaker let {backends[0].calls} trials through")
+
+    return {
+        "jobs": jobs,
+        "chosen": chosen,
+        "wins": {str(name): count for name, count in wins.items()},
+        "latency": percentiles([outcome["latency"] for outcome in outcomes]),
+        "calls": {backend.name: backend.calls for backend in backends},
+        "failures": {name: backend["failures"] for name, backend in state.items()},
+        "breakers": {name: backend["state"] for name, backend in state.items()},
+        "problems": problems,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backend router hedging benchmark with stand-in backends.")
+    parser.add_argument("--jobs", type=int, default=20, help="Jobs routed per scenario.")
+    parser.add_argument("--concurrency", type=int, default=4, help="Jobs routed at the same time.")
+    parser.add_argument("--hedge-delay", type=float, default=0.0, help="Seconds before the second backend starts.")
+    parser.add_argument("--scenarios", nargs="+", choices=sorted(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--output", help="Write the JSON results here instead of stdout.")
+    args = parser.parse_args()
+
+    results = {}
+    for name in args.scenarios:
+        result = results[name] = run_scenario(name, args.jobs, args.concurrency, args.hedge_delay)
+        print(f"{name:<22} wins={result['wins']} p50={result['latency']['p50']}s "
+              f"calls={result['calls']} failures={result['failures']} "
+              f"{'ok' if not result['problems'] else 'FAILED: ' + '; '.join(result['problems'])}", file=sys.stderr)
+
+    clean = not any(result["problems"] for result in results.values())
+    document = json.dumps({"benchmark": "router", "config": vars(args), "results": results, "clean": clean},
+                          indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(document + "\n")
+    else:
+        print(document)
+    if not clean:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+# benchmarks/bench_search.py
+# Indexing and query-latency benchmark for the meeting search index
+# Fills a fresh index (temporary SQLite file) with synthetic meetings from bench_compaction,
+# each with a summary and one decision about a unique code name, then reports:
+#   - indexing: per-meeting add() latency as the index grows, and the file size,
+#   - queries: p50/p95/p99 latency per query type (rare words, common words, phrases,
+#     prefixes, speaker and time filters, no-match OR fallback),
+#   - accuracy: share of "which meeting decided <code name>" queries whose top hit is that meeting.
+# The p95 of every query type is compared with --target-ms.
+#
+# Usage:
+#   python benchmarks/bench_search.py
+#   python benchmarks/bench_search.py --meetings 5000 --minutes 45 --queries 200 --target-ms 100
+
+import argparse
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+from bench_compaction import sample_transcript, TOPICS  # noqa: E402
+from bench_e2e import percentiles  # noqa: E402
+from meeting_index import MeetingIndex  # noqa: E402
+
+CODE_NAMES = ("kestrel", "falcon", "osprey", "harrier", "merlin", "condor", "plover", "avocet")
+
+
+def code_name(index):
+    return f"{CODE_NAMES[index % len(CODE_NAMES)]}{index}"
+
+
+def build_meeting(index, minutes, rng):
+    transcript, facts, _ = sample_transcript(minutes, noise=0.5, seed=index)
+    speaker = rng.choice(transcript.speakers)
+    at = transcript.duration * rng.random()
+    transcript.append(speaker, f"Okay so we decided to move {code_name(index)} to the new cluster next quarter.",
+                      at, at + 4)
+    summary = "\n".join(["## Key Decisions", f"- Move **{code_name(index)}** to the new cluster next quarter"] +
+                        [f"- {fact[0].upper()}{fact[1:]}" for fact in facts[:5]])
+    return transcript, summary
+
+
+def query_plan(meetings, count, rng, now):
+    """
+    Returns {query type: [(query, search kwargs, expected meeting index or None)]}.
+    """
+    picks = [rng.randrange(meetings) for _ in range(count)]
+    return {
+        "code_name": [(f"decided {code_name(i)}", {}, i) for i in picks],
+        "common_words": [(f"the {rng.choice(TOPICS)}", {}, None) for _ in range(count)],
+        "phrase": [(f'"{rng.choice(TOPICS)}" timeline', {}, None) for _ in range(count)],
+        "prefix": [(f"{code_name(i)[:-1]}*", {}, None) for i in picks],
+        "speaker_filter": [(rng.choice(TOPICS), {"speaker": f"Speaker {rng.randrange(4)}"}, None) for _ in range(count)],
+        "time_filter": [(f"review {rng.choice(TOPICS)}", {"since": now - 7 * 86400}, None) for _ in range(count)],
+        "or_fallback": [(f"{code_name(i)} zeppelin", {}, i) for i in picks],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Meeting search index benchmark.")
+    parser.add_argument("--meetings", type=int, default=2000, help="Meetings in the index.")
+    parser.add_argument("--minutes", type=float, default=30, help="Length of each synthetic meeting.")
+    parser.add_argument("--queries", type=int, default=100, help="Queries per query type.")
+    parser.add_argument("--target-ms", type=float, default=100, help="p95 query latency target.")
+    parser.add_argument("--seed", type=int, default=5, help="Random seed.")
+    parser.add_argument("--output", help="Write the JSON results here instead of stdout.")
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+    logging.getLogger("MeetingIndex").setLevel(logging.WARNING)  # one line per added meeting otherwise
+
+    with tempfile.TemporaryDirectory(prefix="search_bench_") as workdir:
+        index = MeetingIndex(os.path.join(workdir, "index.sqlite3"))
+        now = time.time()
+        add_seconds = []
+        passages = 0
+        for number in range(args.meetings):
+            transcript, summary = build_meeting(number, args.minutes, rng)
+            passages += len(transcript)
+            # Spread the meetings over the last year, oldest first
+            created_at = now - (args.meetings - number) / args.meetings * 365 * 86400
+            started = time.perf_counter()
+            index.add(transcript, summary, meeting_id=f"m{number}", title=f"Meeting {number}", created_at=created_at)
+            add_seconds.append(time.perf_counter() - started)
+            if (number + 1) % max(1, args.meetings // 10) == 0:
+                print(f"  indexed {number + 1}/{args.meetings} meetings", file=sys.stderr)
+        stats = index.stats()
+        last_tenth = add_seconds[-max(1, len(add_seconds) // 10):]
+        indexing = {
+            "meetings": stats["meetings"],
+            "passages": stats["passages"],
+            "bytes": stats["bytes"],
+            "total_seconds": round(sum(add_seconds), 2),
+            "add_ms": {key: round(value * 1000, 2) for key, value in percentiles(add_seconds).items()},
+            # Incremental updates once the index is large
+            "add_ms_last_10pct": {key: round(value * 1000, 2) for key, value in percentiles(last_tenth).items()},
+        }
+        print(f"indexed {stats['meetings']} meetings / {stats['passages']} passages in "
+              f"{indexing['total_seconds']}s ({stats['bytes'] / 1e6:.0f} MB), add p50="
+              f"{indexing['add_ms_last_10pct']['p50']}ms when full", file=sys.stderr)
+
+        queries = {}
+        for name, plan in query_plan(args.meetings, args.queries, rng, now).items():
+            latencies, correct, expected = [], 0, 0
+            for query, kwargs, target in plan:
+                started = time.perf_counter()
+                hits = index.search(query, **kwargs)
+                latencies.append(time.perf_counter() - started)
+                if target is not None:
+                    expected += 1
+                    correct += bool(hits) and hits[0].meeting_id == f"m{target}"
+            summary = {key: round(value * 1000, 2) for key, value in percentiles(latencies).items()}
+            queries[name] = {"ms": summary, "top1_accuracy": round(correct / expected, 4) if expected else None,
+                             "meets_target": summary["p95"] <= args.target_ms}
+            accuracy = f"  top-1 {correct / expected:.0%}" if expected else ""
+            print(f"  {name:<15} p50={summary['p50']:>7.2f}ms p95={summary['p95']:>7.2f}ms "
+                  f"p99={summary['p99']:>7.2f}ms{accuracy}", file=sys.stderr)
+
+    meets_target = all(result["meets_target"] for result in queries.values())
+    print(f"query p95 target {args.target_ms:g}ms: {'met' if meets_target else 'MISSED'}", file=sys.stderr)
+    document = json.dumps({"benchmark": "search", "config": vars(args),
+                           "results": {"indexing": indexing, "queries": queries, "meets_target": meets_target}},
+                          indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(document + "\n")
+    else:
+        print(document)
+    if not meets_target:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+# benchmarks/bench_startup.py
+# Cold-start benchmark and import-time profile
+# 1. Import profile: runs `python -X importtime -c "import logic"` in a fresh interpreter,
+#    reports the total, the slowest modules (cumulative) and which heavy SDKs were loaded.
+#    Nothing heavy (groq, deepgram, httpx, fpdf, pyannote, torch) should load before first use.
+# 2. Time to port bound: starts `python app.py` on a free port and polls until the port
+#    accepts connections, which is what platform health checks wait for. Each run is a
+#    cold process; the p50 is compared with --target-seconds.
+#
+# Usage:
+#   python benchmarks/bench_startup.py
+#   python benchmarks/bench_startup.py --runs 5 --target-seconds 6 --module logic --top 15
+#   python benchmarks/bench_startup.py --repo /path/to/other/checkout   # compare another tree
+
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+from bench_e2e import percentiles  # noqa: E402
+
+HEAVY_MODULES = ("groq", "deepgram", "httpx", "fpdf", "pyannote", "torch", "numpy", "sendgrid")
+
+
+def _env(repo, **extra):
+    return dict(os.environ, PYTHONPATH=repo, METRICS_PORT="0", GRADIO_ANALYTICS_ENABLED="False", **extra)
+
+
+def import_profile(repo, module, top):
+    """
+    Imports `module` in a fresh interpreter and returns its import-time profile.
+    """
+    code = (f"import sys, json; import {module}; "
+            f"print(json.dumps(sorted(m for m in {HEAVY_MODULES!r} if m in sys.modules)))")
+    completed = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=tempfile.gettempdir(),
+                               env=_env(repo), text=True, capture_output=True, check=True)
+    rows = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        try:
+            rows.append((int(cumulative) / 1e6, name.rstrip()))
+        except ValueError:
+            continue  # the header line
+    total = next((seconds for seconds, name in rows if name.strip() == module), None)
+    slowest = sorted(rows, reverse=True)[:top]
+    return {
+        "module": module,
+        "seconds": round(total, 4) if total is not None else None,
+        "heavy_modules_loaded": json.loads(completed.stdout.strip().splitlines()[-1]),
+        "slowest": [{"module": name.strip(), "depth": (len(name) - len(name.lstrip())) // 2,
+                     "seconds": round(seconds, 4)} for seconds, name in slowest],
+    }
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def time_to_port(repo, timeout):
+    """
+    Starts app.py and returns the seconds until its port accepts connections.
+    """
+    port = _free_port()
+    with tempfile.TemporaryDirectory(prefix="startup_bench_") as workdir:
+        started = time.perf_counter()
+        process = subprocess.Popen([sys.executable, os.path.join(repo, "app.py")], cwd=workdir,
+                                   env=_env(repo, PORT=str(port)), stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        try:
+            while time.perf_counter() - started < timeout:
+                try:
+                    socket.create_connection(("127.0.0.1", port), timeout=0.05).close()
+                    return time.perf_counter() - started
+                except OSError:
+                    if process.poll() is not None:
+                        raise RuntimeError(f"app.py exited early:\n{process.stderr.read().decode()[-2000:]}")
+                    time.sleep(0.01)
+            raise RuntimeError(f"app.py did not bind port {port} within {timeout}s")
+        finally:
+            process.terminate()
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+            process.stderr.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold-start benchmark and import-time profile.")
+    parser.add_argument("--repo", default=REPO_ROOT, help="Checkout to measure (default: this one).")
+    parser.add_argument("--module", default="logic", help="Module whose import is profiled.")
+    parser.add_argument("--top", type=int, default=10, help="Slowest modules listed in the profile.")
+    parser.add_argument("--runs", type=int, default=5, help="Cold starts of app.py.")
+    parser.add_argument("--target-seconds", type=float, default=6.0, help="Time-to-port-bound target (p50).")
+    parser.add_argument("--timeout", type=float, default=60, help="Give up on a start after this many seconds.")
+    parser.add_argument("--skip-app", action="store_true", help="Only profile imports (e.g. without Gradio installed).")
+    parser.add_argument("--output", help="Write the JSON results here instead of stdout.")
+    args = parser.parse_args()
+    repo = os.path.abspath(args.repo)
+
+    profile = import_profile(repo, args.module, args.top)
+    print(f"import {args.module}: {profile['seconds']}s, heavy modules loaded: "
+          f"{', '.join(profile['heavy_modules_loaded']) or 'none'}", file=sys.stderr)
+    for row in profile["slowest"]:
+        print(f"  {row['seconds']:>8.4f}s  {'  ' * row['depth']}{row['module']}", file=sys.stderr)
+
+    result = {"import_profile": profile}
+    if not args.skip_app:
+        starts = [time_to_port(repo, args.timeout) for _ in range(args.runs)]
+        summary = percentiles(starts)
+        result["time_to_port"] = {"runs": [round(value, 3) for value in starts], **summary,
+                                  "target_seconds": args.target_seconds,
+                                  "meets_target": summary["p50"] <= args.target_seconds}
+        print(f"time to port bound: p50={summary['p50']}s p95={summary['p95']}s "
+              f"(target {args.target_seconds}s: {'met' if result['time_to_port']['meets_target'] else 'MISSED'})",
+              file=sys.stderr)
+
+    document = json.dumps({"benchmark": "startup", "config": vars(args), "results": result}, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(document + "\n")
+    else:
+        print(document)
+    if not args.skip_app and not result["time_to_port"]["meets_target"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
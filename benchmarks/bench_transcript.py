@@ -0,0 +1,137 @@
+# benchmarks/bench_transcript.py
+# Memory and serialization benchmark for the compact Transcript
+# Builds synthetic meetings of a few hours and compares what the pipeline keeps per
+# meeting before and after utils/transcript.py:
+#   - baseline: a list of segment dicts plus the newline-joined "Speaker: text" string,
+#   - compact: one Transcript (typed arrays + a single text buffer).
+# Memory is what stays allocated after building (tracemalloc), and every serializer
+# (text, JSON, SRT, WebVTT, pickle for the PDF worker) is timed on the compact form.
+#
+# Usage:
+#   python benchmarks/bench_transcript.py
+#   python benchmarks/bench_transcript.py --hours 1 3 --turns-per-minute 12
+
+import argparse
+import json
+import os
+import pickle
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.transcript import Transcript  # noqa: E402
+
+WORDS = ("we should ship the release next week once the migration is done and the "
+         "dashboards look fine so please review the budget numbers before friday").split()
+
+
+def synthetic_turns(hours, turns_per_minute, speakers, seed=7):
+    """
+    Returns (speaker, start, end, text) turns covering `hours` of meeting.
+    """
+    rng = random.Random(seed)
+    turns, clock = [], 0.0
+    for _ in range(int(hours * 60 * turns_per_minute)):
+        length = rng.uniform(1.5, 60.0 / turns_per_minute * 1.6)
+        text = " ".join(rng.choice(WORDS) for _ in range(max(2, int(length * 2.5))))
+        turns.append((f"Speaker {rng.randrange(speakers)}", round(clock, 3), round(clock + length, 3), text))
+        clock += length + rng.uniform(0.1, 0.8)
+    return turns
+
+
+def build_baseline(turns):
+    segments = [{"speaker": speaker, "start": start, "end": end, "text": text}
+                for speaker, start, end, text in turns]
+    return segments, "\n".join(f"{s['speaker']}: {s['text']}" for s in segments)
+
+
+def build_compact(turns):
+    transcript = Transcript()
+    for speaker, start, end, text in turns:
+        transcript.append(speaker, text, start, end)
+    transcript.to_text(0, 0)  # joins the buffer, as the first reader would
+    return transcript
+
+
+def retained_bytes(builder, turns):
+    """
+    Bytes still allocated after builder(turns) returns (fresh copies of the input strings,
+    so nothing is shared with the source list).
+    """
+    turns = [(speaker, start, end, "".join(list(text))) for speaker, start, end, text in turns]
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = builder(turns)
+    del turns
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return after - before
+
+
+def time_call(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        output = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, output
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Transcript memory and serialization benchmark.")
+    parser.add_argument("--hours", type=float, nargs="+", default=[1, 3], help="Meeting lengths in hours.")
+    parser.add_argument("--turns-per-minute", type=float, default=12, help="Speaker turns per minute of audio.")
+    parser.add_argument("--speakers", type=int, default=6, help="Distinct speakers.")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing repetitions (best is reported).")
+    parser.add_argument("--output", help="Write the JSON results here instead of stdout.")
+    args = parser.parse_args()
+
+    results = []
+    for hours in args.hours:
+        turns = synthetic_turns(hours, args.turns_per_minute, args.speakers)
+        text_bytes = sum(len(text) for _, _, _, text in turns)
+        baseline = retained_bytes(build_baseline, turns)
+        compact = retained_bytes(build_compact, turns)
+
+        transcript = build_compact(turns)
+        legacy_text = build_baseline(turns)[1]
+        timings = {}
+        for name, fn in (("text", transcript.to_text), ("json", transcript.to_json), ("srt", transcript.to_srt),
+                         ("vtt", transcript.to_vtt), ("pickle", lambda: pickle.dumps(transcript))):
+            seconds, output = time_call(fn, args.repeat)
+            timings[name] = {"seconds": round(seconds, 5), "bytes": len(output)}
+        assert transcript.to_text() == legacy_text, "Transcript text differs from the legacy string"
+        build_seconds, _ = time_call(lambda: build_compact(turns), args.repeat)
+
+        result = {
+            "hours": hours,
+            "turns": len(turns),
+            "text_bytes": text_bytes,
+            "baseline_bytes": baseline,
+            "compact_bytes": compact,
+            "baseline_kb_per_hour": round(baseline / hours / 1024, 1),
+            "compact_kb_per_hour": round(compact / hours / 1024, 1),
+            "reduction": round(1 - compact / baseline, 3),
+            "build_seconds": round(build_seconds, 5),
+            "serialize": timings,
+        }
+        results.append(result)
+        print(f"{hours:>5g} h  {len(turns):>6} turns  baseline={result['baseline_kb_per_hour']} KB/h  "
+              f"compact={result['compact_kb_per_hour']} KB/h  (-{result['reduction']:.0%})  "
+              f"json={timings['json']['seconds'] * 1000:.1f}ms  srt={timings['srt']['seconds'] * 1000:.1f}ms",
+              file=sys.stderr)
+
+    document = json.dumps({"benchmark": "transcript", "config": vars(args), "results": results}, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(document + "\n")
+    else:
+        print(document)
+
+
+if __name__ == "__main__":
+    main()
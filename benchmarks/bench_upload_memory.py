@@ -0,0 +1,135 @@
+# benchmarks/bench_upload_memory.py
+# Peak-memory benchmark for audio uploads
+# Uploads files of increasing size to a local sink server through the real Groq and
+# Deepgram SDK clients, once with the old buffered body (file.read()) and once with
+# the streamed body used by the pipeline, and reports the peak RSS of each upload.
+#
+# Every measurement runs in a fresh subprocess so peaks do not leak between runs.
+#
+# Usage:
+#   python benchmarks/bench_upload_memory.py
+#   python benchmarks/bench_upload_memory.py --sizes 50 200 500 --mmap
+
+import argparse
+import http.server
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class SinkHandler(http.server.BaseHTTPRequestHandler):
+    """
+    Accepts any POST, discards the body and answers with a minimal JSON payload.
+    """
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        if self.headers.get("Transfer-Encoding", "").lower() == "chunked":
+            while True:
+                size = int(self.rfile.readline().split(b";")[0].strip(), 16)
+                if size == 0:
+                    self.rfile.readline()
+                    break
+                remaining = size
+                while remaining:
+                    remaining -= len(self.rfile.read(min(remaining, 1 << 20)))
+                self.rfile.readline()
+        else:
+            remaining = int(self.headers.get("Content-Length", 0))
+            while remaining:
+                remaining -= len(self.rfile.read(min(remaining, 1 << 20)))
+
+        body = json.dumps({"text": "", "segments": []}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def run_upload(backend, mode, file_path, port, use_mmap):
+    """
+    Child-process entry point: performs one upload and prints peak RSS in MB.
+    """
+    sys.path.insert(0, REPO_ROOT)
+    base_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    if backend == "groq":
+        from groq import Groq
+        client = Groq(api_key="bench", base_url=f"http://127.0.0.1:{port}", max_retries=0)
+        with open(file_path, "rb") as f:
+            payload = f.read() if mode == "buffered" else f
+            client.audio.transcriptions.create(file=("audio.wav", payload), model="bench")
+    else:
+        from deepgram import DeepgramClient
+        from deepgram.environment import DeepgramClientEnvironment
+        from utils.audio_io import FileChunkStream
+        environment = DeepgramClientEnvironment(
+            base=f"http://127.0.0.1:{port}", production="ws://127.0.0.1", agent="ws://127.0.0.1")
+        client = DeepgramClient(api_key="bench", environment=environment)
+        if mode == "buffered":
+            with open(file_path, "rb") as f:
+                payload = f.read()
+        else:
+            payload = FileChunkStream(file_path, use_mmap=use_mmap)
+        try:
+            client.listen.v1.media.transcribe_file(request=payload, model="nova-2")
+        except Exception:
+            # The sink's reply is not a full Deepgram response; the upload itself is what we measure
+            pass
+
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({"base_mb": base_rss / 1024, "peak_mb": peak_rss / 1024}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark peak RSS of audio uploads.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[50, 200, 500], help="File sizes in MB.")
+    parser.add_argument("--mmap", action="store_true", help="Stream Deepgram uploads from a memory-mapped file (mapped pages count towards RSS).")
+    parser.add_argument("--child", nargs=4, metavar=("BACKEND", "MODE", "FILE", "PORT"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        backend, mode, file_path, port = args.child
+        run_upload(backend, mode, file_path, int(port), args.mmap)
+        return
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), SinkHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    port = server.server_port
+
+    print(f"{'backend':>9} {'size (MB)':>10} {'buffered peak (MB)':>19} {'streamed peak (MB)':>19}")
+    with tempfile.TemporaryDirectory(prefix="upload_bench_") as tmp:
+        for size in args.sizes:
+            file_path = os.path.join(tmp, f"audio_{size}mb.wav")
+            # Write in 1 MB blocks: the parent's own peak RSS is inherited by the
+            # forked children, so it must stay small for the measurements to be fair.
+            block = os.urandom(1024 * 1024)
+            with open(file_path, "wb") as f:
+                for _ in range(size):
+                    f.write(block)
+
+            for backend in ("groq", "deepgram"):
+                peaks = {}
+                for mode in ("buffered", "streamed"):
+                    cmd = [sys.executable, os.path.abspath(__file__), "--child", backend, mode, file_path, str(port)]
+                    if args.mmap:
+                        cmd.append("--mmap")
+                    output = subprocess.run(cmd, capture_output=True, text=True, check=True).stdout
+                    peaks[mode] = json.loads(output.strip().splitlines()[-1])["peak_mb"]
+                print(f"{backend:>9} {size:>10} {peaks['buffered']:>19.1f} {peaks['streamed']:>19.1f}")
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
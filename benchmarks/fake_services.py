@@ -0,0 +1,570 @@
+# benchmarks/fake_services.py
+# Local stand-in servers for the external services used by the pipeline
+# This file contains:
+# 1. A fake HTTP API that answers Groq transcription and chat-completion requests
+#    (including streamed completions) and Deepgram's prerecorded /v1/listen endpoint.
+# 2. A fake SMTP server that accepts and counts messages from utils/email_sender.py.
+#
+# Latency, error rate, payload size and rate limits are configurable per service, so
+# benchmarks can measure the pipeline itself without spending API credits. Rate-limited
+# requests get a 429 with Retry-After and Groq's x-ratelimit-* headers, like the real APIs.
+#
+# Point the app at them with:
+#   GROQ_BASE_URL=http://127.0.0.1:<port>  DEEPGRAM_BASE_URL=http://127.0.0.1:<port>
+#   SMTP_SERVER=127.0.0.1  SMTP_PORT=<smtp port>  SMTP_STARTTLS=false
+
+import http.server
+import json
+import random
+import socketserver
+import threading
+import time
+import uuid
+from urllib.parse import urlparse, parse_qs
+
+# The synthetic fixtures are 16 kHz mono 16-bit PCM, so the upload size gives the duration
+BYTES_PER_AUDIO_SECOND = 32000
+
+
+class ServiceProfile:
+    """
+    Behaviour of one fake endpoint.
+
+    Args:
+        latency (float): Fixed seconds before responding (time to first token for streams).
+        latency_per_minute (float): Extra seconds per minute of uploaded audio.
+        error_rate (float): Probability in [0, 1] of answering with `error_status`.
+        error_status (int): HTTP status used for injected failures.
+        rpm (float): Requests per minute before answering 429 (0 = unlimited).
+        tpm (float): Tokens per minute (chat: prompt + completion) before answering 429.
+        audio_seconds_per_hour (float): Audio seconds per hour (Whisper, at least 10 s per request).
+        max_concurrent (int): Requests handled at once before answering 429 (Deepgram).
+    """
+
+    def __init__(self, latency=0.0, latency_per_minute=0.0, error_rate=0.0, error_status=500,
+                 rpm=0.0, tpm=0.0, audio_seconds_per_hour=0.0, max_concurrent=0):
+        self.latency = latency
+        self.latency_per_minute = latency_per_minute
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.rpm = rpm
+        self.tpm = tpm
+        self.audio_seconds_per_hour = audio_seconds_per_hour
+        self.max_concurrent = max_concurrent
+
+    def limits(self):
+        """
+        Returns {unit: (limit, window seconds)} for the enabled limits.
+        """
+        limits = {"requests": (self.rpm, 60), "tokens": (self.tpm, 60),
+                  "audio_seconds": (self.audio_seconds_per_hour, 3600)}
+        return {unit: (limit, window) for unit, (limit, window) in limits.items() if limit > 0}
+
+    def to_dict(self):
+        return dict(self.__dict__)
+
+
+class _Window:
+    """
+    Server-side token bucket holding one window (a minute or an hour) of a limit, refilled continuously.
+    """
+
+    def __init__(self, limit, window):
+        self.limit = limit
+        self.window = window
+        self.level = limit
+        self.updated = time.monotonic()
+
+    def refill(self, now):
+        self.level = min(self.limit, self.level + (now - self.updated) * self.limit / self.window)
+        self.updated = now
+
+    def shortfall_seconds(self, amount):
+        # A request larger than the whole window is admitted once the window is full
+        needed = min(amount, self.limit)
+        return 0.0 if self.level >= needed else (needed - self.level) * self.window / self.limit
+
+
+class FakeAPIState:
+    """
+    Configuration and counters shared by all request handlers of one fake API server.
+
+    Args:
+        profiles (dict): ServiceProfile per service ("whisper", "chat", "deepgram").
+        segments_per_minute (int): Transcript segments returned per minute of audio.
+        words_per_segment (int): Words in each returned segment.
+        summary_tokens (int): Approximate length of each generated summary.
+        tokens_per_second (float): Streaming speed of chat completions.
+        seed (int): Seed for error injection and generated text.
+    """
+
+    def __init__(self, profiles=None, segments_per_minute=12, words_per_segment=14,
+                 summary_tokens=400, tokens_per_second=400.0, seed=0):
+        self.profiles = {name: ServiceProfile() for name in ("whisper", "chat", "deepgram")}
+        self.profiles.update(profiles or {})
+        self.segments_per_minute = segments_per_minute
+        self.words_per_segment = words_per_segment
+        self.summary_tokens = summary_tokens
+        self.tokens_per_second = tokens_per_second
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.stats = {name: {"requests": 0, "errors": 0, "rate_limited": 0, "bytes_in": 0, "bytes_out": 0,
+                             "tokens": 0, "audio_seconds": 0.0} for name in self.profiles}
+        self._windows = {name: {unit: _Window(limit, window) for unit, (limit, window) in profile.limits().items()}
+                         for name, profile in self.profiles.items()}
+        self._in_flight = {name: 0 for name in self.profiles}
+
+    def admit(self, service, cost):
+        """
+        Charges `cost` ({unit: amount}, plus one request) against the service's limits.
+
+        Returns:
+            tuple: (retry_after or None if admitted, rate-limit headers). Admitted
+            requests must call finish() when done.
+        """
+        profile = self.profiles[service]
+        cost = {"requests": 1, **cost}
+        now = time.monotonic()
+        with self._lock:
+            windows = self._windows[service]
+            for window in windows.values():
+                window.refill(now)
+            retry_after = max([windows[unit].shortfall_seconds(cost.get(unit, 0)) for unit in windows], default=0.0)
+            if not retry_after and profile.max_concurrent and self._in_flight[service] >= profile.max_concurrent:
+                retry_after = max(profile.latency, 0.1)
+            if not retry_after:
+                for unit, window in windows.items():
+                    window.level -= cost.get(unit, 0)
+                self._in_flight[service] += 1
+                self.stats[service]["tokens"] += cost.get("tokens", 0)
+                self.stats[service]["audio_seconds"] += cost.get("audio_seconds", 0)
+            headers = {}
+            for unit, header in (("requests", "requests"), ("tokens", "tokens"), ("audio_seconds", "audio-seconds")):
+                if unit in windows:
+                    headers[f"x-ratelimit-limit-{header}"] = f"{windows[unit].limit:g}"
+                    headers[f"x-ratelimit-remaining-{header}"] = f"{max(0.0, windows[unit].level):.0f}"
+            if retry_after:
+                self.stats[service]["rate_limited"] += 1
+                headers["retry-after"] = f"{retry_after:.3f}"
+                return retry_after, headers
+            return None, headers
+
+    def finish(self, service):
+        with self._lock:
+            self._in_flight[service] -= 1
+
+    def should_fail(self, service):
+        profile = self.profiles[service]
+        with self._lock:
+            return profile.error_rate > 0 and self._random.random() < profile.error_rate
+
+    def record(self, service, bytes_in=0, bytes_out=0, error=False):
+        with self._lock:
+            entry = self.stats[service]
+            entry["requests"] += 1
+            entry["errors"] += int(error)
+            entry["bytes_in"] += bytes_in
+            entry["bytes_out"] += bytes_out
+
+    def snapshot(self):
+        with self._lock:
+            return json.loads(json.dumps(self.stats))
+
+    def config(self):
+        return {
+            "profiles": {name: profile.to_dict() for name, profile in self.profiles.items()},
+            "segments_per_minute": self.segments_per_minute,
+            "words_per_segment": self.words_per_segment,
+            "summary_tokens": self.summary_tokens,
+            "tokens_per_second": self.tokens_per_second,
+        }
+
+
+# Groq bills every Whisper request as at least this many seconds of audio
+_MIN_BILLED_SECONDS = 10
+
+
+_WORDS = ("we", "should", "ship", "the", "release", "next", "week", "after", "review", "budget",
+          "roadmap", "customer", "feedback", "agreed", "follow", "up", "on", "metrics", "team", "plan")
+
+
+def _sentence(rng, words):
+    return " ".join(rng.choice(_WORDS) for _ in range(words)).capitalize() + "."
+
+
+def _summary_text(tokens, seed):
+    rng = random.Random(seed)
+    sections = ("## Executive Summary", "## Key Decisions", "## Action Items", "## Next Steps")
+    per_section = max(1, tokens // (len(sections) * 12))
+    parts = []
+    for heading in sections:
+        parts.append(heading)
+        parts.extend(f"- {_sentence(rng, 10)}" for _ in range(per_section))
+        parts.append("")
+    return "\n".join(parts)
+
+
+class FakeAPIHandler(http.server.BaseHTTPRequestHandler):
+    """
+    Routes Groq (/openai/v1/...) and Deepgram (/v1/listen) requests to their fakes.
+    """
+    protocol_version = "HTTP/1.1"
+
+    @property
+    def state(self):
+        return self.server.state
+
+    def log_message(self, *args):
+        pass
+
+    def _read_body(self):
+        if self.headers.get("Transfer-Encoding", "").lower() == "chunked":
+            body = bytearray()
+            while True:
+                size = int(self.rfile.readline().split(b";")[0].strip(), 16)
+                if size == 0:
+                    self.rfile.readline()
+                    return bytes(body)
+                body += self.rfile.read(size)
+                self.rfile.readline()
+        return self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+    def _send_json(self, status, payload, headers=None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+        return len(body)
+
+    def _inject_failure(self, service, bytes_in):
+        if not self.state.should_fail(service):
+            return False
+        profile = self.state.profiles[service]
+        sent = self._send_json(profile.error_status, {"error": {"message": "Injected failure", "type": "server_error"}})
+        self.state.record(service, bytes_in, sent, error=True)
+        return True
+
+    def _admit(self, service, bytes_in, cost):
+        """
+        Returns the rate-limit headers of an admitted request, or None after answering 429.
+        """
+        retry_after, headers = self.state.admit(service, cost)
+        if retry_after is None:
+            return headers
+        sent = self._send_json(429, {"error": {
+            "message": f"Rate limit reached, please try again in {retry_after:.2f}s",
+            "type": "tokens", "code": "rate_limit_exceeded"}}, headers)
+        # Counted under "rate_limited" by admit(), not as an injected error
+        self.state.record(service, bytes_in, sent)
+        return None
+
+    def _wait(self, service, audio_minutes=0.0):
+        profile = self.state.profiles[service]
+        delay = profile.latency + profile.latency_per_minute * audio_minutes
+        if delay > 0:
+            time.sleep(delay)
+
+    def do_POST(self):
+        path = urlparse(self.path).path
+        body = self._read_body()
+        if path.endswith("/audio/transcriptions"):
+            self._whisper(body)
+        elif path.endswith("/chat/completions"):
+            self._chat(body)
+        elif path.endswith("/v1/listen"):
+            self._deepgram(body)
+        else:
+            self._send_json(404, {"error": {"message": f"Unknown endpoint {path}"}})
+
+    def _segments(self, audio_minutes, seed):
+        rng = random.Random(seed)
+        duration = audio_minutes * 60
+        count = max(1, int(audio_minutes * self.state.segments_per_minute))
+        step = duration / count if duration else 1.0
+        segments = []
+        for index in range(count):
+            start = index * step
+            segments.append({
+                "start": round(start, 3),
+                "end": round(start + step * 0.9, 3),
+                "text": _sentence(rng, self.state.words_per_segment),
+                "speaker": index % 3,
+            })
+        return segments
+
+    def _whisper(self, body):
+        if self._inject_failure("whisper", len(body)):
+            return
+        audio_minutes = len(body) / BYTES_PER_AUDIO_SECOND / 60
+        headers = self._admit("whisper", len(body), {"audio_seconds": max(_MIN_BILLED_SECONDS, audio_minutes * 60)})
+        if headers is None:
+            return
+        try:
+            self._wait("whisper", audio_minutes)
+            self._whisper_response(body, audio_minutes, headers)
+        finally:
+            self.state.finish("whisper")
+
+    def _whisper_response(self, body, audio_minutes, headers):
+
+        segments, words = [], []
+        for index, segment in enumerate(self._segments(audio_minutes, len(body))):
+            tokens = segment["text"].split()
+            word_step = (segment["end"] - segment["start"]) / len(tokens)
+            for position, token in enumerate(tokens):
+                start = segment["start"] + position * word_step
+                words.append({"word": token, "start": round(start, 3), "end": round(start + word_step, 3)})
+            segments.append({
+                "id": index, "seek": 0, "start": segment["start"], "end": segment["end"],
+                "text": " " + segment["text"], "tokens": [], "temperature": 0.0,
+                "avg_logprob": -0.2, "compression_ratio": 1.2, "no_speech_prob": 0.01,
+            })
+        payload = {
+            "text": " ".join(segment["text"].strip() for segment in segments),
+            "language": "en",
+            "duration": audio_minutes * 60,
+            "segments": segments,
+            "words": words,
+            "x_groq": {"id": uuid.uuid4().hex},
+        }
+        sent = self._send_json(200, payload, headers)
+        self.state.record("whisper", len(body), sent)
+
+    def _chat(self, body):
+        if self._inject_failure("chat", len(body)):
+            return
+        request = json.loads(body or b"{}")
+        prompt_tokens = sum(len(message.get("content", "")) for message in request.get("messages", [])) // 4 + 1
+        tokens = min(self.state.summary_tokens, request.get("max_tokens") or self.state.summary_tokens)
+        text = _summary_text(tokens, prompt_tokens)
+        completion_tokens = len(text) // 4 + 1
+        usage = {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                 "total_tokens": prompt_tokens + completion_tokens}
+        headers = self._admit("chat", len(body), {"tokens": usage["total_tokens"]})
+        if headers is None:
+            return
+        try:
+            self._wait("chat")
+            self._chat_response(body, request, text, usage, headers)
+        finally:
+            self.state.finish("chat")
+
+    def _chat_response(self, body, request, text, usage, headers):
+        completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+        model = request.get("model", "fake")
+        if not request.get("stream"):
+            sent = self._send_json(200, {
+                "id": completion_id, "object": "chat.completion", "created": int(time.time()), "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+                "usage": usage,
+            }, headers)
+            self.state.record("chat", len(body), sent)
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        sent = 0
+
+        def emit(payload):
+            nonlocal sent
+            data = f"data: {payload}\n\n".encode("utf-8")
+            self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+            self.wfile.flush()
+            sent += len(data)
+
+        words = text.split(" ")
+        # Roughly four tokens per delta, paced to tokens_per_second
+        delta_delay = 4.0 / self.state.tokens_per_second if self.state.tokens_per_second > 0 else 0.0
+        for start in range(0, len(words), 3):
+            piece = " ".join(words[start:start + 3]) + (" " if start + 3 < len(words) else "")
+            emit(json.dumps({
+                "id": completion_id, "object": "chat.completion.chunk", "created": int(time.time()), "model": model,
+                "choices": [{"index": 0, "delta": {"content": piece}, "finish_reason": None}],
+            }))
+            if delta_delay:
+                time.sleep(delta_delay)
+        emit(json.dumps({
+            "id": completion_id, "object": "chat.completion.chunk", "created": int(time.time()), "model": model,
+            "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+            "x_groq": {"id": completion_id, "usage": usage},
+        }))
+        emit("[DONE]")
+        self.wfile.write(b"0\r\n\r\n")
+        self.state.record("chat", len(body), sent)
+
+    def _deepgram(self, body):
+        if self._inject_failure("deepgram", len(body)):
+            return
+        audio_minutes = len(body) / BYTES_PER_AUDIO_SECOND / 60
+        headers = self._admit("deepgram", len(body), {})
+        if headers is None:
+            return
+        try:
+            self._wait("deepgram", audio_minutes)
+            self._deepgram_response(body, audio_minutes)
+        finally:
+            self.state.finish("deepgram")
+
+    def _deepgram_response(self, body, audio_minutes):
+        diarize = parse_qs(urlparse(self.path).query).get("diarize", ["false"])[0] == "true"
+
+        paragraphs = []
+        for segment in self._segments(audio_minutes, len(body)):
+            paragraphs.append({
+                "sentences": [{"text": segment["text"], "start": segment["start"], "end": segment["end"]}],
+                "speaker": segment["speaker"] if diarize else 0,
+                "num_words": self.state.words_per_segment,
+                "start": segment["start"],
+                "end": segment["end"],
+            })
+        transcript = " ".join(paragraph["sentences"][0]["text"] for paragraph in paragraphs)
+        payload = {
+            "metadata": {
+                "request_id": uuid.uuid4().hex, "sha256": "0" * 64, "created": "2024-01-01T00:00:00Z",
+                "duration": audio_minutes * 60, "channels": 1, "models": ["fake"], "model_info": {},
+            },
+            "results": {"channels": [{"alternatives": [{
+                "transcript": transcript,
+                "confidence": 0.99,
+                "words": [],
+                "paragraphs": {"transcript": transcript, "paragraphs": paragraphs},
+            }]}]},
+        }
+        sent = self._send_json(200, payload)
+        self.state.record("deepgram", len(body), sent)
+
+
+class FakeAPIServer(http.server.ThreadingHTTPServer):
+    """
+    Serves the Groq and Deepgram fakes on one port. Use as a context manager.
+    """
+    daemon_threads = True
+
+    def __init__(self, state=None, host="127.0.0.1", port=0):
+        super().__init__((host, port), FakeAPIHandler)
+        self.state = state or FakeAPIState()
+
+    @property
+    def base_url(self):
+        return f"http://{self.server_address[0]}:{self.server_port}"
+
+    def __enter__(self):
+        threading.Thread(target=self.serve_forever, name="fake-api", daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+        self.server_close()
+        return False
+
+
+class FakeSMTPHandler(socketserver.StreamRequestHandler):
+    """
+    Minimal SMTP dialogue: EHLO, AUTH PLAIN/LOGIN, MAIL, RCPT, DATA, RSET, NOOP, QUIT.
+    """
+
+    def _reply(self, line):
+        self.wfile.write(line.encode("ascii") + b"\r\n")
+
+    def handle(self):
+        server = self.server
+        self._reply("220 fake-smtp ready")
+        recipients = 0
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode("utf-8", "replace").strip()
+            verb = command.split(" ", 1)[0].upper()
+
+            if verb == "EHLO":
+                self._reply("250-fake-smtp")
+                self._reply("250-AUTH PLAIN LOGIN")
+                self._reply("250 8BITMIME")
+            elif verb == "HELO":
+                self._reply("250 fake-smtp")
+            elif verb == "AUTH":
+                if command.upper().startswith("AUTH LOGIN"):
+                    self._reply("334 VXNlcm5hbWU6")
+                    self.rfile.readline()
+                    self._reply("334 UGFzc3dvcmQ6")
+                    self.rfile.readline()
+                self._reply("235 Authentication successful")
+            elif verb == "MAIL":
+                recipients = 0
+                self._reply("250 OK")
+            elif verb == "RCPT":
+                recipients += 1
+                self._reply("250 OK")
+            elif verb == "DATA":
+                self._reply("354 End data with <CR><LF>.<CR><LF>")
+                size = 0
+                while True:
+                    data = self.rfile.readline()
+                    if not data or data == b".\r\n":
+                        break
+                    size += len(data)
+                if server.latency:
+                    time.sleep(server.latency)
+                server.record(recipients, size)
+                self._reply("250 OK queued")
+            elif verb in ("RSET", "NOOP"):
+                self._reply("250 OK")
+            elif verb == "QUIT":
+                self._reply("221 Bye")
+                return
+            else:
+                self._reply("502 Command not implemented")
+
+
+class FakeSMTPServer(socketserver.ThreadingTCPServer):
+    """
+    Accepts mail on a local port and counts messages, recipients and bytes.
+
+    Args:
+        latency (float): Seconds spent "delivering" each message.
+    """
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0):
+        super().__init__((host, port), FakeSMTPHandler)
+        self.latency = latency
+        self._lock = threading.Lock()
+        self.stats = {"messages": 0, "recipients": 0, "bytes_in": 0, "connections": 0}
+
+    @property
+    def server_port(self):
+        return self.server_address[1]
+
+    def process_request(self, request, client_address):
+        with self._lock:
+            self.stats["connections"] += 1
+        super().process_request(request, client_address)
+
+    def record(self, recipients, size):
+        with self._lock:
+            self.stats["messages"] += 1
+            self.stats["recipients"] += recipients
+            self.stats["bytes_in"] += size
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self.stats)
+
+    def __enter__(self):
+        threading.Thread(target=self.serve_forever, name="fake-smtp", daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+        self.server_close()
+        return False
@@ -3,14 +3,19 @@
 # This module consolidates transcription and diarization.
 
 import os
-import time
-from dotenv import load_dotenv
-from deepgram import DeepgramClient
+from utils.env import load_env
 from utils.logger import get_logger
+from utils.api_clients import get_deepgram_client
+from utils.api_scheduler import api_scheduler, API_SCHEDULER_ENABLED
+from utils import result_cache
+from utils.audio_io import FileChunkStream
+from utils.telemetry import span, increment
 
 logger = get_logger("DeepgramHandler")
 
-load_dotenv()
+load_env()
+
+DEEPGRAM_MODEL = "nova-2"
 
 def process_audio_with_deepgram(file_path, diarize=False):
     """
@@ -31,6 +36,20 @@ def process_audio_with_deepgram(file_path, diarize=False):
         logger.error(error_msg)
         return error_msg if not diarize else None
 
+    # Identical audio with identical options is served from the result cache
+    return result_cache.cached_call(
+        "deepgram",
+        result_cache.file_digest(file_path),
+        {"model": DEEPGRAM_MODEL, "diarize": diarize, "smart_format": True, "punctuate": True},
+        lambda: _transcribe_with_deepgram(file_path, diarize),
+        lambda result: (isinstance(result, list) and len(result) > 0) if diarize else (
+            isinstance(result, str) and not result.startswith(("Error", "Deepgram Error")))
+    )
+
+def _transcribe_with_deepgram(file_path, diarize):
+    """
+    Performs the actual Deepgram request (no caching).
+    """
     try:
         # Step 1: Initialize the Deepgram Client 
         api_key = os.getenv("DEEPGRAM_API_KEY")
@@ -39,60 +58,60 @@ def process_audio_with_deepgram(file_path, diarize=False):
             logger.error(error_msg)
             return error_msg if not diarize else None
             
-        deepgram = DeepgramClient(api_key=api_key)
+        # Shared client: TLS sessions and pooled connections are reused across jobs
+        deepgram = get_deepgram_client()
 
 
-        # Step 3: Read audio file
-        logger.info("⏱️ Reading audio file...")
-        read_start = time.time()
-        with open(file_path, "rb") as file:
-            audio_bytes = file.read()
-        file_size_mb = len(audio_bytes) / (1024 * 1024)
-        read_time = time.time() - read_start
-        logger.info(f"✅ File read complete ({file_size_mb:.2f} MB) in {read_time:.2f} seconds")
+        # Step 3: Prepare a streamed body. The file is read in fixed-size chunks while
+        # uploading, so peak memory per job stays bounded whatever the file size.
+        audio_stream = FileChunkStream(file_path)
+        file_size_mb = len(audio_stream) / (1024 * 1024)
+        logger.info(f"📤 Streaming {file_size_mb:.2f} MB in {audio_stream.chunk_size // 1024} KB chunks")
 
         # Step 4: Call Deepgram API
-        logger.info("⏱️ Calling Deepgram API...")
-        api_start = time.time()
-        response = deepgram.listen.v1.media.transcribe_file(
-            request=audio_bytes,
-            model="nova-2",
-            smart_format=True,
-            diarize=diarize,
-            punctuate=True )
-        api_time = time.time() - api_start
-        logger.info(f"✅ Deepgram API call completed in {api_time:.2f} seconds")
+        increment("meeting_upload_bytes_total", len(audio_stream), backend="deepgram")
+        # The scheduler caps concurrent requests and retries 429s, so the SDK does not retry
+        lane = api_scheduler.lane("deepgram", DEEPGRAM_MODEL, "deepgram")
+        request_options = {"max_retries": 0} if API_SCHEDULER_ENABLED else None
+        with span("deepgram.api_call", diarize=diarize):
+            response = api_scheduler.call(lane, lambda: deepgram.listen.v1.media.transcribe_file(
+                request=audio_stream,
+                model=DEEPGRAM_MODEL,
+                smart_format=True,
+                diarize=diarize,
+                punctuate=True,
+                request_options=request_options))
 
         # Step 5: Process response
-        logger.info("⏱️ Processing response...")
-        process_start = time.time()
-        if diarize:
-            # Extract paragraphs with speaker labels
-            paragraphs = response.results.channels[0].alternatives[0].paragraphs
-            speaker_segments = []
-            if paragraphs:
-                for paragraph in paragraphs.paragraphs:
-                    speaker_segments.append({
-                        "speaker": f"Speaker {paragraph.speaker}",
-                        "start": paragraph.start,
-                        "end": paragraph.end,
-                        "transcript": " ".join([s.text for s in paragraph.sentences]) if paragraph.sentences else ""
-                    })
-            process_time = time.time() - process_start
-            logger.info(f"✅ Response processing completed in {process_time:.2f} seconds")
-            return speaker_segments
-        else:
-            # Return simple text transcript
-            result = response.results.channels[0].alternatives[0].transcript
-            process_time = time.time() - process_start
-            logger.info(f"✅ Response processing completed in {process_time:.2f} seconds")
-            return result
+        with span("deepgram.response_parsing"):
+            return _parse_response(response, diarize)
 
     except Exception as e:
         error_msg = f"Deepgram Error: {str(e)}"
         logger.error(error_msg)
         return error_msg if not diarize else None
 
+
+def _parse_response(response, diarize):
+    """
+    Extracts speaker segments (diarize=True) or the plain transcript from a Deepgram response.
+    """
+    if diarize:
+        # Extract paragraphs with speaker labels
+        paragraphs = response.results.channels[0].alternatives[0].paragraphs
+        speaker_segments = []
+        if paragraphs:
+            for paragraph in paragraphs.paragraphs:
+                speaker_segments.append({
+                    "speaker": f"Speaker {paragraph.speaker}",
+                    "start": paragraph.start,
+                    "end": paragraph.end,
+                    "transcript": " ".join([s.text for s in paragraph.sentences]) if paragraph.sentences else ""
+                })
+        return speaker_segments
+    # Return simple text transcript
+    return response.results.channels[0].alternatives[0].transcript
+
 # --- High-level Wrapper Functions ---
 
 def transcribe_audio(file_path):
@@ -6,17 +6,121 @@
 # 3. Logic to map speaker segments to the transcription.
 # 4. Handling of authentication tokens if using models like pyannote that require it.
 # 5. Return format that includes speaker labels along with text segments.
+# 6. In-memory input: a waveform already decoded by preprocessing is handed to Pyannote
+#    directly, so it does not decode the file again (and re-read it for every embedding crop).
+# 7. CPU tuning: segmentation/embedding batch sizes, torch intra-op threads and a speaker cap.
+#
+# Configuration (environment variables):
+#   DIARIZATION_SEGMENTATION_BATCH_SIZE  Windows per segmentation forward pass (default: 32, Pyannote's)
+#   DIARIZATION_EMBEDDING_BATCH_SIZE     Speaker crops per embedding forward pass (default: 32, Pyannote's)
+#   DIARIZATION_TORCH_THREADS            torch intra-op threads; 0 = CPU cores / DIARIZATION_CONCURRENCY (default: 0)
+#   DIARIZATION_MAX_SPEAKERS             Upper bound on speakers found; 0 = no bound (default: 0)
+#
+# benchmarks/bench_diarization.py measures the real-time factor for combinations of these.
 
 import os
+import threading
+import time
 from utils.logger import get_logger
+from utils.model_registry import ModelRegistry
+from utils import result_cache
+from utils.audio_io import estimate_duration_seconds
 
 # Initialize logger for tracking diarization progress
 logger = get_logger("Diarization")
 
-def diarize_audio(audio_path, hf_token=None):
+DIARIZATION_MODEL = "pyannote/speaker-diarization-3.1"
+
+# One warm pipeline per process, shared by every job. Released after
+# DIARIZATION_IDLE_TIMEOUT seconds without use (0 keeps it loaded forever).
+_pipeline_registry = ModelRegistry(idle_timeout=float(os.getenv("DIARIZATION_IDLE_TIMEOUT", 1800)))
+
+# The shared pipeline keeps per-call state and already uses every core through torch,
+# so concurrent jobs take turns on it instead of oversubscribing the CPU.
+DIARIZATION_CONCURRENCY = int(os.getenv("DIARIZATION_CONCURRENCY", 1))
+_inference_slots = threading.BoundedSemaphore(DIARIZATION_CONCURRENCY)
+
+# Larger batches amortize per-call overhead; smaller ones lower peak memory on small nodes
+DIARIZATION_SEGMENTATION_BATCH_SIZE = int(os.getenv("DIARIZATION_SEGMENTATION_BATCH_SIZE", 32))
+DIARIZATION_EMBEDDING_BATCH_SIZE = int(os.getenv("DIARIZATION_EMBEDDING_BATCH_SIZE", 32))
+# Concurrent runs each get their share of the cores instead of all of them (oversubscription)
+DIARIZATION_TORCH_THREADS = int(os.getenv("DIARIZATION_TORCH_THREADS", 0))
+# Meetings rarely have more speakers than this; a bound keeps clustering from splitting voices
+DIARIZATION_MAX_SPEAKERS = int(os.getenv("DIARIZATION_MAX_SPEAKERS", 0))
+# Sample rate of waveforms from utils/audio_preprocessing.py
+WAVEFORM_SAMPLE_RATE = 16000
+
+def torch_threads():
+    """
+    Returns the torch intra-op thread count used for diarization.
+    """
+    if DIARIZATION_TORCH_THREADS > 0:
+        return DIARIZATION_TORCH_THREADS
+    return max(1, (os.cpu_count() or 1) // max(1, DIARIZATION_CONCURRENCY))
+
+def _load_pipeline(hf_token):
+    """
+    Loads the Pyannote pipeline and applies the CPU settings.
+    """
+    import torch
+    from pyannote.audio import Pipeline
+
+    torch.set_num_threads(torch_threads())
+    pipeline = Pipeline.from_pretrained(DIARIZATION_MODEL, use_auth_token=hf_token)
+    pipeline.segmentation_batch_size = DIARIZATION_SEGMENTATION_BATCH_SIZE
+    pipeline.embedding_batch_size = DIARIZATION_EMBEDDING_BATCH_SIZE
+    logger.info(f"🧵 Diarization on {torch.get_num_threads()} torch threads, batch sizes "
+                f"{DIARIZATION_SEGMENTATION_BATCH_SIZE} (segmentation) / {DIARIZATION_EMBEDDING_BATCH_SIZE} (embedding)")
+    return pipeline
+
+def get_diarization_pipeline(hf_token=None):
+    """
+    Returns the shared Pyannote pipeline, loading it on first use.
+
+    Raises:
+        ImportError: If pyannote.audio is not installed.
+        ValueError: If no Hugging Face token is available.
+    """
+    import pyannote.audio  # noqa: F401 - a missing install is reported before the token
+
+    if hf_token is None:
+        hf_token = os.getenv("HUGGINGFACE_TOKEN")
+    if not hf_token:
+        raise ValueError("Hugging Face token missing.")
+
+    return _pipeline_registry.get(DIARIZATION_MODEL, lambda: _load_pipeline(hf_token), token=hf_token)
+
+def preload_pipeline(hf_token=None):
+    """
+    Warms the diarization pipeline at app startup so the first job does not pay the load time.
+    Failures are logged and ignored; the pipeline will simply load on first use instead.
+    """
+    try:
+        get_diarization_pipeline(hf_token)
+        return True
+    except Exception as e:
+        logger.warning(f"⚠️ Diarization preload skipped: {str(e)}")
+        return False
+
+def get_pipeline_stats():
+    """
+    Returns cache hit/miss counts and load times for the diarization pipeline.
+    """
+    return _pipeline_registry.stats()
+
+def diarize_audio(audio_path, hf_token=None, waveform=None, sample_rate=WAVEFORM_SAMPLE_RATE, max_speakers=None):
     """
     Identifies 'who spoke when' in an audio file.
     Note: Requires pyannote.audio and a Hugging Face token for pre-trained models.
+
+    Args:
+        audio_path (str): The audio file (also the cache key).
+        hf_token (str, optional): Hugging Face token (defaults to HUGGINGFACE_TOKEN).
+        waveform (numpy.ndarray or torch.Tensor, optional): The same audio already decoded,
+            as int16 or float samples, shaped (samples,) or (channels, samples). Pyannote
+            then works from memory instead of decoding the file.
+        sample_rate (int): Sample rate of `waveform`.
+        max_speakers (int, optional): Upper bound on speakers (defaults to DIARIZATION_MAX_SPEAKERS).
     """
     logger.info(f"Starting diarization for: {audio_path}")
     
@@ -25,29 +129,64 @@ def diarize_audio(audio_path, hf_token=None):
         logger.error(f"Audio file not found: {audio_path}")
         return None
 
+    max_speakers = DIARIZATION_MAX_SPEAKERS if max_speakers is None else max_speakers
+    config = {"model": DIARIZATION_MODEL}
+    if max_speakers:
+        # Part of the key only when set, so existing cache entries stay valid
+        config["max_speakers"] = max_speakers
+
+    # Re-uploads of the same recording reuse the stored speaker turns
+    return result_cache.cached_call(
+        "diarization",
+        result_cache.file_digest(audio_path),
+        config,
+        lambda: _run_diarization(audio_path, hf_token, waveform, sample_rate, max_speakers),
+        lambda result: isinstance(result, list) and len(result) > 0
+    )
+
+def _pipeline_input(audio_path, waveform, sample_rate):
+    """
+    Returns what the pipeline is called with: the file path, or Pyannote's in-memory
+    form {"waveform": float32 (channels, samples) tensor, "sample_rate": int}.
+    """
+    if waveform is None:
+        return audio_path
+    import numpy as np
+    import torch
+
+    if not isinstance(waveform, torch.Tensor):
+        array = np.asarray(waveform)
+        if array.dtype == np.int16:
+            array = array.astype(np.float32) / 32768.0
+        waveform = torch.from_numpy(np.ascontiguousarray(array, dtype=np.float32))  # no copy when already float32
+    elif waveform.dtype != torch.float32:
+        waveform = waveform.to(torch.float32)
+    if waveform.dim() == 1:
+        waveform = waveform.unsqueeze(0)
+    return {"waveform": waveform, "sample_rate": sample_rate}
+
+def _run_diarization(audio_path, hf_token=None, waveform=None, sample_rate=WAVEFORM_SAMPLE_RATE, max_speakers=0):
+    """
+    Runs the Pyannote pipeline on an audio file or its decoded waveform (no caching).
+    """
     try:
-        # Step 1: Import pyannote.audio inside the function to keep it optional
-        # This prevents the whole app from crashing if the library isn't installed.
-        from pyannote.audio import Pipeline
-        
-        # Step 2: Initialize the pre-trained diarization pipeline
-        # You need to accept the user agreement on Hugging Face for the speaker-diarization model.
-        if hf_token is None:
-            hf_token = os.getenv("HUGGINGFACE_TOKEN")
-            
-        if not hf_token:
+        # Step 1 & 2: Fetch the shared pre-trained pipeline (imports pyannote.audio lazily
+        # to keep it optional). You need to accept the user agreement on Hugging Face
+        # for the speaker-diarization model.
+        try:
+            pipeline = get_diarization_pipeline(hf_token)
+        except ValueError:
             logger.warning("Hugging Face token missing. Diarization might fail.")
             return None
 
-        # Load the pipeline from Hugging Face
-        pipeline = Pipeline.from_pretrained(
-            "pyannote/speaker-diarization-3.1",
-            use_auth_token=hf_token
-        )
-
-        # Step 3: Run the pipeline on the audio file
+        # Step 3: Run the pipeline on the waveform (or the audio file)
         # This returns an 'Annotation' object containing speaker segments.
-        diarization = pipeline(audio_path)
+        audio = _pipeline_input(audio_path, waveform, sample_rate)
+        options = {"max_speakers": max_speakers} if max_speakers else {}
+        with _inference_slots:
+            started = time.perf_counter()
+            diarization = pipeline(audio, **options)
+            elapsed = time.perf_counter() - started
 
         # Step 4: Format the output into a readable list of segments
         speaker_segments = []
@@ -58,7 +197,13 @@ def diarize_audio(audio_path, hf_token=None):
                 "speaker": speaker
             })
             
-        logger.info(f"Diarization complete. Found {len(speaker_segments)} segments.")
+        stats = get_pipeline_stats()
+        seconds = audio["waveform"].shape[-1] / sample_rate if isinstance(audio, dict) else \
+            estimate_duration_seconds(audio_path)
+        logger.info(f"Diarization complete. Found {len(speaker_segments)} segments "
+                    f"in {elapsed:.1f}s (RTF {elapsed / seconds if seconds else 0:.3f}, "
+                    f"{'in-memory waveform' if isinstance(audio, dict) else 'file'} input). "
+                    f"(pipeline cache: {stats['hits']} hits / {stats['misses']} misses)")
         return speaker_segments
 
     except ImportError:
@@ -0,0 +1,226 @@
+# jobs.py
+# Background job subsystem for the AI Meeting Assistant
+# This module contains:
+# 1. A Job record holding per-meeting state, artifacts and stage timings.
+# 2. A JobManager that runs pipelines on a bounded worker pool.
+# 3. A per-session index so each browser session only sees its own reports.
+
+import os
+import shutil
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from utils.logger import get_logger
+
+logger = get_logger("Jobs")
+
+# Number of meetings processed at the same time by one instance
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", 2))
+# Jobs allowed to wait for a worker before new submissions are rejected
+JOB_QUEUE_SIZE = int(os.getenv("JOB_QUEUE_SIZE", 32))
+# Workers reserved for short jobs (finishing a live meeting) so they never wait behind uploads
+JOB_EXPRESS_WORKERS = int(os.getenv("JOB_EXPRESS_WORKERS", 2))
+# How long finished jobs (and their artifacts) stay available for email/download
+JOB_TTL_SECONDS = int(os.getenv("JOB_TTL_SECONDS", 6 * 3600))
+
+
+class QueueFullError(Exception):
+    """
+    Raised when the job queue already holds JOB_QUEUE_SIZE waiting jobs.
+    """
+
+
+class Job:
+    """
+    State of one meeting-processing job.
+    """
+
+    def __init__(self, session_id, audio_file):
+        self.job_id = uuid.uuid4().hex[:12]
+        self.session_id = session_id
+        self.audio_file = audio_file
+        self.status = "queued"  # queued -> running -> done | failed
+        self.transcript = None
+        self.summary = None
+        self.pdf_path = None
+        self.error = None
+        self.timings = {}
+        self.created_at = time.time()
+        self.finished_at = None
+        # Only the latest (transcript, summary, pdf_path) is kept for watchers: every update
+        # is a full snapshot, so one that is overtaken before being read can be skipped
+        self._update = None
+        self._version = 0
+        self._finished = False
+        self._changed = threading.Condition()
+
+    @property
+    def output_dir(self):
+        """
+        Per-job artifact directory, so concurrent reports never overwrite each other.
+        """
+        return os.path.join("assets", "jobs", self.job_id)
+
+    def publish(self, transcript, summary, pdf_path=None):
+        """
+        Records the latest partial outputs and forwards them to whoever is watching the job.
+        """
+        self.transcript = transcript
+        self.summary = summary
+        if pdf_path is not None:
+            self.pdf_path = pdf_path
+        self._push((transcript, summary, self.pdf_path))
+
+    def _push(self, update=None, finished=False):
+        with self._changed:
+            if update is not None:
+                self._update = update
+                self._version += 1
+            self._finished = self._finished or finished
+            self._changed.notify_all()
+
+    def watch(self):
+        """
+        Yields the latest (transcript, summary, pdf_path) whenever it changes, until the
+        job finishes. A slow watcher skips intermediate updates instead of queueing them.
+        """
+        seen = 0
+        while True:
+            with self._changed:
+                self._changed.wait_for(lambda: self._version != seen or self._finished)
+                version, update = self._version, self._update
+            if version == seen:
+                return
+            seen = version
+            yield update
+
+    def to_dict(self):
+        return {
+            "job_id": self.job_id,
+            "session_id": self.session_id,
+            "status": self.status,
+            "error": self.error,
+            "pdf_path": self.pdf_path,
+            "timings": dict(self.timings),
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class JobManager:
+    """
+    Runs pipeline functions for submitted jobs on a bounded worker pool.
+
+    Args:
+        workers (int): Maximum number of jobs processed concurrently.
+        max_queued (int): Maximum number of jobs waiting for a worker.
+        express_workers (int): Separate workers for jobs submitted with express=True.
+    """
+
+    def __init__(self, workers=JOB_WORKERS, max_queued=JOB_QUEUE_SIZE, express_workers=JOB_EXPRESS_WORKERS):
+        self.workers = workers
+        self.max_queued = max_queued
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="job-worker")
+        self._express_executor = ThreadPoolExecutor(max_workers=max(1, express_workers), thread_name_prefix="job-express")
+        self._lock = threading.Lock()
+        self._jobs = {}
+        self._sessions = {}  # session_id -> [job_id, ...] in submission order
+
+    def submit(self, session_id, audio_file, pipeline, express=False):
+        """
+        Queues a job and returns it immediately.
+
+        Args:
+            session_id (str): Owner session.
+            audio_file (str): Path to the uploaded audio.
+            pipeline (callable): pipeline(job) that runs the stages and calls job.publish().
+            express (bool): Run on the express workers; for jobs that take seconds, not minutes.
+
+        Returns:
+            Job: The queued job (its job_id can be used for lookups).
+
+        Raises:
+            QueueFullError: If too many jobs are already waiting.
+        """
+        self._prune()
+        with self._lock:
+            queued = sum(1 for job in self._jobs.values() if job.status == "queued")
+            if queued >= self.max_queued:
+                raise QueueFullError(f"{queued} jobs are already waiting; please try again shortly.")
+
+            job = Job(session_id, audio_file)
+            self._jobs[job.job_id] = job
+            self._sessions.setdefault(session_id, []).append(job.job_id)
+
+        logger.info(f"📥 Job {job.job_id} queued for session {session_id}")
+        (self._express_executor if express else self._executor).submit(self._run, job, pipeline)
+        return job
+
+    def _run(self, job, pipeline):
+        job.status = "running"
+        started = time.time()
+        job.timings["queue_wait"] = started - job.created_at
+        try:
+            pipeline(job)
+            job.status = "failed" if job.error else "done"
+        except Exception as e:
+            job.error = f"Error: {str(e)}"
+            job.status = "failed"
+            logger.error(f"❌ Job {job.job_id} crashed: {str(e)}")
+            job._push((job.transcript or "", job.error, job.pdf_path))
+        finally:
+            job.finished_at = time.time()
+            job.timings["total"] = job.finished_at - started
+            job._push(finished=True)
+            logger.info(f"🏁 Job {job.job_id} {job.status} in {job.timings['total']:.2f}s")
+
+    def watch(self, job):
+        """
+        Yields (transcript, summary, pdf_path) updates until the job finishes (see Job.watch).
+        """
+        yield from job.watch()
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def latest_for_session(self, session_id, status="done"):
+        """
+        Returns the most recent job of a session with the given status, or None.
+        """
+        with self._lock:
+            for job_id in reversed(self._sessions.get(session_id, [])):
+                job = self._jobs.get(job_id)
+                if job and (status is None or job.status == status):
+                    return job
+        return None
+
+    def stats(self):
+        """
+        Returns job counts by status plus the configured pool size.
+        """
+        with self._lock:
+            counts = {}
+            for job in self._jobs.values():
+                counts[job.status] = counts.get(job.status, 0) + 1
+        return {"workers": self.workers, "max_queued": self.max_queued, "jobs": counts}
+
+    def _prune(self):
+        # Forget finished jobs past their TTL so memory stays bounded on long-running instances
+        cutoff = time.time() - JOB_TTL_SECONDS
+        with self._lock:
+            expired = [job_id for job_id, job in self._jobs.items()
+                       if job.finished_at is not None and job.finished_at < cutoff]
+            for job_id in expired:
+                job = self._jobs.pop(job_id)
+                shutil.rmtree(job.output_dir, ignore_errors=True)
+                session_jobs = self._sessions.get(job.session_id, [])
+                if job_id in session_jobs:
+                    session_jobs.remove(job_id)
+                if not session_jobs:
+                    self._sessions.pop(job.session_id, None)
+
+
+# Process-wide manager used by the UI
+job_manager = JobManager()
@@ -0,0 +1,548 @@
+# live.py
+# Live transcription of meetings recorded from the microphone
+# This module contains:
+# 1. Streaming speech-to-text backends: Deepgram's live WebSocket API, and a local
+#    stand-in that cuts utterances with voice activity detection and sends each to Whisper.
+# 2. A LiveSession that turns microphone chunks into a speaker-labelled transcript while the
+#    meeting runs and refreshes a rolling summary every LIVE_SUMMARY_INTERVAL_MINUTES.
+# 3. A LiveManager that keeps track of the sessions being recorded.
+#
+# When a meeting stops, only the last few minutes still have to be folded into the summary
+# before the PDF is rendered, so the final report is ready seconds later (see logic.py).
+
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+import wave
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from deepgram_handler import DEEPGRAM_MODEL
+from jobs import JOB_TTL_SECONDS
+from summarization import update_summary
+from transcription import transcribe_clip
+from utils.api_clients import get_deepgram_client
+from utils.audio_preprocessing import PREPROCESS_PADDING_MS, PREPROCESS_SILENCE_THRESH_DB, \
+    TARGET_SAMPLE_RATE, VAD_FRAME_MS, Resampler
+from utils.speaker_tracking import IncrementalSpeakerTracker, voice_signature
+from utils.telemetry import span, propagate, increment
+from utils.logger import get_logger
+
+logger = get_logger("Live")
+
+# Minutes of audio between rolling summary refreshes
+LIVE_SUMMARY_INTERVAL_MINUTES = float(os.getenv("LIVE_SUMMARY_INTERVAL_MINUTES", 5))
+# Rolling summaries computed at the same time across all live meetings
+LIVE_SUMMARY_CONCURRENCY = int(os.getenv("LIVE_SUMMARY_CONCURRENCY", 2))
+# Local stand-in: a pause this long ends an utterance; utterances are also cut at the maximum length
+LIVE_UTTERANCE_SILENCE_MS = int(os.getenv("LIVE_UTTERANCE_SILENCE_MS", 700))
+LIVE_MAX_UTTERANCE_SECONDS = float(os.getenv("LIVE_MAX_UTTERANCE_SECONDS", 15))
+# Local stand-in: utterances transcribed at the same time per meeting
+LIVE_TRANSCRIBE_CONCURRENCY = int(os.getenv("LIVE_TRANSCRIBE_CONCURRENCY", 4))
+# Seconds to wait for the backend's last results after the meeting stops
+LIVE_CLOSE_TIMEOUT = float(os.getenv("LIVE_CLOSE_TIMEOUT", 10))
+# Recordings that receive no audio for this long (closed tab, lost connection) are stopped
+LIVE_IDLE_TIMEOUT = float(os.getenv("LIVE_IDLE_TIMEOUT", 600))
+# Seconds between checks for idle and expired live meetings
+LIVE_PRUNE_INTERVAL = float(os.getenv("LIVE_PRUNE_INTERVAL", 60))
+
+# Utterances with less speech than this are dropped (coughs, clicks)
+_MIN_SPEECH_MS = 250
+# Frames must be this far above the tracked noise floor to count as speech
+_NOISE_MARGIN_DB = 10.0
+
+_summary_executor = ThreadPoolExecutor(max_workers=LIVE_SUMMARY_CONCURRENCY, thread_name_prefix="live-summary")
+
+
+class StreamingBackend:
+    """
+    A streaming speech-to-text backend for one live meeting.
+
+    `send()` receives 16 kHz mono int16 samples as they are recorded. Finished utterances
+    are passed to `on_utterance(utterance)` in order; an utterance is a dict with 'start',
+    'end' (seconds since the recording started) and 'text', plus either 'speaker' (the
+    backend's own speaker id) or 'signature' (a voice_signature for speaker tracking).
+    `close()` flushes the remaining audio and returns once every utterance was delivered.
+
+    Args:
+        on_utterance (callable): Receives each finished utterance.
+        offset (float): Recording time at which this backend's audio starts.
+        live_id (str): The live meeting, tagged on telemetry spans so its API calls are
+            scheduled as one job (see utils/api_scheduler.py).
+    """
+    name = "streaming"
+
+    def __init__(self, on_utterance, offset=0.0, live_id=None):
+        self.on_utterance = on_utterance
+        self.offset = offset
+        self.live_id = live_id
+
+    def send(self, pcm):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class LocalStreamingBackend(StreamingBackend):
+    """
+    Stand-in streaming backend: energy-based VAD cuts the stream into utterances at
+    pauses, and each utterance is transcribed with a single Whisper request.
+
+    Works against any Groq-compatible endpoint (GROQ_BASE_URL), including the fake
+    services used by the benchmarks. Requests run concurrently, results are delivered
+    in recording order.
+    """
+    name = "local"
+
+    def __init__(self, on_utterance, offset=0.0, live_id=None):
+        import numpy as np
+
+        super().__init__(on_utterance, offset, live_id)
+        self._frame = TARGET_SAMPLE_RATE * VAD_FRAME_MS // 1000
+        self._padding = PREPROCESS_PADDING_MS // VAD_FRAME_MS
+        self._silence_frames = max(1, LIVE_UTTERANCE_SILENCE_MS // VAD_FRAME_MS)
+        self._max_frames = int(LIVE_MAX_UTTERANCE_SECONDS * 1000 // VAD_FRAME_MS)
+        self._pending = np.zeros(0, dtype=np.int16)  # samples not yet framed
+        self._position = int(offset * TARGET_SAMPLE_RATE)
+        self._energy_sum = 0.0
+        self._frames_seen = 0
+        self._noise_floor = None
+        self._preroll = deque(maxlen=self._padding)
+        self._speech = []
+        self._speech_start = None
+        self._voiced = 0
+        self._silent_run = 0
+        self._clip_dir = tempfile.mkdtemp(prefix="live_clips_")
+        self._executor = ThreadPoolExecutor(max_workers=LIVE_TRANSCRIBE_CONCURRENCY, thread_name_prefix="live-whisper")
+        self._in_flight = deque()
+        self._deliver_lock = threading.Lock()
+
+    def send(self, pcm):
+        import numpy as np
+
+        samples = np.concatenate([self._pending, pcm]) if len(self._pending) else pcm
+        frames = len(samples) // self._frame
+        if frames:
+            blocks = samples[:frames * self._frame].reshape(frames, self._frame)
+            energies = np.mean(blocks.astype(np.float32) ** 2, axis=1)
+            for block, energy in zip(blocks, energies):
+                self._add_frame(block, float(energy))
+        self._pending = samples[frames * self._frame:]
+
+    def _is_voiced(self, energy):
+        # Relative to the average loudness so far (as in batch preprocessing) and to a
+        # slowly rising noise floor, so a quiet room before anyone speaks is not speech.
+        self._energy_sum += energy
+        self._frames_seen += 1
+        self._noise_floor = energy if self._noise_floor is None else min(energy, self._noise_floor * 1.002)
+        floor = max(self._noise_floor, 1.0) * 10 ** (_NOISE_MARGIN_DB / 10)
+        relative = self._energy_sum / self._frames_seen * 10 ** (PREPROCESS_SILENCE_THRESH_DB / 10)
+        return energy > max(floor, relative)
+
+    def _add_frame(self, block, energy):
+        voiced = self._is_voiced(energy)
+        start = self._position
+        self._position += self._frame
+
+        if self._speech_start is None:
+            if voiced:
+                self._speech_start = start - len(self._preroll) * self._frame
+                self._speech = list(self._preroll) + [block]
+                self._preroll.clear()
+                self._voiced, self._silent_run = 1, 0
+            else:
+                self._preroll.append(block)
+            return
+
+        self._speech.append(block)
+        if voiced:
+            self._voiced += 1
+            self._silent_run = 0
+        else:
+            self._silent_run += 1
+        if self._silent_run >= self._silence_frames or len(self._speech) >= self._max_frames:
+            self._end_utterance()
+
+    def _end_utterance(self):
+        import numpy as np
+
+        # Keep PREPROCESS_PADDING_MS of the closing pause, drop the rest
+        keep = len(self._speech) - max(0, self._silent_run - self._padding)
+        if self._voiced * VAD_FRAME_MS >= _MIN_SPEECH_MS and keep > 0:
+            pcm = np.concatenate(self._speech[:keep])
+            start = self._speech_start / TARGET_SAMPLE_RATE
+            future = self._executor.submit(propagate(self._transcribe), pcm, start, start + len(pcm) / TARGET_SAMPLE_RATE)
+            self._in_flight.append(future)
+            future.add_done_callback(self._deliver)
+        self._speech, self._speech_start = [], None
+        self._voiced = self._silent_run = 0
+
+    def _transcribe(self, pcm, start, end):
+        path = os.path.join(self._clip_dir, f"utterance_{uuid.uuid4().hex[:8]}.wav")
+        with wave.open(path, "wb") as clip:
+            clip.setnchannels(1)
+            clip.setsampwidth(2)
+            clip.setframerate(TARGET_SAMPLE_RATE)
+            clip.writeframes(pcm.tobytes())
+        try:
+            with span("live.utterance", log=False, live_id=self.live_id, seconds=round(end - start, 2)):
+                response = transcribe_clip(path)
+        finally:
+            os.remove(path)
+
+        if not isinstance(response, dict):
+            logger.warning(f"⚠️ Utterance at {start:.1f}s was not transcribed: {response}")
+            return None
+        text = (response.get("text") or "").strip()
+        if not text:
+            return None
+        return {"start": start, "end": end, "text": text, "signature": voice_signature(pcm)}
+
+    def _deliver(self, _future=None):
+        # Hand over finished utterances in recording order, however the requests complete
+        with self._deliver_lock:
+            while self._in_flight and self._in_flight[0].done():
+                future = self._in_flight.popleft()
+                utterance = future.result() if future.exception() is None else None
+                if utterance:
+                    self.on_utterance(utterance)
+
+    def close(self):
+        if self._speech_start is not None:
+            self._silent_run = 0
+            self._end_utterance()
+        self._executor.shutdown(wait=True)
+        self._deliver()
+        shutil.rmtree(self._clip_dir, ignore_errors=True)
+
+
+class DeepgramStreamingBackend(StreamingBackend):
+    """
+    Deepgram's live WebSocket API with diarization. Final results are split into
+    utterances wherever Deepgram's speaker id changes.
+    """
+    name = "deepgram"
+
+    def __init__(self, on_utterance, offset=0.0, live_id=None):
+        super().__init__(on_utterance, offset, live_id)
+        self._context = get_deepgram_client().listen.v1.connect(
+            model=DEEPGRAM_MODEL,
+            encoding="linear16",
+            sample_rate=str(TARGET_SAMPLE_RATE),
+            channels="1",
+            diarize="true",
+            punctuate="true",
+            smart_format="true",
+            interim_results="false",
+        )
+        self._connection = self._context.__enter__()
+        self._receiver = threading.Thread(target=self._receive, name="deepgram-live", daemon=True)
+        self._receiver.start()
+
+    def _receive(self):
+        try:
+            for message in self._connection:
+                if getattr(message, "type", None) != "Results" or not message.is_final:
+                    continue
+                alternatives = message.channel.alternatives
+                for utterance in self._split_by_speaker(alternatives[0].words if alternatives else []):
+                    self.on_utterance(utterance)
+        except Exception as e:
+            logger.warning(f"⚠️ Deepgram live connection ended: {str(e)}")
+
+    def _split_by_speaker(self, words):
+        utterances = []
+        for word in words or []:
+            text = word.punctuated_word or word.word
+            speaker = int(word.speaker) if word.speaker is not None else None
+            if utterances and utterances[-1]["speaker"] == speaker:
+                utterances[-1]["end"] = self.offset + word.end
+                utterances[-1]["text"] += f" {text}"
+            else:
+                utterances.append({"start": self.offset + word.start, "end": self.offset + word.end,
+                                   "text": text, "speaker": speaker})
+        return utterances
+
+    def send(self, pcm):
+        self._connection.send_media(pcm.tobytes())
+
+    def close(self):
+        from deepgram.listen.v1 import ListenV1CloseStream
+
+        try:
+            # Deepgram flushes its final results and then closes the socket
+            self._connection.send_close_stream(ListenV1CloseStream(type="CloseStream"))
+            self._receiver.join(LIVE_CLOSE_TIMEOUT)
+        except Exception as e:
+            logger.warning(f"⚠️ Could not close the Deepgram live stream cleanly: {str(e)}")
+        finally:
+            self._context.__exit__(None, None, None)
+
+
+def create_backend(on_utterance, name=None, offset=0.0, live_id=None):
+    """
+    Returns the streaming backend named by LIVE_BACKEND ("deepgram" or "local").
+    Without it, Deepgram is used when DEEPGRAM_API_KEY is set and the local stand-in otherwise.
+    """
+    name = (name or os.getenv("LIVE_BACKEND") or ("deepgram" if os.getenv("DEEPGRAM_API_KEY") else "local")).lower()
+    if name == "deepgram":
+        try:
+            return DeepgramStreamingBackend(on_utterance, offset, live_id)
+        except Exception as e:
+            logger.warning(f"⚠️ Deepgram live connection failed, using the local stand-in: {str(e)}")
+    return LocalStreamingBackend(on_utterance, offset, live_id)
+
+
+def _to_float_mono(data):
+    """
+    Converts a microphone chunk (int16/int32/float, mono or interleaved channels)
+    to mono float samples on the int16 scale.
+    """
+    import numpy as np
+
+    samples = np.asarray(data)
+    if np.issubdtype(samples.dtype, np.floating):
+        samples = samples.astype(np.float32) * 32767.0
+    elif samples.dtype.itemsize == 4:
+        samples = samples.astype(np.float32) / 65536.0
+    else:
+        samples = samples.astype(np.float32)
+    return samples.mean(axis=1) if samples.ndim > 1 else samples
+
+
+class LiveSession:
+    """
+    One meeting being recorded and transcribed live.
+
+    Microphone chunks are resampled to 16 kHz mono, appended to a WAV recording and
+    streamed to the backend. Finished utterances get incremental speaker labels and
+    extend the transcript. After every LIVE_SUMMARY_INTERVAL_MINUTES of audio the new
+    part of the transcript is folded into the rolling summary in the background.
+
+    Args:
+        session_id (str): Owner (browser) session.
+        backend (str, optional): Streaming backend name, see create_backend().
+    """
+
+    def __init__(self, session_id, backend=None):
+        self.live_id = uuid.uuid4().hex[:12]
+        self.session_id = session_id
+        self.status = "recording"  # recording -> stopping -> stopped
+        self.started_at = time.time()
+        self.last_audio_at = self.started_at
+        self.stopped_at = None
+        self.audio_seconds = 0.0
+        self.utterances = []
+        self.summary = None
+        self.summary_covers = 0  # number of utterances folded into the summary
+        self.summary_until = 0.0  # recording time the summary reaches
+        self._lines = []
+        self._lock = threading.Lock()
+        self._utterance_lock = threading.Lock()
+        self._tracker = IncrementalSpeakerTracker()
+        self._resampler = None
+        self._summary_future = None
+        self._next_summary_at = LIVE_SUMMARY_INTERVAL_MINUTES * 60
+        self._stopped = threading.Event()  # set once the backend delivered its last utterances
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        self.recording_path = os.path.join(self.output_dir, "recording.wav")
+        self._recording = wave.open(self.recording_path, "wb")
+        self._recording.setnchannels(1)
+        self._recording.setsampwidth(2)
+        self._recording.setframerate(TARGET_SAMPLE_RATE)
+        self.backend = create_backend(self._on_utterance, backend, live_id=self.live_id)
+        logger.info(f"🎙️ Live meeting {self.live_id} started with the '{self.backend.name}' backend")
+
+    @property
+    def output_dir(self):
+        return os.path.join("assets", "live", self.live_id)
+
+    def feed(self, sample_rate, data):
+        """
+        Adds one microphone chunk. Ignored once the meeting is stopping.
+        """
+        with self._lock:
+            if self.status != "recording":
+                return
+            if self._resampler is None or self._resampler.rate != sample_rate:
+                self._resampler = Resampler(sample_rate)
+            pcm = self._resampler.feed(_to_float_mono(data))
+            if not len(pcm):
+                return
+            self._recording.writeframes(pcm.tobytes())
+            offset = self.audio_seconds
+            self.audio_seconds += len(pcm) / TARGET_SAMPLE_RATE
+            self.last_audio_at = time.time()
+            try:
+                self.backend.send(pcm)
+            except Exception as e:
+                # Keep transcribing the rest of the meeting rather than losing it
+                logger.warning(f"⚠️ Live backend '{self.backend.name}' failed ({str(e)}), "
+                               f"continuing with the local stand-in")
+                failed, self.backend = self.backend, LocalStreamingBackend(self._on_utterance, offset, self.live_id)
+                threading.Thread(target=self._close_quietly, args=(failed,), daemon=True).start()
+                self.backend.send(pcm)
+            self._maybe_refresh_summary()
+
+    @staticmethod
+    def _close_quietly(backend):
+        try:
+            backend.close()
+        except Exception:
+            pass
+
+    def _on_utterance(self, utterance):
+        speaker = self._tracker.label(utterance.get("speaker"), utterance.get("signature"))
+        with self._utterance_lock:
+            self.utterances.append({
+                "start": utterance["start"],
+                "end": utterance["end"],
+                "speaker": speaker,
+                "text": utterance["text"],
+            })
+            self._lines.append(f"{speaker}: {utterance['text']}")
+
+    def transcript(self, start=0, end=None):
+        """
+        Returns the "Speaker: text" transcript of utterances[start:end].
+        """
+        with self._utterance_lock:
+            return "\n".join(self._lines[start:end])
+
+    def _maybe_refresh_summary(self):
+        if self.audio_seconds < self._next_summary_at:
+            return
+        if self._summary_future is not None and not self._summary_future.done():
+            return
+        self._next_summary_at = self.audio_seconds + LIVE_SUMMARY_INTERVAL_MINUTES * 60
+        with self._utterance_lock:
+            covers = len(self.utterances)
+        if covers > self.summary_covers:
+            self._summary_future = _summary_executor.submit(propagate(self._refresh_summary), covers)
+
+    def _refresh_summary(self, covers):
+        with span("live.rolling_summary", live_id=self.live_id, utterances=covers - self.summary_covers):
+            summary = update_summary(self.summary, self.transcript(self.summary_covers, covers))
+        if not summary or summary.startswith("Error"):
+            logger.warning("⚠️ Rolling summary refresh failed; will retry at the next interval")
+            return
+        self.summary = summary
+        self.summary_covers = covers
+        self.summary_until = self.utterances[covers - 1]["end"]
+        logger.info(f"📝 Rolling summary of live meeting {self.live_id} updated "
+                    f"({covers} utterances, {self.summary_until / 60:.1f} min)")
+
+    def wait_for_summary(self):
+        """
+        Waits for a rolling summary refresh that is still running.
+        """
+        future = self._summary_future
+        if future is not None:
+            future.result()
+
+    def stop(self):
+        """
+        Stops recording and waits for the backend to deliver the last utterances.
+        A second caller (e.g. the idle pruner got there first) waits for the same flush.
+        """
+        with self._lock:
+            already_stopping = self.status != "recording"
+            if not already_stopping:
+                self.status = "stopping"
+                self._recording.close()
+        if already_stopping:
+            self._stopped.wait()
+            return
+        try:
+            self.backend.close()
+        finally:
+            self.status = "stopped"
+            self.stopped_at = time.time()
+            self._stopped.set()
+        increment("meeting_audio_minutes_total", self.audio_seconds / 60)
+        logger.info(f"⏹️ Live meeting {self.live_id} stopped after {self.audio_seconds / 60:.1f} min "
+                    f"({len(self.utterances)} utterances, {self._tracker.speakers} speakers)")
+
+    def to_dict(self):
+        return {
+            "live_id": self.live_id,
+            "session_id": self.session_id,
+            "status": self.status,
+            "backend": self.backend.name,
+            "audio_seconds": round(self.audio_seconds, 2),
+            "utterances": len(self.utterances),
+            "speakers": self._tracker.speakers,
+            "summary_until": self.summary_until,
+            "started_at": self.started_at,
+            "stopped_at": self.stopped_at,
+        }
+
+
+class LiveManager:
+    """
+    Tracks live meetings by id. Stopped meetings are forgotten (with their recording)
+    after JOB_TTL_SECONDS; meetings that stopped receiving audio are stopped after
+    LIVE_IDLE_TIMEOUT. A background thread checks every LIVE_PRUNE_INTERVAL seconds,
+    so an abandoned meeting (and its Deepgram connection) is closed even if no other
+    meeting starts.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sessions = {}
+        self._pruner = None
+
+    def start(self, session_id, backend=None):
+        self._start_pruner()
+        self._prune()
+        live = LiveSession(session_id, backend)
+        with self._lock:
+            self._sessions[live.live_id] = live
+        return live
+
+    def get(self, live_id):
+        with self._lock:
+            return self._sessions.get(live_id)
+
+    def _start_pruner(self):
+        with self._lock:
+            if self._pruner is not None:
+                return
+            self._pruner = threading.Thread(target=self._prune_forever, name="live-prune", daemon=True)
+        self._pruner.start()
+
+    def _prune_forever(self):
+        while True:
+            time.sleep(LIVE_PRUNE_INTERVAL)
+            try:
+                self._prune()
+            except Exception as e:
+                logger.warning(f"⚠️ Pruning live meetings failed: {str(e)}")
+
+    def _prune(self):
+        now = time.time()
+        with self._lock:
+            sessions = list(self._sessions.values())
+        for live in sessions:
+            if live.status == "recording" and now - live.last_audio_at > LIVE_IDLE_TIMEOUT:
+                logger.info(f"Stopping abandoned live meeting {live.live_id}")
+                live.stop()
+            elif live.stopped_at is not None and now - live.stopped_at > JOB_TTL_SECONDS:
+                with self._lock:
+                    self._sessions.pop(live.live_id, None)
+                shutil.rmtree(live.output_dir, ignore_errors=True)
+
+    def stats(self):
+        with self._lock:
+            counts = {}
+            for live in self._sessions.values():
+                counts[live.status] = counts.get(live.status, 0) + 1
+            return {"sessions": counts}
+
+
+# Process-wide manager used by the UI
+live_manager = LiveManager()
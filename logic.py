@@ -3,92 +3,351 @@
 # Handles transcription, summarization, PDF export, and email sending
 
 from transcription_manager import process_meeting_audio as speech_to_text
-from summarization import summarize_text
+from summarization import stream_summary, stream_summary_update, estimate_tokens, SUMMARY_MAP_REDUCE_THRESHOLD
 from utils.pdf_export import export_to_pdf
-from utils.email_sender import send_meeting_report
 from utils.logger import get_logger
+from jobs import job_manager, QueueFullError
+from outbox import outbox
+from live import live_manager, LIVE_SUMMARY_INTERVAL_MINUTES
+from meeting_index import meeting_index, MEETING_INDEX_ENABLED
+from utils.telemetry import span
+from utils.transcript import Transcript
 import os
 import re
 import time
+import uuid
 
 logger = get_logger("Logic")
 
-# State variables to track last generated content
-last_pdf_path = None
-last_summary = None
+def run_pipeline(job, hedge=None):
+    """
+    Handles the full pipeline for one job: Transcription -> Summarization -> PDF Export.
+    `hedge` races the transcription backends for latency-critical meetings.
+
+    Runs on a job worker. Partial results are published to the job as soon as they
+    exist: the transcript when transcription finishes, the summary while Groq streams
+    it, and the PDF last. Every stage is a telemetry span nested under the job span;
+    stage durations are also stored on the job.
+    """
+    audio_file = job.audio_file
+    logger.info(f"Processing new meeting audio: {audio_file} (job {job.job_id})")
+    
+    with span("job", job_id=job.job_id):
+        job.publish("", "*⏳ Transcribing audio...*")
+        
+        # 1. Transcribe
+        with span("transcription") as stage:
+            transcript = speech_to_text(audio_file, hedge=hedge)
+        job.timings["transcription"] = stage.duration
+        
+        # Errors come back as an "Error: ..." string instead of a Transcript
+        if isinstance(transcript, str):
+            job.error = transcript
+            job.publish(transcript, "Summarization skipped due to transcription error.")
+            return
+        
+        # First useful output: the transcript, while the summary is still being written
+        job.publish(transcript, "*⏳ Summarizing...*")
+        
+        _summarize_and_export(job, transcript, stream_summary(transcript))
+
+def _summarize_and_export(job, transcript, summary_updates):
+    """
+    Streams the summary to the job, then exports the PDF (the last two pipeline stages).
+    """
+    # 2. Summarize (streamed)
+    summary = ""
+    with span("summarization") as stage:
+        for summary in summary_updates:
+            if summary.startswith("Error"):
+                break
+            job.publish(transcript, summary)
+    job.timings["summarization"] = stage.duration
+    
+    if not summary or summary.startswith("Error"):
+        job.error = summary or "Error: Summarization returned no content."
+        job.publish(transcript, job.error)
+        return
+    
+    # 3. Export to PDF (one output path per job so concurrent reports never collide)
+    with span("pdf_export") as stage:
+        pdf_path = export_to_pdf(summary, transcript, output_path=os.path.join(job.output_dir, "meeting_report.pdf"))
+    job.timings["pdf"] = stage.duration
+    
+    job.publish(transcript, summary, pdf_path)
+    
+    # 4. Make the meeting searchable (on the index's writer thread; the job does not wait)
+    if MEETING_INDEX_ENABLED:
+        meeting_index.submit(transcript, summary, meeting_id=job.job_id, source=job.audio_file,
+                             created_at=job.created_at)
 
-def process_meeting(audio_file):
+def process_meeting(audio_file, session_id=None, latency_critical=None):
     """
-    Handles the full pipeline: Transcription -> Summarization -> PDF Export.
+    Submits the audio as a background job and streams its progress to the UI.
+
+    Args:
+        audio_file (str): Path to the uploaded audio.
+        session_id (str): The caller's session (created on first use).
+        latency_critical (bool): Race the transcription backends and use the first
+            result, at the cost of extra API usage (default: ROUTER_HEDGING).
+
+    Yields:
+        tuple: (transcript, summary, pdf_path, email_status, session_id)
     """
-    global last_pdf_path, last_summary
+    session_id = session_id or uuid.uuid4().hex
     
     if audio_file is None:
-        return "Please upload an audio file.", "", None, ""
+        yield "Please upload an audio file.", "", None, "", session_id
+        return
     
-    logger.info(f"Processing new meeting audio: {audio_file}")
-    pipeline_start = time.time()
+    try:
+        job = job_manager.submit(session_id, audio_file, lambda job: run_pipeline(job, hedge=latency_critical))
+    except QueueFullError as e:
+        yield "", f"⚠️ The server is busy: {str(e)}", None, "", session_id
+        return
     
-    # 1. Transcribe
-    logger.info("⏱️ Starting transcription...")
-    transcription_start = time.time()
-    transcript = speech_to_text(audio_file)
-    transcription_time = time.time() - transcription_start
-    logger.info(f"✅ Transcription completed in {transcription_time:.2f} seconds")
+    yield "", f"*⏳ Job `{job.job_id}` queued...*", None, "", session_id
+    for transcript, summary, pdf_path in _watch_text(job):
+        yield transcript, summary, pdf_path, "", session_id
     
-    if transcript.startswith("Error"):
-        return transcript, "Summarization skipped due to transcription error.", None, ""
+    logger.info(f"🎉 Job {job.job_id} finished with status '{job.status}' "
+                f"in {job.timings.get('total', 0):.2f} seconds")
+
+def _watch_text(job):
+    """
+    job_manager.watch() for the UI: the transcript is rendered as text once per
+    Transcript, not on every streamed summary update.
+    """
+    rendered, text = None, ""
+    for transcript, summary, pdf_path in job_manager.watch(job):
+        if transcript is not rendered:
+            rendered, text = transcript, str(transcript or "")
+        yield text, summary, pdf_path
+
+def get_job_status(job_id):
+    """
+    Returns the state, artifacts and timings of a job, or None if it is unknown.
+    """
+    job = job_manager.get(job_id)
+    return job.to_dict() if job else None
+
+def run_live_pipeline(job, live):
+    """
+    Finishes a live meeting: flushes the stream, then folds whatever the rolling summary
+    does not cover yet into it and exports the PDF. Most of the meeting is already
+    transcribed and summarized at this point, so this takes seconds.
+    """
+    logger.info(f"Finishing live meeting {live.live_id} (job {job.job_id})")
     
-    # 2. Summarize
-    logger.info("⏱️ Starting summarization...")
-    summarization_start = time.time()
-    summary = summarize_text(transcript)
-    summarization_time = time.time() - summarization_start
-    logger.info(f"✅ Summarization completed in {summarization_time:.2f} seconds")
+    with span("job", job_id=job.job_id, live_id=live.live_id):
+        # 1. The last utterances still in flight
+        with span("transcription") as stage:
+            live.stop()
+            live.wait_for_summary()
+        job.timings["transcription"] = stage.duration
+        
+        transcript = Transcript.from_records(live.utterances)
+        if not transcript:
+            job.error = "Error: No speech was captured during the live meeting."
+            job.publish("", job.error)
+            return
+        
+        previous, tail = live.summary, transcript.to_text(live.summary_covers)
+        if previous and not tail:
+            updates = iter([previous])
+        elif previous and estimate_tokens(tail) <= SUMMARY_MAP_REDUCE_THRESHOLD:
+            updates = stream_summary_update(previous, tail)
+        else:
+            # No rolling summary yet (a short meeting) or it fell far behind
+            updates = stream_summary(transcript)
+        job.publish(transcript, previous or "*⏳ Summarizing...*")
+        
+        _summarize_and_export(job, transcript, updates)
+
+def _format_clock(seconds):
+    minutes, seconds = divmod(int(seconds), 60)
+    return f"{minutes:02d}:{seconds:02d}"
+
+def _live_summary_view(live):
+    if live.summary:
+        return f"*🔴 Live — summary as of {_format_clock(live.summary_until)}*\n\n{live.summary}"
+    return (f"*🔴 Recording {_format_clock(live.audio_seconds)} — the first summary appears after "
+            f"{LIVE_SUMMARY_INTERVAL_MINUTES:g} min.*")
+
+def stream_live_audio(chunk, live_id=None, session_id=None):
+    """
+    Streaming handler for the live microphone: adds one chunk to the session's live
+    meeting (starting it on the first chunk of audio) and returns the transcript so far.
+    Chunks that arrive after the meeting was stopped are ignored.
+
+    Args:
+        chunk (tuple): (sample_rate, numpy samples) from gr.Audio(streaming=True).
+        live_id (str): The live meeting being recorded, or None.
+        session_id (str): The caller's session (created on first use).
+
+    Returns:
+        tuple: (transcript, summary, live_id, session_id); transcript and summary are
+        None when the call changed nothing (the UI keeps what it shows).
+    """
+    session_id = session_id or uuid.uuid4().hex
+    live = live_manager.get(live_id) if live_id else None
+    if live is not None and live.status != "recording":
+        # Sent before the recording stopped; the stop handler owns the outputs now
+        return None, None, None, session_id
+    if chunk is None:
+        if live is None:
+            return None, None, None, session_id
+        return live.transcript(), _live_summary_view(live), live.live_id, session_id
+    
+    if live is None:
+        live = live_manager.start(session_id)
+    sample_rate, data = chunk
+    live.feed(sample_rate, data)
+    return live.transcript(), _live_summary_view(live), live.live_id, session_id
+
+def stop_live_meeting(live_id=None, session_id=None):
+    """
+    Stops the live meeting and streams the final summary and PDF to the UI. The report
+    is stored like any other job, so it can be emailed afterwards.
+
+    Yields:
+        tuple: (transcript, summary, pdf_path, email_status, live_id, session_id)
+    """
+    session_id = session_id or uuid.uuid4().hex
+    live = live_manager.get(live_id) if live_id else None
+    if live is None:
+        yield "", "⚠️ No live meeting is being recorded.", None, "", None, session_id
+        return
     
-    if summary.startswith("Error"):
-        return transcript, summary, None, ""
+    try:
+        job = job_manager.submit(session_id, live.recording_path, lambda job: run_live_pipeline(job, live), express=True)
+    except QueueFullError as e:
+        yield live.transcript(), f"⚠️ The server is busy: {str(e)}", None, "", None, session_id
+        return
     
-    # 3. Export to PDF
-    logger.info("⏱️ Starting PDF export...")
-    pdf_start = time.time()
-    pdf_path = export_to_pdf(summary, transcript)
-    pdf_time = time.time() - pdf_start
-    logger.info(f"✅ PDF export completed in {pdf_time:.2f} seconds")
+    for transcript, summary, pdf_path in _watch_text(job):
+        yield transcript, summary, pdf_path, "", None, session_id
     
-    # Store for email sending
-    last_pdf_path = pdf_path
-    last_summary = summary
+    logger.info(f"🎉 Live meeting {live.live_id} report finished with status '{job.status}' "
+                f"{job.timings.get('total', 0):.2f} seconds after stopping")
+
+def export_transcript(job_id, fmt="srt"):
+    """
+    Writes a finished job's transcript next to its report and returns the file path
+    (or None if the job has no transcript).
+
+    Args:
+        fmt (str): "json", "srt" or "vtt".
+    """
+    renderers = {"json": lambda t: t.to_json(indent=2), "srt": Transcript.to_srt, "vtt": Transcript.to_vtt}
+    if fmt not in renderers:
+        raise ValueError(f"Unsupported transcript format: {fmt}")
+    job = job_manager.get(job_id)
+    if job is None or not isinstance(job.transcript, Transcript):
+        return None
+    
+    path = os.path.join(job.output_dir, f"transcript.{fmt}")
+    os.makedirs(job.output_dir, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(renderers[fmt](job.transcript))
+    return path
+
+# Search tab time filters (days back; None = any time)
+SEARCH_PERIODS = {"Any time": None, "Last 7 days": 7, "Last 30 days": 30, "Last 365 days": 365}
+
+def search_meetings(query, speaker="", period="Any time"):
+    """
+    Searches every processed meeting and returns the best matches as Markdown,
+    grouped by meeting (best meeting first).
+    """
+    if not query or not query.strip():
+        return "Enter a few words to search for, e.g. *decided billing migration*."
     
-    total_time = time.time() - pipeline_start
-    logger.info(f"🎉 Meeting processing complete in {total_time:.2f} seconds")
-    logger.info(f"📊 Breakdown: Transcription={transcription_time:.2f}s, Summarization={summarization_time:.2f}s, PDF={pdf_time:.2f}s")
+    days = SEARCH_PERIODS.get(period)
+    since = time.time() - days * 86400 if days else None
+    hits = meeting_index.search(query, speaker=(speaker or "").strip() or None, since=since)
+    if not hits:
+        return f"No processed meeting matches *{query.strip()}*."
     
-    return transcript, summary, pdf_path, ""
+    by_meeting = {}
+    for hit in hits:
+        by_meeting.setdefault(hit.meeting_id, []).append(hit)
+    blocks = []
+    for meeting_hits in by_meeting.values():
+        first = meeting_hits[0]
+        date = time.strftime("%Y-%m-%d %H:%M", time.localtime(first.created_at))
+        lines = [f"### {first.title}", f"*{date} · meeting `{first.meeting_id}`*", ""]
+        for hit in meeting_hits[:3]:
+            if hit.kind == "summary":
+                where = "Summary"
+            else:
+                where = hit.speaker or "Transcript"
+                if hit.start is not None:
+                    where += f" at {_format_clock(hit.start)}"
+            lines.append(f"- **{where}:** {hit.snippet}")
+        blocks.append("\n".join(lines))
+    return "\n\n".join(blocks)
+
+def get_live_status(live_id):
+    """
+    Returns the state of a live meeting, or None if it is unknown.
+    """
+    live = live_manager.get(live_id)
+    return live.to_dict() if live else None
+
+def _parse_recipients(recipient_email):
+    return [address for address in re.split(r"[,;\s]+", recipient_email or "") if address]
 
-def send_email(recipient_email):
+def send_email(recipient_email, session_id=None):
     """
-    Sends the last generated meeting report via email.
+    Queues the session's most recent meeting report for one or more recipients
+    (separated by commas, semicolons or spaces) and returns immediately.
     """
+    recipients = _parse_recipients(recipient_email)
     # Validate email is not empty
-    if not recipient_email or not recipient_email.strip():
+    if not recipients:
         return "⚠️ Please enter a valid email address."
     
     # Validate email format using regex
     email_pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    if not re.match(email_pattern, recipient_email.strip()):
-        return "⚠️ Invalid email format. Please enter a valid email address (e.g., user@example.com)."
+    invalid = [address for address in recipients if not re.match(email_pattern, address)]
+    if invalid:
+        return (f"⚠️ Invalid email format: {', '.join(invalid)}. "
+                "Please enter valid email addresses (e.g., user@example.com).")
     
-    if not last_pdf_path or not last_summary:
+    job = job_manager.latest_for_session(session_id) if session_id else None
+    if not job or not job.pdf_path or not job.summary:
         return "⚠️ No report available. Please process a meeting first."
     
-    if not os.path.exists(last_pdf_path):
+    if not os.path.exists(job.pdf_path):
         return "⚠️ PDF file not found. Please regenerate the report."
     
-    logger.info(f"Sending email to: {recipient_email}")
-    result = send_meeting_report(recipient_email, last_pdf_path, last_summary)
+    logger.info(f"Queueing email to: {', '.join(recipients)} (job {job.job_id})")
+    delivery = outbox.submit(recipients, job.pdf_path, job.summary, session_id=session_id, job_id=job.job_id)
+    return f"📨 Report queued for {', '.join(recipients)} (delivery `{delivery.delivery_id}`)."
+
+def get_email_status(session_id=None):
+    """
+    Describes the delivery status of the session's most recent email.
+    """
+    delivery = outbox.latest_for_session(session_id) if session_id else None
+    if delivery is None:
+        return "No email has been sent in this session yet."
     
-    if result is True:
-        return f"✅ Email sent successfully to {recipient_email}!"
-    else:
-        return f"❌ Failed to send email: {result}"
+    recipients = ", ".join(delivery.recipients)
+    if delivery.status == "sent":
+        if delivery.refused:
+            return f"⚠️ Email sent, but refused for: {', '.join(delivery.refused)}"
+        return f"✅ Email sent successfully to {recipients}!"
+    if delivery.status == "failed":
+        return f"❌ Failed to send email: {delivery.error}"
+    if delivery.status == "retrying":
+        return f"⏳ Retrying delivery to {recipients} (attempt {delivery.attempts} failed: {delivery.error})"
+    return f"⏳ Sending to {recipients}..."
+
+def get_delivery_status(delivery_id):
+    """
+    Returns the state of an email delivery, or None if it is unknown.
+    """
+    delivery = outbox.get(delivery_id)
+    return delivery.to_dict() if delivery else None
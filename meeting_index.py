@@ -0,0 +1,563 @@
+# meeting_index.py
+# Persistent, searchable index over every processed meeting
+# This module contains:
+# 1. A MeetingIndex backed by one local SQLite file: meeting metadata, every transcript turn
+#    (speaker, start, end) and the summary's lines as passages, with an FTS5 inverted index
+#    (BM25 ranking, Porter stemming) over the passage text.
+# 2. Optional semantic search with a local sentence-transformers model
+#    (MEETING_INDEX_EMBEDDING_MODEL); its vectors are fused with the full-text ranking.
+# 3. Incremental updates: finished jobs are added on a background writer thread, so the
+#    pipeline never waits for indexing. A transcript that is already indexed is skipped.
+#
+# Nothing leaves the machine: the index is a file and the embedding model runs locally.
+#
+# Usage:
+#   from meeting_index import meeting_index
+#   for hit in meeting_index.search("decided billing migration", speaker="Speaker 1"):
+#       print(hit.title, hit.speaker, hit.start, hit.snippet)
+
+import importlib.util
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from utils.model_registry import ModelRegistry
+from utils.result_cache import text_digest
+from utils.telemetry import span
+from utils.transcript import Transcript
+from utils.logger import get_logger
+
+logger = get_logger("MeetingIndex")
+
+# The index file (created on first use)
+MEETING_INDEX_PATH = os.getenv("MEETING_INDEX_PATH", os.path.join("data", "meeting_index.sqlite3"))
+# Set to 0/false to stop adding new meetings (searching what is indexed keeps working)
+MEETING_INDEX_ENABLED = os.getenv("MEETING_INDEX_ENABLED", "true").lower() in ("1", "true", "yes")
+# Local sentence-transformers model for semantic search, e.g. "all-MiniLM-L6-v2" (empty = full text only)
+MEETING_INDEX_EMBEDDING_MODEL = os.getenv("MEETING_INDEX_EMBEDDING_MODEL", "")
+# Passages returned by a search
+MEETING_SEARCH_LIMIT = int(os.getenv("MEETING_SEARCH_LIMIT", 20))
+# Matches ranked per query, newest first. Bounds the cost of very common words; a query
+# matching more passages than this is ranked over the most recently indexed ones.
+MEETING_SEARCH_MAX_CANDIDATES = int(os.getenv("MEETING_SEARCH_MAX_CANDIDATES", 2000))
+
+# Summary lines state decisions and action items; rank them above a transcript turn with the same score
+_SUMMARY_BOOST = 1.5
+# Reciprocal rank fusion constant (the usual 60 from the literature)
+_RRF_K = 60
+# Semantic candidates considered before filters are applied
+_SEMANTIC_CANDIDATES = 200
+# Cosine similarity below which a passage is not a semantic match
+_SEMANTIC_MIN_SCORE = float(os.getenv("MEETING_SEARCH_MIN_SIMILARITY", 0.3))
+# Words of a snippet around the first match
+_SNIPPET_WORDS = 24
+# Ignored in queries that have other words (they match nearly every passage)
+_STOPWORDS = frozenset(
+    "a an and are as at be but by did do does for from had has have he her his i if in is it its me my "
+    "of on or our she so that the their them then there they this to was we were what when where which "
+    "who why will with would you your".split()
+)
+_PUNCTUATION = ".,;:!?\"'()*"
+_TERM = re.compile(r'"([^"]+)"|([\w\'-]+\*?)', re.UNICODE)
+_MARKDOWN = re.compile(r"^\s*(?:#+|[-*+]|\d+[.)])\s*|\*\*|__|`")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meetings (
+    meeting_id TEXT PRIMARY KEY,
+    title TEXT,
+    source TEXT,
+    created_at REAL,
+    duration REAL,
+    speakers TEXT,
+    summary TEXT,
+    transcript_digest TEXT UNIQUE,
+    first_passage INTEGER,
+    last_passage INTEGER,
+    indexed_at REAL
+);
+CREATE INDEX IF NOT EXISTS meetings_created_at ON meetings(created_at);
+CREATE TABLE IF NOT EXISTS passages (
+    passage_id INTEGER PRIMARY KEY,
+    meeting_id TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    speaker TEXT,
+    start REAL,
+    end REAL,
+    text TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS passages_meeting ON passages(meeting_id, kind, position);
+CREATE VIRTUAL TABLE IF NOT EXISTS passages_fts USING fts5(
+    text, content='passages', content_rowid='passage_id', tokenize='porter unicode61'
+);
+CREATE TABLE IF NOT EXISTS passage_vectors (
+    passage_id INTEGER PRIMARY KEY,
+    model TEXT NOT NULL,
+    vector BLOB NOT NULL
+);
+"""
+
+_embedding_registry = ModelRegistry(idle_timeout=float(os.getenv("MEETING_INDEX_EMBEDDING_IDLE_TIMEOUT", 1800)))
+
+
+@lru_cache(maxsize=None)
+def embeddings_available():
+    """
+    True if semantic search is configured and sentence-transformers is installed.
+    """
+    return bool(MEETING_INDEX_EMBEDDING_MODEL) and importlib.util.find_spec("sentence_transformers") is not None
+
+
+def _embed(texts):
+    """
+    Returns L2-normalized float32 embeddings (one row per text) from the local model.
+    """
+    def load():
+        from sentence_transformers import SentenceTransformer
+        return SentenceTransformer(MEETING_INDEX_EMBEDDING_MODEL, device="cpu")
+
+    model = _embedding_registry.get(MEETING_INDEX_EMBEDDING_MODEL, load)
+    return model.encode(list(texts), batch_size=64, normalize_embeddings=True,
+                        convert_to_numpy=True, show_progress_bar=False).astype("float32")
+
+
+def _query_terms(query):
+    # [(words, is_phrase, is_prefix)] with stopwords dropped when other terms remain
+    terms = []
+    for phrase, word in _TERM.findall(query or ""):
+        if phrase:
+            words = re.findall(r"[\w'-]+", phrase.lower())
+            if words:
+                terms.append((words, True, False))
+        elif word.rstrip("*"):
+            terms.append(([word.rstrip("*").lower()], False, word.endswith("*")))
+    content = [term for term in terms if term[1] or term[2] or term[0][0] not in _STOPWORDS]
+    return content or terms
+
+
+def match_expression(query):
+    """
+    Turns free text into an FTS5 query: every word must appear (in any form the stemmer
+    maps together), "quoted phrases" must appear as written, and a trailing * matches
+    a prefix. FTS5 operators in the input are treated as plain words, and stopwords
+    are ignored unless the query has nothing else.
+
+    Returns:
+        (str, str): The AND expression and the OR fallback, or ("", "") for an empty query.
+    """
+    terms = ['"' + " ".join(words).replace('"', '""') + '"' + ("*" if prefix else "")
+             for words, _, prefix in _query_terms(query)]
+    return " AND ".join(terms), " OR ".join(terms)
+
+
+def highlight(text, query, width=_SNIPPET_WORDS):
+    """
+    Returns a window of about `width` words around the first query match, with matches in bold.
+    Words count as matches when they start with a query word ("decide" marks "decided").
+    """
+    stems = {word for words, _, _ in _query_terms(query) for word in words}
+    words = text.split()
+    marked, first = [], None
+    for index, word in enumerate(words):
+        core = word.strip(_PUNCTUATION)
+        if core and any(core.lower().startswith(stem) for stem in stems):
+            word = word.replace(core, f"**{core}**", 1)
+            first = index if first is None else first
+        marked.append(word)
+    start = max(0, min((first or 0) - width // 4, len(words) - width))
+    window = " ".join(marked[start:start + width])
+    return ("…" if start else "") + window + ("…" if start + width < len(words) else "")
+
+
+def _summary_lines(summary):
+    # One passage per non-empty line, without Markdown markers
+    for line in (summary or "").splitlines():
+        text = _MARKDOWN.sub("", line).strip()
+        if text:
+            yield text
+
+
+class SearchHit:
+    """
+    One matching passage: a transcript turn or a line of the meeting's summary.
+    """
+
+    __slots__ = ("meeting_id", "title", "created_at", "kind", "position", "speaker", "start", "end",
+                 "text", "snippet", "score")
+
+    def __init__(self, meeting_id, title, created_at, kind, position, speaker, start, end, text, snippet, score):
+        self.meeting_id = meeting_id
+        self.title = title
+        self.created_at = created_at
+        self.kind = kind  # "turn" or "summary"
+        self.position = position
+        self.speaker = speaker
+        self.start = start
+        self.end = end
+        self.text = text
+        self.snippet = snippet
+        self.score = score
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class MeetingIndex:
+    """
+    Full-text (and optionally semantic) index over processed meetings.
+
+    Each thread gets its own SQLite connection; the file runs in WAL mode, so searches
+    never wait for the writer. All writes go through one background thread.
+
+    Args:
+        path (str): The SQLite file.
+    """
+
+    def __init__(self, path=MEETING_INDEX_PATH):
+        self.path = path
+        self._local = threading.local()
+        self._schema_lock = threading.Lock()
+        self._ready = False
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="meeting-index")
+        # Semantic search: (passage ids, matrix) loaded on the first query, extended on writes
+        self._vectors_lock = threading.Lock()
+        self._vectors = None
+
+    # --- Storage ---
+
+    def _connection(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=30)
+            connection.row_factory = sqlite3.Row
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            with self._schema_lock:
+                if not self._ready:
+                    connection.executescript(_SCHEMA)
+                    self._ready = True
+            self._local.connection = connection
+        return connection
+
+    # --- Writing ---
+
+    def add(self, transcript, summary="", meeting_id=None, title=None, source=None, created_at=None):
+        """
+        Indexes one meeting and returns its id. A meeting whose transcript is already
+        indexed is not added twice; the existing id is returned.
+
+        Args:
+            transcript (Transcript or str): The meeting transcript.
+            summary (str): The Markdown summary.
+            meeting_id (str): Stable id (default: a new one); re-adding an id replaces it.
+            title (str): Shown in search results (default: the source file name).
+            source (str): Where the meeting came from (e.g. the audio file).
+            created_at (float): Unix time of the meeting (default: now).
+        """
+        if not isinstance(transcript, Transcript):
+            transcript = Transcript.from_text(transcript or "")
+        digest = text_digest(transcript.to_text())
+        meeting_id = meeting_id or uuid.uuid4().hex[:12]
+        title = title or (os.path.splitext(os.path.basename(source))[0] if source else meeting_id)
+
+        with span("meeting_index.add", log=False, meeting_id=meeting_id) as current:
+            connection = self._connection()
+            existing = connection.execute("SELECT meeting_id FROM meetings WHERE transcript_digest = ?",
+                                          (digest,)).fetchone()
+            if existing is not None and existing["meeting_id"] != meeting_id:
+                logger.info(f"🔎 Meeting {meeting_id} is already indexed as {existing['meeting_id']}")
+                return existing["meeting_id"]
+
+            passages = [("turn", position, segment.speaker or None, segment.start, segment.end, segment.text)
+                        for position, segment in enumerate(transcript) if segment.text.strip()]
+            passages += [("summary", position, None, None, None, text)
+                         for position, text in enumerate(_summary_lines(summary))]
+            with connection:
+                self._delete(connection, meeting_id)
+                # A meeting's passages get consecutive ids, so time filters can narrow searches by id range
+                first = connection.execute("SELECT COALESCE(MAX(passage_id), 0) + 1 FROM passages").fetchone()[0]
+                rows = [(first + offset, meeting_id, *passage) for offset, passage in enumerate(passages)]
+                connection.execute(
+                    "INSERT INTO meetings (meeting_id, title, source, created_at, duration, speakers, summary, "
+                    "transcript_digest, first_passage, last_passage, indexed_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (meeting_id, title, source, created_at or time.time(), transcript.duration,
+                     json.dumps([speaker for speaker in transcript.speakers if speaker]), summary or "",
+                     digest, first, first + len(rows) - 1, time.time()))
+                connection.executemany(
+                    "INSERT INTO passages (passage_id, meeting_id, kind, position, speaker, start, end, text) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+                connection.executemany("INSERT INTO passages_fts (rowid, text) VALUES (?, ?)",
+                                       [(row[0], row[-1]) for row in rows])
+                if embeddings_available() and rows:
+                    self._add_vectors(connection, [row[0] for row in rows], [row[-1] for row in rows])
+            current.set(passages=len(rows))
+        logger.info(f"🔎 Indexed meeting {meeting_id} ({len(rows)} passages) in {current.duration * 1000:.0f} ms")
+        return meeting_id
+
+    def submit(self, transcript, summary="", **metadata):
+        """
+        add() on the background writer; returns a Future with the meeting id.
+        Indexing errors are logged, never raised into the pipeline.
+        """
+        def run():
+            try:
+                return self.add(transcript, summary, **metadata)
+            except Exception as e:
+                logger.error(f"❌ Could not index meeting {metadata.get('meeting_id')}: {str(e)}")
+                return None
+        return self._writer.submit(run)
+
+    def remove(self, meeting_id):
+        """
+        Removes a meeting from the index. Returns False if it was not indexed.
+        """
+        connection = self._connection()
+        with connection:
+            removed = self._delete(connection, meeting_id)
+        return removed
+
+    def _delete(self, connection, meeting_id):
+        rows = connection.execute("SELECT passage_id, text FROM passages WHERE meeting_id = ?",
+                                  (meeting_id,)).fetchall()
+        connection.executemany("INSERT INTO passages_fts (passages_fts, rowid, text) VALUES ('delete', ?, ?)",
+                               [(row["passage_id"], row["text"]) for row in rows])
+        connection.execute("DELETE FROM passage_vectors WHERE passage_id IN "
+                           "(SELECT passage_id FROM passages WHERE meeting_id = ?)", (meeting_id,))
+        connection.execute("DELETE FROM passages WHERE meeting_id = ?", (meeting_id,))
+        deleted = connection.execute("DELETE FROM meetings WHERE meeting_id = ?", (meeting_id,)).rowcount
+        if rows and self._vectors is not None:
+            with self._vectors_lock:
+                self._vectors = None  # reloaded without the removed passages on the next query
+        return deleted > 0
+
+    def embed_missing(self, batch_size=512):
+        """
+        Embeds passages indexed before semantic search was enabled (or with another model).
+        Returns the number of passages embedded.
+        """
+        if not embeddings_available():
+            return 0
+        connection = self._connection()
+        done = 0
+        while True:
+            rows = connection.execute(
+                "SELECT p.passage_id, p.text FROM passages p LEFT JOIN passage_vectors v "
+                "ON v.passage_id = p.passage_id AND v.model = ? WHERE v.passage_id IS NULL LIMIT ?",
+                (MEETING_INDEX_EMBEDDING_MODEL, batch_size)).fetchall()
+            if not rows:
+                return done
+            with connection:
+                self._add_vectors(connection, [row["passage_id"] for row in rows], [row["text"] for row in rows])
+            done += len(rows)
+
+    def _add_vectors(self, connection, passage_ids, texts):
+        import numpy as np
+        vectors = _embed(texts)
+        connection.executemany("INSERT OR REPLACE INTO passage_vectors (passage_id, model, vector) VALUES (?, ?, ?)",
+                               [(passage_id, MEETING_INDEX_EMBEDDING_MODEL, vector.tobytes())
+                                for passage_id, vector in zip(passage_ids, vectors)])
+        with self._vectors_lock:
+            if self._vectors is not None:
+                ids, matrix = self._vectors
+                self._vectors = (np.concatenate([ids, np.asarray(passage_ids, dtype=np.int64)]),
+                                 np.vstack([matrix, vectors]) if len(ids) else vectors)
+
+    # --- Reading ---
+
+    def search(self, query, limit=MEETING_SEARCH_LIMIT, speaker=None, since=None, until=None, kind=None,
+               mode="auto"):
+        """
+        Finds the passages that best match a query, best first.
+
+        Args:
+            query (str): Free text; "quoted phrases" and prefix* are supported.
+            limit (int): Maximum number of hits.
+            speaker (str): Only turns by this speaker label (case-insensitive).
+            since, until (float): Only meetings created in [since, until) (Unix time).
+            kind (str): "turn" or "summary" to search only one of them.
+            mode (str): "text", "semantic", or "auto" (both, fused, when embeddings are enabled).
+
+        Returns:
+            list[SearchHit]
+        """
+        filters, parameters = [], []
+        if speaker:
+            filters.append("p.speaker = ? COLLATE NOCASE")
+            parameters.append(speaker.strip())
+        if since is not None:
+            filters.append("m.created_at >= ?")
+            parameters.append(since)
+        if until is not None:
+            filters.append("m.created_at < ?")
+            parameters.append(until)
+        if kind:
+            filters.append("p.kind = ?")
+            parameters.append(kind)
+
+        with span("meeting_index.search", log=False, mode=mode) as current:
+            semantic = mode == "semantic" or (mode == "auto" and embeddings_available())
+            hits = [] if mode == "semantic" else self._text_search(query, limit, filters, parameters,
+                                                                    self._passage_range(since, until))
+            if semantic and query and query.strip():
+                hits = self._fuse(hits, self._semantic_search(query, limit, filters, parameters), limit)
+            current.set(hits=len(hits))
+        return hits
+
+    def _passage_range(self, since, until):
+        """
+        Lowest and highest passage id of the meetings in [since, until), so a time filter
+        narrows the FTS5 scan by rowid instead of checking every match's meeting.
+        """
+        if since is None and until is None:
+            return None
+        row = self._connection().execute(
+            "SELECT MIN(first_passage), MAX(last_passage) FROM meetings WHERE created_at >= ? AND created_at < ?",
+            (since if since is not None else float("-inf"), until if until is not None else float("inf"))).fetchone()
+        return (row[0], row[1]) if row[0] is not None else (0, -1)
+
+    def _text_search(self, query, limit, filters, parameters, passage_range=None):
+        connection = self._connection()
+        if passage_range is not None:
+            filters = [*filters, "passages_fts.rowid BETWEEN ? AND ?"]
+            parameters = [*parameters, *passage_range]
+        # 1. BM25 over the newest matches only (ordering FTS5 by rowid stops the scan early);
+        #    filters need the passage and meeting rows, so they are joined only when present
+        joins = (" JOIN passages p ON p.passage_id = passages_fts.rowid JOIN meetings m ON m.meeting_id = p.meeting_id"
+                 if filters else "")
+        candidates = ("SELECT rowid, score FROM (SELECT passages_fts.rowid AS rowid, bm25(passages_fts) AS score "
+                      "FROM passages_fts" + joins + " WHERE passages_fts MATCH ?" +
+                      "".join(f" AND {condition}" for condition in filters) +
+                      " ORDER BY passages_fts.rowid DESC LIMIT ?) ORDER BY score LIMIT ?")
+        scores = {}
+        # Every word first; if nothing has all of them, any of them
+        for expression in dict.fromkeys(match_expression(query)):
+            if not expression:
+                continue
+            # A few more than needed, so boosted summary lines can move up
+            scores = dict(connection.execute(candidates, (expression, *parameters, MEETING_SEARCH_MAX_CANDIDATES,
+                                                          limit * 3)).fetchall())
+            if scores:
+                break
+        if not scores:
+            return []
+
+        # 2. Details of the best candidates; bm25() is negative (lower is better), scores reported are positive
+        rows = self._passages(scores)
+        ranked = [(row, -scores[row["passage_id"]] * (_SUMMARY_BOOST if row["kind"] == "summary" else 1.0))
+                  for row in rows]
+        ranked.sort(key=lambda item: item[1], reverse=True)
+        return [self._hit(row, highlight(row["text"], query), round(score, 4)) for row, score in ranked[:limit]]
+
+    def _passages(self, passage_ids, filters=(), parameters=()):
+        placeholders = ",".join("?" * len(passage_ids))
+        return self._connection().execute(
+            "SELECT p.passage_id, p.meeting_id, m.title, m.created_at, p.kind, p.position, p.speaker, p.start, "
+            "p.end, p.text FROM passages p JOIN meetings m ON m.meeting_id = p.meeting_id "
+            f"WHERE p.passage_id IN ({placeholders})" + "".join(f" AND {condition}" for condition in filters),
+            (*passage_ids, *parameters)).fetchall()
+
+    def _semantic_search(self, query, limit, filters, parameters):
+        import numpy as np
+        ids, matrix = self._load_vectors()
+        if not len(ids):
+            return []
+        scores = matrix @ _embed([query])[0]
+        count = min(len(ids), max(_SEMANTIC_CANDIDATES, limit))
+        best = np.argpartition(-scores, count - 1)[:count]
+        best = best[np.argsort(-scores[best])]
+        by_id = {int(ids[index]): float(scores[index]) for index in best if scores[index] >= _SEMANTIC_MIN_SCORE}
+        if not by_id:
+            return []
+
+        rows = self._passages(list(by_id), filters, parameters)
+        rows = sorted(rows, key=lambda row: by_id[row["passage_id"]], reverse=True)[:limit]
+        return [self._hit(row, highlight(row["text"], query), round(by_id[row["passage_id"]], 4)) for row in rows]
+
+    def _load_vectors(self):
+        import numpy as np
+        with self._vectors_lock:
+            if self._vectors is None:
+                rows = self._connection().execute("SELECT passage_id, vector FROM passage_vectors WHERE model = ?",
+                                                  (MEETING_INDEX_EMBEDDING_MODEL,)).fetchall()
+                ids = np.fromiter((row["passage_id"] for row in rows), dtype=np.int64, count=len(rows))
+                matrix = (np.vstack([np.frombuffer(row["vector"], dtype=np.float32) for row in rows])
+                          if rows else np.zeros((0, 0), dtype=np.float32))
+                self._vectors = (ids, matrix)
+            return self._vectors
+
+    @staticmethod
+    def _fuse(text_hits, semantic_hits, limit):
+        # Reciprocal rank fusion: robust to the two rankings having unrelated score scales
+        fused, hits = {}, {}
+        for ranking in (text_hits, semantic_hits):
+            for rank, hit in enumerate(ranking):
+                key = (hit.meeting_id, hit.kind, hit.position)
+                fused[key] = fused.get(key, 0.0) + 1.0 / (_RRF_K + rank + 1)
+                hits.setdefault(key, hit)
+        ordered = sorted(fused, key=fused.get, reverse=True)[:limit]
+        for key in ordered:
+            hits[key].score = round(fused[key], 6)
+        return [hits[key] for key in ordered]
+
+    @staticmethod
+    def _hit(row, snippet, score):
+        return SearchHit(row["meeting_id"], row["title"], row["created_at"], row["kind"], row["position"],
+                         row["speaker"], row["start"], row["end"], row["text"], snippet, score)
+
+    def get(self, meeting_id):
+        """
+        Returns a meeting's metadata, summary and Transcript, or None if it is not indexed.
+        """
+        connection = self._connection()
+        meeting = connection.execute("SELECT * FROM meetings WHERE meeting_id = ?", (meeting_id,)).fetchone()
+        if meeting is None:
+            return None
+        turns = connection.execute("SELECT speaker, start, end, text FROM passages "
+                                   "WHERE meeting_id = ? AND kind = 'turn' ORDER BY position",
+                                   (meeting_id,)).fetchall()
+        transcript = Transcript()
+        for turn in turns:
+            transcript.append(turn["speaker"], turn["text"], turn["start"], turn["end"])
+        return {**self._meeting_dict(meeting), "summary": meeting["summary"], "transcript": transcript}
+
+    def meetings(self, limit=50, offset=0):
+        """
+        Returns indexed meetings, most recent first (metadata only).
+        """
+        rows = self._connection().execute("SELECT * FROM meetings ORDER BY created_at DESC LIMIT ? OFFSET ?",
+                                          (limit, offset)).fetchall()
+        return [self._meeting_dict(row) for row in rows]
+
+    @staticmethod
+    def _meeting_dict(row):
+        return {"meeting_id": row["meeting_id"], "title": row["title"], "source": row["source"],
+                "created_at": row["created_at"], "duration": row["duration"],
+                "speakers": json.loads(row["speakers"] or "[]"), "indexed_at": row["indexed_at"]}
+
+    def stats(self):
+        """
+        Returns meeting and passage counts, the file size and whether semantic search is on.
+        """
+        connection = self._connection()
+        meetings = connection.execute("SELECT COUNT(*) FROM meetings").fetchone()[0]
+        passages = connection.execute("SELECT COUNT(*) FROM passages").fetchone()[0]
+        size = sum(os.path.getsize(self.path + suffix) for suffix in ("", "-wal") if os.path.exists(self.path + suffix))
+        return {"path": self.path, "meetings": meetings, "passages": passages, "bytes": size,
+                "semantic": embeddings_available()}
+
+    def flush(self, timeout=None):
+        """
+        Waits until every meeting submitted so far is indexed.
+        """
+        self._writer.submit(lambda: None).result(timeout)
+
+
+# Process-wide index fed by the pipeline (see logic.py)
+meeting_index = MeetingIndex()
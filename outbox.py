@@ -0,0 +1,254 @@
+# outbox.py
+# Background email outbox for meeting reports
+# This module contains:
+# 1. A Delivery record with a queryable status (queued -> sending -> sent | retrying | failed).
+# 2. An Outbox that sends deliveries on background workers, so the UI returns immediately.
+# 3. Retries with exponential backoff for temporary failures, through either the SMTP
+#    (pooled persistent sessions) or the SendGrid transport.
+#
+# One delivery carries one report to any number of recipients and is sent as a single batch.
+# Report attachments are encoded once and shared by later deliveries of the same report.
+
+import heapq
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from utils.email_sender import ReportMessage, get_smtp_transport
+from utils.logger import get_logger
+
+logger = get_logger("Outbox")
+
+# Deliveries sent at the same time
+OUTBOX_WORKERS = int(os.getenv("OUTBOX_WORKERS", 2))
+# Attempts per delivery before it is marked failed
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", 4))
+# Delay before the first retry; doubles on every further attempt up to OUTBOX_BACKOFF_MAX
+OUTBOX_BACKOFF_SECONDS = float(os.getenv("OUTBOX_BACKOFF_SECONDS", 2))
+OUTBOX_BACKOFF_MAX = float(os.getenv("OUTBOX_BACKOFF_MAX", 60))
+# Finished deliveries remembered for status queries
+OUTBOX_HISTORY = int(os.getenv("OUTBOX_HISTORY", 500))
+# Encoded reports kept for reuse by later deliveries
+_REPORT_CACHE_SIZE = 16
+
+
+def get_transport(name=None):
+    """
+    Returns the transport named by EMAIL_TRANSPORT ("smtp" or "sendgrid").
+    Without it, SendGrid is used when SENDGRID_API_KEY is set and SMTP otherwise.
+    """
+    name = (name or os.getenv("EMAIL_TRANSPORT") or ("sendgrid" if os.getenv("SENDGRID_API_KEY") else "smtp")).lower()
+    if name == "sendgrid":
+        from utils.sendgrid_handler import get_sendgrid_transport
+        return get_sendgrid_transport()
+    return get_smtp_transport()
+
+
+class Delivery:
+    """
+    One report sent to a list of recipients.
+    """
+
+    def __init__(self, recipients, pdf_path, summary_text, session_id=None, job_id=None):
+        self.delivery_id = uuid.uuid4().hex[:12]
+        self.recipients = list(recipients)
+        self.pdf_path = pdf_path
+        self.summary_text = summary_text
+        self.session_id = session_id
+        self.job_id = job_id
+        self.transport = None
+        self.status = "queued"  # queued -> sending -> sent | retrying -> ... | failed
+        self.attempts = 0
+        self.error = None
+        self.refused = []
+        self.created_at = time.time()
+        self.next_attempt_at = None
+        self.sent_at = None
+        self.finished = threading.Event()
+
+    def to_dict(self):
+        return {
+            "delivery_id": self.delivery_id,
+            "recipients": list(self.recipients),
+            "job_id": self.job_id,
+            "transport": self.transport,
+            "status": self.status,
+            "attempts": self.attempts,
+            "error": self.error,
+            "refused": list(self.refused),
+            "created_at": self.created_at,
+            "next_attempt_at": self.next_attempt_at,
+            "sent_at": self.sent_at,
+        }
+
+
+class Outbox:
+    """
+    Queue of report deliveries processed by background workers.
+
+    Args:
+        workers (int): Number of sender threads.
+        transport: Object with send(report, recipients), is_retryable(error) and
+            configuration_error(); defaults to get_transport() at send time.
+    """
+
+    def __init__(self, workers=OUTBOX_WORKERS, transport=None):
+        self.workers = workers
+        self._transport = transport
+        self._lock = threading.Lock()
+        self._ready = threading.Condition(self._lock)
+        self._schedule = []  # heap of (due_time, sequence, delivery)
+        self._sequence = 0
+        self._deliveries = OrderedDict()  # delivery_id -> Delivery
+        self._by_session = {}             # session_id -> latest delivery_id
+        self._reports = OrderedDict()     # (pdf_path, mtime, summary hash) -> ReportMessage
+        self._threads = []
+
+    def _start(self):
+        if self._threads:
+            return
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._worker, name=f"outbox-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def _report_for(self, delivery):
+        try:
+            mtime = os.path.getmtime(delivery.pdf_path)
+        except (OSError, TypeError):
+            mtime = None
+        key = (delivery.pdf_path, mtime, hash(delivery.summary_text))
+        with self._lock:
+            report = self._reports.get(key)
+            if report is None:
+                report = self._reports[key] = ReportMessage(delivery.pdf_path, delivery.summary_text)
+                while len(self._reports) > _REPORT_CACHE_SIZE:
+                    self._reports.popitem(last=False)
+            else:
+                self._reports.move_to_end(key)
+            return report
+
+    def submit(self, recipients, pdf_path, summary_text, session_id=None, job_id=None):
+        """
+        Queues a report for the given recipients and returns the Delivery immediately.
+        """
+        delivery = Delivery(recipients, pdf_path, summary_text, session_id=session_id, job_id=job_id)
+        with self._lock:
+            self._start()
+            self._deliveries[delivery.delivery_id] = delivery
+            if session_id:
+                self._by_session[session_id] = delivery.delivery_id
+            self._prune()
+            self._push(delivery, time.time())
+        logger.info(f"📨 Queued delivery {delivery.delivery_id} to {len(delivery.recipients)} recipient(s)")
+        return delivery
+
+    def _push(self, delivery, due):
+        self._sequence += 1
+        heapq.heappush(self._schedule, (due, self._sequence, delivery))
+        self._ready.notify()
+
+    def _prune(self):
+        # Forget the oldest finished deliveries beyond OUTBOX_HISTORY
+        excess = len(self._deliveries) - OUTBOX_HISTORY
+        for delivery_id in list(self._deliveries):
+            if excess <= 0:
+                break
+            delivery = self._deliveries[delivery_id]
+            if delivery.finished.is_set():
+                del self._deliveries[delivery_id]
+                if self._by_session.get(delivery.session_id) == delivery_id:
+                    del self._by_session[delivery.session_id]
+                excess -= 1
+
+    def _next(self):
+        with self._lock:
+            while True:
+                if self._schedule:
+                    due = self._schedule[0][0]
+                    wait = due - time.time()
+                    if wait <= 0:
+                        return heapq.heappop(self._schedule)[2]
+                    self._ready.wait(wait)
+                else:
+                    self._ready.wait()
+
+    def _worker(self):
+        while True:
+            delivery = self._next()
+            try:
+                self._attempt(delivery)
+            except Exception as e:
+                # Never let one delivery take a worker down
+                logger.error(f"❌ Outbox worker error on {delivery.delivery_id}: {str(e)}")
+                self._finish(delivery, "failed", f"Error: {str(e)}")
+
+    def _attempt(self, delivery):
+        transport = self._transport or get_transport()
+        delivery.transport = transport.name
+        error = transport.configuration_error()
+        if error:
+            self._finish(delivery, "failed", error)
+            return
+
+        delivery.status = "sending"
+        delivery.attempts += 1
+        try:
+            refused = transport.send(self._report_for(delivery), delivery.recipients)
+        except Exception as e:
+            retryable = transport.is_retryable(e)
+            if retryable and delivery.attempts < OUTBOX_MAX_ATTEMPTS:
+                backoff = min(OUTBOX_BACKOFF_MAX, OUTBOX_BACKOFF_SECONDS * 2 ** (delivery.attempts - 1))
+                delivery.status = "retrying"
+                delivery.error = f"Error: {str(e)}"
+                delivery.next_attempt_at = time.time() + backoff
+                logger.warning(f"⚠️ Delivery {delivery.delivery_id} attempt {delivery.attempts} failed "
+                               f"({str(e)}), retrying in {backoff:.1f}s")
+                with self._lock:
+                    self._push(delivery, delivery.next_attempt_at)
+                return
+            logger.error(f"❌ Delivery {delivery.delivery_id} failed after {delivery.attempts} attempt(s): {str(e)}")
+            self._finish(delivery, "failed", f"Error: {str(e)}")
+            return
+
+        delivery.refused = sorted(refused or [])
+        delivery.sent_at = time.time()
+        logger.info(f"✅ Delivery {delivery.delivery_id} sent via {transport.name} "
+                    f"to {len(delivery.recipients) - len(delivery.refused)} recipient(s)")
+        self._finish(delivery, "sent", None)
+
+    def _finish(self, delivery, status, error):
+        delivery.status = status
+        delivery.error = error
+        delivery.next_attempt_at = None
+        delivery.finished.set()
+
+    def get(self, delivery_id):
+        with self._lock:
+            return self._deliveries.get(delivery_id)
+
+    def latest_for_session(self, session_id):
+        with self._lock:
+            delivery_id = self._by_session.get(session_id)
+            return self._deliveries.get(delivery_id) if delivery_id else None
+
+    def wait(self, delivery_id, timeout=None):
+        """
+        Blocks until the delivery is sent or has failed; returns it (or None if unknown).
+        """
+        delivery = self.get(delivery_id)
+        if delivery is not None:
+            delivery.finished.wait(timeout)
+        return delivery
+
+    def stats(self):
+        with self._lock:
+            counts = {}
+            for delivery in self._deliveries.values():
+                counts[delivery.status] = counts.get(delivery.status, 0) + 1
+            return {"workers": self.workers, "scheduled": len(self._schedule), "by_status": counts}
+
+
+# Process-wide outbox
+outbox = Outbox()
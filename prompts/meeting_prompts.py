@@ -1,5 +1,8 @@
 # Meeting-related prompt templates
 
+# Bump whenever a prompt below changes so cached summaries are regenerated
+PROMPT_VERSION = "2"
+
 MEETING_SUMMARY_PROMPT = """
 You are an expert meeting assistant. Your task is to provide a concise and professional summary of the following meeting transcript.
 
@@ -26,3 +29,72 @@ Transcript:
 
 Please format your response in clear Markdown.
 """
+
+# Map step: summarize one slice of a long meeting. Output is an intermediate
+# note for the reduce step, so it keeps facts and owners rather than polishing prose.
+CHUNK_SUMMARY_PROMPT = """
+You are an expert meeting assistant. The following is part {part} of {total} of a long meeting transcript.
+
+Extract, as concise bullet points:
+- The main topics discussed and their outcomes
+- Any decisions made
+- Any action items, with the responsible person and deadline if mentioned
+- Any follow-ups, next meetings or milestones
+
+Only include information present in this part. Keep speaker names exactly as written.
+
+Transcript part {part} of {total}:
+{transcript}
+"""
+
+# Reduce step: merge the partial notes into the standard four-heading summary
+REDUCE_SUMMARY_PROMPT = """
+You are an expert meeting assistant. Below are notes taken from consecutive parts of a single long meeting.
+Merge them into one concise and professional summary of the whole meeting. Remove duplicates and keep decisions and action items complete.
+
+OUTPUT FORMAT:
+
+These are the only headings you should use:
+
+## Executive Summary
+
+## Key Decisions
+
+## Action Items
+
+## Next Steps   
+
+Notes:
+{partial_summaries}
+
+Please format your response in clear Markdown.
+"""
+
+# Live mode: fold the newest part of a meeting that is still running into the summary so far.
+# The result keeps the standard headings, so the last update can serve as the final summary.
+ROLLING_SUMMARY_PROMPT = """
+You are an expert meeting assistant taking notes during a meeting that is still in progress.
+Below is your summary of the meeting so far, followed by the transcript of what was said since.
+Update the summary so it covers the whole meeting up to now. Keep earlier decisions and action items
+unless the new transcript changes them, and keep speaker names exactly as written.
+
+OUTPUT FORMAT:
+
+These are the only headings you should use:
+
+## Executive Summary
+
+## Key Decisions
+
+## Action Items
+
+## Next Steps   
+
+Summary so far:
+{previous_summary}
+
+New transcript:
+{transcript}
+
+Please format your response in clear Markdown.
+"""
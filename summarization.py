@@ -1,50 +1,380 @@
 import os
 import time
-from dotenv import load_dotenv
-from groq import Groq
+from concurrent.futures import ThreadPoolExecutor
+from utils.env import load_env
 from utils.logger import get_logger
-from prompts.meeting_prompts import MEETING_SUMMARY_PROMPT
+from utils.api_clients import get_groq_client
+from utils.api_scheduler import api_scheduler
+from prompts.meeting_prompts import (
+    MEETING_SUMMARY_PROMPT, CHUNK_SUMMARY_PROMPT, REDUCE_SUMMARY_PROMPT, ROLLING_SUMMARY_PROMPT, PROMPT_VERSION
+)
+from utils import result_cache
+from utils.telemetry import span, propagate, increment
+from utils.transcript import Transcript, as_text
+from utils.transcript_compaction import CompactionRules, compact_transcript, compact_to_budget, estimate_tokens
 
 logger = get_logger("Summarization")
 
-load_dotenv()
+load_env()
+
+SUMMARY_MODEL = "llama-3.3-70b-versatile"
+SUMMARY_TEMPERATURE = 0.3
+SUMMARY_MAX_TOKENS = 2048
+
+# Map-reduce mode for transcripts that would overflow (or slow down) a single request
+SUMMARY_MAP_REDUCE_THRESHOLD = int(os.getenv("SUMMARY_MAP_REDUCE_THRESHOLD", 24000))
+SUMMARY_CHUNK_TOKENS = int(os.getenv("SUMMARY_CHUNK_TOKENS", 8000))
+SUMMARY_CHUNK_MAX_TOKENS = 1024
+SUMMARY_CONCURRENCY = int(os.getenv("SUMMARY_CONCURRENCY", 4))
+
+# Compact transcripts (fillers, backchannels, repeated speaker labels) before they are sent
+SUMMARY_COMPACTION = os.getenv("SUMMARY_COMPACTION", "true").lower() in ("1", "true", "yes")
+# Largest single-request summary prompt in tokens; longer transcripts are compacted harder,
+# then summarized with map-reduce
+_SUMMARY_PROMPT_OVERHEAD = estimate_tokens(MEETING_SUMMARY_PROMPT.format(transcript=""))
+_CHUNK_PROMPT_OVERHEAD = estimate_tokens(CHUNK_SUMMARY_PROMPT.format(part=999, total=999, transcript=""))
+SUMMARY_PROMPT_BUDGET = int(os.getenv("SUMMARY_PROMPT_BUDGET", SUMMARY_MAP_REDUCE_THRESHOLD + _SUMMARY_PROMPT_OVERHEAD))
+_compaction_rules = CompactionRules()
 
 def summarize_text(transcript):
     """
     Summarizes a meeting transcript using Groq's LLaMA API.
     
     Args:
-        transcript (str): The transcribed text of the meeting.
+        transcript (Transcript or str): The transcribed text of the meeting.
         
     Returns:
         str: The generated summary in Markdown format.
     """
     logger.info("Starting summarization of transcript.")
+    text = as_text(transcript)
     
-    if not transcript or not transcript.strip():
+    if not text or not text.strip():
         logger.warning("Empty transcript provided for summarization.")
         return "Error: No transcript content to summarize."
 
+    # The same transcript with the same model and prompt yields a cached summary
+    return result_cache.cached_call(
+        "summary",
+        result_cache.text_digest(text),
+        _cache_config(),
+        lambda: _summarize_with_groq(transcript),
+        _is_valid_summary
+    )
+
+def stream_summary(transcript):
+    """
+    Summarizes a meeting transcript, streaming tokens from Groq as they arrive.
+
+    Args:
+        transcript (Transcript or str): The transcribed text of the meeting.
+
+    Yields:
+        str: The summary accumulated so far (the last value is the full summary,
+        or an error message starting with "Error").
+    """
+    logger.info("Starting streamed summarization of transcript.")
+    text = as_text(transcript)
+
+    if not text or not text.strip():
+        logger.warning("Empty transcript provided for summarization.")
+        yield "Error: No transcript content to summarize."
+        return
+
+    cache_key = None
+    if result_cache.is_enabled():
+        cache_key = result_cache.make_key("summary", result_cache.text_digest(text), _cache_config())
+        cached = result_cache.get(cache_key)
+        if cached is not None:
+            logger.info("♻️ Cache hit for summary")
+            yield cached
+            return
+
+    summary = ""
     try:
-        groq_api_key = os.getenv("GROQ_API_KEY")
-        client = Groq(api_key=groq_api_key)
-        
-        prompt = MEETING_SUMMARY_PROMPT.format(transcript=transcript)
-        
-        logger.info("⏱️ Calling Groq API for summarization...")
-        api_start = time.time()
-        completion = client.chat.completions.create(
-            model="llama-3.3-70b-versatile",
-            messages=[
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.3,
-            max_tokens=2048
-        )
-        api_time = time.time() - api_start
-        logger.info(f"✅ Groq API call completed in {api_time:.2f} seconds")
-        
-        summary = completion.choices[0].message.content
+        client = get_groq_client()
+
+        prompt, label = _build_final_prompt(client, transcript)
+        for delta in _chat_stream(client, prompt, label):
+            summary += delta
+            yield summary
+    except Exception as e:
+        error_msg = f"Error during summarization: {str(e)}"
+        logger.error(error_msg)
+        yield error_msg
+        return
+
+    logger.info("Summarization successful.")
+    if cache_key and _is_valid_summary(summary):
+        result_cache.put(cache_key, summary)
+
+def _update_prompt(previous_summary, transcript):
+    transcript = compact_transcript(transcript, _compaction_rules).text if SUMMARY_COMPACTION else as_text(transcript)
+    if not previous_summary:
+        return MEETING_SUMMARY_PROMPT.format(transcript=transcript)
+    return ROLLING_SUMMARY_PROMPT.format(previous_summary=previous_summary, transcript=transcript)
+
+def update_summary(previous_summary, transcript):
+    """
+    Folds new transcript into a running summary (live mode). Not cached: the
+    input changes with every refresh.
+
+    Args:
+        previous_summary (str): Summary of the meeting so far, or None for the first one.
+        transcript (Transcript or str): Transcript of everything said since that summary.
+
+    Returns:
+        str: The updated summary, or an error message starting with "Error".
+    """
+    try:
+        client = get_groq_client()
+        return _chat(client, _update_prompt(previous_summary, transcript), "Rolling summary")
+    except Exception as e:
+        error_msg = f"Error during summarization: {str(e)}"
+        logger.error(error_msg)
+        return error_msg
+
+def stream_summary_update(previous_summary, transcript):
+    """
+    Streamed variant of update_summary, used for the final summary of a live meeting.
+
+    Yields:
+        str: The summary accumulated so far (the last value is the full summary,
+        or an error message starting with "Error").
+    """
+    summary = ""
+    try:
+        client = get_groq_client()
+        for delta in _chat_stream(client, _update_prompt(previous_summary, transcript), "Final summary update"):
+            summary += delta
+            yield summary
+    except Exception as e:
+        error_msg = f"Error during summarization: {str(e)}"
+        logger.error(error_msg)
+        yield error_msg
+
+def _cache_config():
+    """
+    Everything besides the transcript that changes the summary output.
+    """
+    return {
+        "model": SUMMARY_MODEL,
+        "temperature": SUMMARY_TEMPERATURE,
+        "max_tokens": SUMMARY_MAX_TOKENS,
+        "prompt_version": PROMPT_VERSION,
+        "map_reduce_threshold": SUMMARY_MAP_REDUCE_THRESHOLD,
+        "chunk_tokens": SUMMARY_CHUNK_TOKENS,
+        "prompt_budget": SUMMARY_PROMPT_BUDGET,
+        "compaction": _compaction_rules.signature() if SUMMARY_COMPACTION else None,
+    }
+
+def _is_valid_summary(result):
+    return isinstance(result, str) and bool(result.strip()) and not result.startswith("Error")
+
+def split_transcript(transcript, max_tokens):
+    """
+    Splits a transcript into chunks of at most max_tokens, cutting only between
+    speaker turns (lines). A single turn longer than the budget is split on words.
+    Accepts a Transcript or its "Speaker: text" form.
+
+    Returns:
+        list: Transcript chunks in order.
+    """
+    chunks, current, current_tokens = [], [], 0
+
+    def flush():
+        nonlocal current, current_tokens
+        if current:
+            chunks.append("\n".join(current))
+        current, current_tokens = [], 0
+
+    lines = transcript.lines() if isinstance(transcript, Transcript) else transcript.splitlines()
+    for line in lines:
+        if not line.strip():
+            continue
+        line_tokens = estimate_tokens(line)
+
+        if line_tokens > max_tokens:
+            # Oversized monologue: break it up, repeating the speaker label on each piece
+            flush()
+            speaker, sep, text = line.partition(": ")
+            prefix = f"{speaker}: " if sep else ""
+            words = (text if sep else line).split()
+            piece = []
+            for word in words:
+                piece.append(word)
+                if estimate_tokens(" ".join(piece)) >= max_tokens:
+                    chunks.append(prefix + " ".join(piece))
+                    piece = []
+            if piece:
+                chunks.append(prefix + " ".join(piece))
+            continue
+
+        if current_tokens + line_tokens > max_tokens:
+            flush()
+        current.append(line)
+        current_tokens += line_tokens
+
+    flush()
+    return chunks
+
+def _record_usage(call, label, usage):
+    """
+    Logs the latency of a finished LLM call and counts its token usage.
+    """
+    if usage is not None:
+        increment("meeting_llm_tokens_total", usage.prompt_tokens, type="prompt")
+        increment("meeting_llm_tokens_total", usage.completion_tokens, type="completion")
+        call.set(prompt_tokens=usage.prompt_tokens, completion_tokens=usage.completion_tokens)
+        logger.info(f"✅ {label} completed in {call.duration:.2f}s "
+                    f"(prompt={usage.prompt_tokens}, completion={usage.completion_tokens} tokens)")
+    else:
+        logger.info(f"✅ {label} completed in {call.duration:.2f}s")
+
+def _reserve(prompt, max_tokens):
+    """
+    Returns the chat lane and the tokens to reserve on it: Groq counts the prompt plus
+    max_tokens against the tokens-per-minute limit until the completion is done.
+    """
+    return api_scheduler.lane("groq", SUMMARY_MODEL, "chat"), estimate_tokens(prompt) + max_tokens
+
+def _settle(lane, reserved, used):
+    # Give back what the completion did not use (all of it if the call failed or the stream
+    # was abandoned), or charge an underestimated prompt
+    lane.settle("tokens", reserved, used or 0)
+
+def _chat(client, prompt, label, max_tokens=SUMMARY_MAX_TOKENS):
+    """
+    Runs one chat completion and logs its latency and token usage.
+    The call waits for rate-limit capacity and is retried on 429s (see utils/api_scheduler.py).
+    """
+    lane, reserved = _reserve(prompt, max_tokens)
+    used = None
+    try:
+        with span("summarization.llm_call", log=False, label=label) as call:
+            completion = api_scheduler.call(lane, lambda: client.chat.completions.create(
+                model=SUMMARY_MODEL,
+                messages=[
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=SUMMARY_TEMPERATURE,
+                max_tokens=max_tokens
+            ), {"tokens": reserved})
+        usage = getattr(completion, "usage", None)
+        used = usage.total_tokens if usage is not None else reserved
+    finally:
+        _settle(lane, reserved, used)
+
+    _record_usage(call, label, usage)
+    return completion.choices[0].message.content
+
+def _chat_stream(client, prompt, label, max_tokens=SUMMARY_MAX_TOKENS):
+    """
+    Runs one streamed chat completion, yielding content deltas.
+    Logs time-to-first-token, total latency and token usage when Groq reports it.
+    """
+    usage = None
+    used = None
+    lane, reserved = _reserve(prompt, max_tokens)
+    try:
+        with span("summarization.llm_call", log=False, label=label, stream=True) as call:
+            # Rate limits are enforced when the request starts, so only opening the stream is scheduled
+            stream = api_scheduler.call(lane, lambda: client.chat.completions.create(
+                model=SUMMARY_MODEL,
+                messages=[
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=SUMMARY_TEMPERATURE,
+                max_tokens=max_tokens,
+                stream=True
+            ), {"tokens": reserved})
+            first_token_time = None
+            for chunk in stream:
+                x_groq = getattr(chunk, "x_groq", None)
+                if x_groq is not None and getattr(x_groq, "usage", None) is not None:
+                    usage = x_groq.usage
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    if first_token_time is None:
+                        first_token_time = time.perf_counter() - call.start
+                        call.set(first_token_seconds=round(first_token_time, 3))
+                        logger.info(f"⚡ {label}: first token after {first_token_time:.2f}s")
+                    yield delta
+        used = usage.total_tokens if usage is not None else reserved
+    finally:
+        _settle(lane, reserved, used)
+    _record_usage(call, label, usage)
+
+def _compact_for_prompt(transcript):
+    """
+    Returns the transcript text that goes into the summary prompt: compacted to fit
+    SUMMARY_PROMPT_BUDGET where possible (see utils/transcript_compaction.py).
+    """
+    if not SUMMARY_COMPACTION:
+        return as_text(transcript)
+    with span("summarization.compaction", log=False) as stage:
+        result = compact_to_budget(transcript, SUMMARY_PROMPT_BUDGET, _SUMMARY_PROMPT_OVERHEAD, _compaction_rules)
+        stage.set(**result.to_dict())
+    increment("meeting_transcript_tokens_total", result.tokens_before, stage="raw")
+    increment("meeting_transcript_tokens_total", result.tokens_after, stage="compacted")
+    logger.info(f"🗜️ Compacted transcript ({result.level}): ~{result.tokens_before} -> ~{result.tokens_after} tokens "
+                f"(-{result.reduction:.0%}), {result.turns_before} -> {result.turns_after} turns "
+                f"in {stage.duration * 1000:.0f} ms")
+    return result.text
+
+def _build_final_prompt(client, transcript):
+    """
+    Returns the (prompt, label) for the request that produces the final summary.
+    Transcripts whose compacted prompt exceeds SUMMARY_PROMPT_BUDGET run the map step
+    first and get the reduce prompt back.
+    """
+    text = _compact_for_prompt(transcript)
+    prompt = MEETING_SUMMARY_PROMPT.format(transcript=text)
+    prompt_tokens = estimate_tokens(prompt)
+    if prompt_tokens > SUMMARY_PROMPT_BUDGET:
+        logger.info(f"Summary prompt is ~{prompt_tokens} tokens (> {SUMMARY_PROMPT_BUDGET}) - using map-reduce")
+        return _map_partial_summaries(client, text), "Reduce pass"
+
+    logger.info(f"⏱️ Calling Groq API for summarization (~{prompt_tokens} prompt tokens)...")
+    return prompt, "Groq API call"
+
+def _map_partial_summaries(client, transcript):
+    """
+    Summarizes each transcript chunk in parallel and returns the reduce prompt
+    that merges them into the standard four-heading format.
+    """
+    # Every chunk prompt stays within the budget as well
+    chunks = split_transcript(transcript, min(SUMMARY_CHUNK_TOKENS, SUMMARY_PROMPT_BUDGET - _CHUNK_PROMPT_OVERHEAD))
+    total = len(chunks)
+    logger.info(f"⏱️ Map-reduce summarization: {total} chunks, concurrency={SUMMARY_CONCURRENCY}")
+
+    def summarize_chunk(indexed_chunk):
+        index, chunk = indexed_chunk
+        prompt = CHUNK_SUMMARY_PROMPT.format(part=index + 1, total=total, transcript=chunk)
+        return _chat(client, prompt, f"Chunk {index + 1}/{total} summary", max_tokens=SUMMARY_CHUNK_MAX_TOKENS)
+
+    with span("summarization.map", chunks=total):
+        with ThreadPoolExecutor(max_workers=SUMMARY_CONCURRENCY, thread_name_prefix="summary-map") as pool:
+            partials = list(pool.map(propagate(summarize_chunk), enumerate(chunks)))
+
+    partial_summaries = "\n\n".join(
+        f"### Part {index + 1}\n{partial.strip()}" for index, partial in enumerate(partials)
+    )
+    return REDUCE_SUMMARY_PROMPT.format(partial_summaries=partial_summaries)
+
+def _summarize_with_groq(transcript):
+    """
+    Performs the actual Groq chat-completion request(s) (no caching).
+    Transcripts that do not fit SUMMARY_PROMPT_BUDGET after compaction use the map-reduce path.
+    """
+    try:
+        client = get_groq_client()
+
+        prompt, label = _build_final_prompt(client, transcript)
+        summary = _chat(client, prompt, label)
+
         logger.info("Summarization successful.")
         return summary
     except Exception as e:
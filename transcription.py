@@ -1,45 +1,143 @@
 import os
-from dotenv import load_dotenv
-from groq import Groq
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from utils.env import load_env
 from utils.logger import get_logger
+from utils.api_clients import get_groq_client
+from utils.api_scheduler import api_scheduler
+from utils.audio_io import estimate_duration_seconds
+from utils import result_cache, audio_chunking
+from utils.telemetry import span, propagate, increment
 
 # Initialize logger
 logger = get_logger("Transcription")
 
 # Load environment variables (GROQ_API_KEY)
-load_dotenv()
+load_env()
+
+WHISPER_MODEL = "distil-whisper-large-v3-en"
+# Groq bills every Whisper request as at least this many seconds of audio
+_MIN_BILLED_SECONDS = 10
+
+# Files above this size are split at silences and transcribed chunk by chunk
+CHUNKING_THRESHOLD_MB = float(os.getenv("CHUNKING_THRESHOLD_MB", 20))
+# Maximum number of chunk uploads in flight at once
+TRANSCRIPTION_CONCURRENCY = int(os.getenv("TRANSCRIPTION_CONCURRENCY", 4))
 
 def transcribe_audio(file_path):
     """
     Transcribes an audio file using Groq's Whisper API.
-    
+    Results are cached by audio content hash, so re-uploads skip the API call.
+
     Args:
         file_path (str): Path to the audio file (mp3, wav, m4a, etc.)
-        
+
     Returns:
-        str: Transcribed text or an error message.
+        dict or str: verbose_json transcription (text, segments, words) or an error message.
     """
     logger.info(f"Starting transcription for: {file_path}")
-    
+
     if not os.path.exists(file_path):
         error_msg = f"Error: File not found at {file_path}"
         logger.error(error_msg)
         return error_msg
 
     try:
-        groq_api_key = os.getenv("GROQ_API_KEY")
-        client = Groq(api_key=groq_api_key)
-        
-        with open(file_path, "rb") as file:
-            transcription = client.audio.transcriptions.create(
-                file=(os.path.basename(file_path), file.read()),
-                model="distil-whisper-large-v3-en",
-                response_format="verbose_json"
-            )
-        
-        logger.info(f"Transcription successful for: {file_path}")
-        return transcription
+        return result_cache.cached_call(
+            "whisper",
+            result_cache.file_digest(file_path),
+            {
+                "model": WHISPER_MODEL,
+                "granularities": ["segment", "word"],
+                "chunk_max_seconds": audio_chunking.MAX_CHUNK_SECONDS,
+            },
+            lambda: _transcribe(file_path),
+            lambda result: isinstance(result, dict)
+        )
+    except Exception as e:
+        error_msg = f"Error during transcription: {str(e)}"
+        logger.error(error_msg)
+        return error_msg
+
+def _transcribe(file_path):
+    """
+    Sends small files in one request and long recordings through the chunked path.
+    """
+    size_mb = os.path.getsize(file_path) / (1024 * 1024)
+    if size_mb <= CHUNKING_THRESHOLD_MB:
+        return _transcribe_with_groq(file_path)
+    logger.info(f"File is {size_mb:.1f} MB (> {CHUNKING_THRESHOLD_MB:.0f} MB) - using chunked transcription")
+    return transcribe_audio_chunked(file_path)
+
+def transcribe_audio_chunked(file_path, concurrency=None):
+    """
+    Transcribes a long recording by splitting it at silences and uploading chunks concurrently.
+
+    Args:
+        file_path (str): Path to the audio file.
+        concurrency (int, optional): Maximum parallel uploads (defaults to TRANSCRIPTION_CONCURRENCY).
+
+    Returns:
+        dict: verbose_json-shaped transcription on the global timeline.
+    """
+    concurrency = concurrency or TRANSCRIPTION_CONCURRENCY
+    with tempfile.TemporaryDirectory(prefix="meeting_chunks_") as chunk_dir:
+        chunks = audio_chunking.split_audio(file_path, chunk_dir)
+
+        logger.info(f"Transcribing {len(chunks)} chunks with concurrency={concurrency}")
+        with span("whisper.chunks", chunks=len(chunks), concurrency=concurrency):
+            with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="whisper-chunk") as pool:
+                responses = list(pool.map(propagate(lambda chunk: _transcribe_with_groq(chunk[0])), chunks))
+
+    results = [(response, offset, end) for response, (_, offset, end) in zip(responses, chunks)]
+    return audio_chunking.stitch_transcriptions(results)
+
+def transcribe_clip(file_path):
+    """
+    Transcribes one short clip (a live-mode utterance) in a single request,
+    without caching or chunking.
+
+    Returns:
+        dict or str: verbose_json transcription or an error message.
+    """
+    try:
+        return _transcribe_with_groq(file_path, log=False)
     except Exception as e:
         error_msg = f"Error during transcription: {str(e)}"
         logger.error(error_msg)
         return error_msg
+
+def _transcribe_with_groq(file_path, log=True):
+    """
+    Performs the actual Groq Whisper request (no caching).
+    """
+    client = get_groq_client()
+
+    # Pass the open handle rather than file.read(): httpx streams it into the
+    # multipart body in small blocks, so memory does not grow with the file size.
+    size = os.path.getsize(file_path)
+    increment("meeting_upload_bytes_total", size, backend="groq")
+    lane = api_scheduler.lane("groq", WHISPER_MODEL, "whisper")
+    audio_seconds = max(_MIN_BILLED_SECONDS, estimate_duration_seconds(file_path))
+
+    def request():
+        # Reopened on every attempt, so a retried upload starts from the first byte
+        with open(file_path, "rb") as file:
+            return client.audio.transcriptions.create(
+                file=(os.path.basename(file_path), file),
+                model=WHISPER_MODEL,
+                response_format="verbose_json",
+                # Word timestamps let the aligner split segments at speaker changes
+                timestamp_granularities=["segment", "word"]
+            )
+
+    # Waits for requests-per-minute and audio-seconds-per-hour capacity; 429s are retried
+    with span("whisper.api_call", log=False, bytes=size, audio_seconds=round(audio_seconds, 1)):
+        transcription = api_scheduler.call(lane, request, {"audio_seconds": audio_seconds})
+
+    if log:
+        logger.info(f"Transcription successful for: {file_path}")
+    # The SDK returns a pydantic model; the rest of the pipeline works with plain dicts
+    if hasattr(transcription, "model_dump"):
+        return transcription.model_dump()
+    return transcription
@@ -1,108 +1,188 @@
+import importlib.util
 import os
-import time
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache, partial
 from transcription import transcribe_audio
 from diarization import diarize_audio
+from alignment import align_segments
 import deepgram_handler
+from backend_router import BackendRouter, BackendStrategy, ROUTER_HEDGING
+from utils.audio_preprocessing import OffsetMap, preprocess_audio
+from utils.telemetry import span, propagate, increment
+from utils.transcript import Transcript
 from utils.logger import get_logger
 
 logger = get_logger("TranscriptionManager")
 
-def align_segments(whisper_segments, pyannote_segments):
-    """
-    Aligns Whisper text segments with Pyannote speaker labels based on timestamps.
-    """
-    logger.info("Aligning Whisper transcription with Pyannote diarization...")
-    aligned_transcript = []
-    
-    for ws in whisper_segments:
-        w_start = ws.get('start', 0)
-        w_end = ws.get('end', 0)
-        w_text = ws.get('text', "").strip()
-        
-        # Find the speaker who was talking most during this segment
-        best_speaker = "Unknown Speaker"
-        max_overlap = 0
-        
-        for ps in pyannote_segments:
-            overlap = min(w_end, ps['end']) - max(w_start, ps['start'])
-            if overlap > max_overlap:
-                max_overlap = overlap
-                best_speaker = ps['speaker']
-        
-        aligned_transcript.append(f"{best_speaker}: {w_text}")
-    
-    return "\n".join(aligned_transcript)
-
-def process_meeting_audio(file_path):
+# Shared pool for the local flow. Whisper is a network call and Pyannote spends
+# its time inside torch (which releases the GIL), so threads are enough to overlap them.
+LOCAL_FLOW_WORKERS = int(os.getenv("LOCAL_FLOW_WORKERS", 4))
+_local_flow_executor = ThreadPoolExecutor(max_workers=LOCAL_FLOW_WORKERS, thread_name_prefix="local-flow")
+
+def _run_local_flow(file_path, offsets=None, waveform=None):
     """
-    Unified entry point for transcription and diarization.
-    Tries Local (Whisper + Pyannote) first, then falls back to Deepgram.
+    Runs Whisper transcription and Pyannote diarization concurrently and aligns them.
+    Both sides are moved back onto the original recording's timeline with `offsets`
+    (the OffsetMap from preprocessing) before alignment. `waveform` (the decoded
+    samples of file_path, or None) spares Pyannote from decoding the file again.
+
+    As soon as either side fails, the other one is cancelled (or abandoned if it
+    is already running) and None is returned so the caller can fall back to Deepgram.
+    Wall-clock time is roughly max(whisper, diarization) instead of their sum.
     """
-    logger.info(f"⏱️ Starting audio processing for: {file_path}")
-    total_start = time.time()
-    
-    # 0. Fast-check for Pyannote availability to avoid wasted Whisper calls
-    # If the user doesn't have local diarization, they likely want the full Deepgram experience.
-    pyannote_available = False
+    whisper_future = _local_flow_executor.submit(propagate(_traced("whisper", transcribe_audio)), file_path)
+    diarization_future = _local_flow_executor.submit(propagate(_traced("diarization", diarize_audio)), file_path,
+                                                     waveform=waveform)
+    futures = {whisper_future: "whisper", diarization_future: "diarization"}
+
     try:
-        from pyannote.audio import Pipeline
-        pyannote_available = True
-        logger.info("✅ Pyannote available - will try local flow first")
-    except ImportError:
-        logger.info("⚠️ pyannote.audio not found. Skipping local flow and falling back to Deepgram.")
-
-    if pyannote_available:
-        # 1. Try Local Flow
-        try:
-            logger.info("⏱️ Attempting local transcription flow (Whisper + Pyannote)...")
-            local_start = time.time()
-            
-            # Get verbose transcription (with segments)
-            whisper_response = transcribe_audio(file_path)
-            
-            if isinstance(whisper_response, dict) and 'segments' in whisper_response:
-                # Try diarization
-                pyannote_segments = diarize_audio(file_path)
-                
-                if pyannote_segments and isinstance(pyannote_segments, list):
-                    # Successful local flow - align them
-                    result = align_segments(whisper_response['segments'], pyannote_segments)
-                    local_time = time.time() - local_start
-                    total_time = time.time() - total_start
-                    logger.info(f"✅ Local transcription completed in {local_time:.2f}s (total: {total_time:.2f}s)")
-                    return result
-                else:
-                    logger.warning("⚠️ Diarization failed. Falling back to Deepgram for full speaker support.")
-                    # If diarization failed, we go to Deepgram instead of just plain Whisper
-                    # to fulfill the "diarized transcript" requirement.
-            else:
+        for future in as_completed(futures):
+            stage = futures[future]
+            result = future.result()
+
+            if stage == "whisper" and not (isinstance(result, dict) and 'segments' in result):
                 logger.warning("⚠️ Whisper failed or returned non-segmented output.")
-        except Exception as e:
-            logger.error(f"❌ Local flow failed: {str(e)}. Falling back to Deepgram.")
-        
-    # 2. Fallback to Deepgram (either because Pyannote is missing or local flow failed)
+                return None
+            if stage == "diarization" and not (result and isinstance(result, list)):
+                # If diarization failed, we go to Deepgram instead of just plain Whisper
+                # to fulfill the "diarized transcript" requirement.
+                logger.warning("⚠️ Diarization failed. Falling back to Deepgram for full speaker support.")
+                return None
+    finally:
+        # No-op for finished futures; drops the other side if we are bailing out early
+        for future in futures:
+            future.cancel()
+
+    # Both sides succeeded - align them
+    offsets = offsets or OffsetMap()
+    whisper_response = whisper_future.result()
+    with span("alignment"):
+        return align_segments(
+            offsets.remap(whisper_response['segments']),
+            offsets.remap(diarization_future.result()),
+            words=offsets.remap(whisper_response.get('words'))
+        )
+
+def _traced(name, fn):
+    """
+    Runs fn inside a telemetry span (used for work submitted to the local-flow pool).
+    """
+    def wrapper(*args, **kwargs):
+        with span(name):
+            return fn(*args, **kwargs)
+    return wrapper
+
+@lru_cache(maxsize=None)
+def module_available(name):
+    """
+    Detects an optional dependency once per process without importing it (the imports are heavy).
+    """
     try:
+        return importlib.util.find_spec(name) is not None
+    except ModuleNotFoundError:
+        # A parent package of a dotted name is missing
+        return False
+
+def pyannote_installed():
+    return module_available("pyannote.audio")
+
+class LocalBackend(BackendStrategy):
+    """
+    Groq Whisper transcription + local Pyannote diarization, aligned by timestamp.
+    """
+    name = "local"
+    priority = 0
+
+    def is_available(self):
+        return pyannote_installed()
+
+    def transcribe(self, file_path, offsets=None, waveform=None):
+        logger.info("⏱️ Attempting local transcription flow (Whisper + Pyannote)...")
+        return _run_local_flow(file_path, offsets, waveform)
+
+class DeepgramBackend(BackendStrategy):
+    """
+    Deepgram Nova-2 with built-in diarization, falling back to a plain transcript.
+    """
+    name = "deepgram"
+    priority = 1
+
+    def is_available(self):
+        return bool(os.getenv("DEEPGRAM_API_KEY")) and module_available("deepgram")
+
+    def transcribe(self, file_path, offsets=None, waveform=None):
         logger.info("🌐 Using Deepgram API for transcription and diarization.")
-        deepgram_start = time.time()
         deepgram_segments = deepgram_handler.diarize_audio(file_path)
-        
+
         if deepgram_segments and isinstance(deepgram_segments, list):
-            formatted_lines = [f"{s['speaker']}: {s['transcript']}" for s in deepgram_segments]
-            result = "\n".join(formatted_lines)
-            deepgram_time = time.time() - deepgram_start
-            total_time = time.time() - total_start
-            logger.info(f"✅ Deepgram transcription completed in {deepgram_time:.2f}s (total: {total_time:.2f}s)")
-            return result
-        else:
-            # Last ditch effort: Simple Deepgram transcription
-            logger.info("⚠️ Diarized segments empty, trying simple transcription...")
-            result = deepgram_handler.transcribe_audio(file_path)
-            deepgram_time = time.time() - deepgram_start
-            total_time = time.time() - total_start
-            logger.info(f"✅ Deepgram simple transcription completed in {deepgram_time:.2f}s (total: {total_time:.2f}s)")
-            return result
-            
+            # Segment times refer to the preprocessed file; report them on the original timeline
+            deepgram_segments = (offsets or OffsetMap()).remap(deepgram_segments)
+            return Transcript.from_records(deepgram_segments, text_key="transcript")
+
+        # Last ditch effort: Simple Deepgram transcription
+        logger.info("⚠️ Diarized segments empty, trying simple transcription...")
+        result = deepgram_handler.transcribe_audio(file_path)
+        if not result or result.startswith(("Error", "Deepgram Error")):
+            return None
+        # One unlabelled turn without times
+        transcript = Transcript()
+        transcript.append("", result)
+        return transcript
+
+# Process-wide router; its health statistics persist across jobs
+router = BackendRouter([LocalBackend(), DeepgramBackend()])
+
+def get_router_state():
+    """
+    Returns backend health, circuit-breaker state and recent routing decisions.
+    """
+    return router.state()
+
+def process_meeting_audio(file_path, hedge=None):
+    """
+    Unified entry point for transcription and diarization.
+    The recording is first preprocessed (16 kHz mono, long silences removed, compact
+    encoding), then routed to the healthy backend expected to be fastest (initially
+    the local Whisper + Pyannote flow when installed), falling through to the others.
+
+    With `hedge` (default ROUTER_HEDGING) the two best backends race, typically the
+    local flow against Deepgram, and the first valid transcript is used.
+
+    Returns:
+        Transcript, or an "Error: ..." string if every backend failed.
+    """
+    logger.info(f"Starting audio processing for: {file_path}")
+
+    # The router removes the directory once no backend uses it: the loser of a hedged
+    # race keeps reading the prepared file after route() has returned
+    prep_dir = tempfile.mkdtemp(prefix="meeting_prep_")
+    remove_prep_dir = partial(shutil.rmtree, prep_dir, ignore_errors=True)
+    try:
+        with span("preprocessing") as stage:
+            # Decoded samples are kept for Pyannote, which would otherwise decode the file again
+            prepared = preprocess_audio(file_path, prep_dir, keep_samples=pyannote_installed())
+            stage.set(original_bytes=prepared.original_bytes, processed_bytes=prepared.processed_bytes)
+        increment("meeting_audio_minutes_total", prepared.original_seconds / 60)
     except Exception as e:
-        total_time = time.time() - total_start
-        logger.error(f"❌ Deepgram fallback also failed after {total_time:.2f}s: {str(e)}")
+        remove_prep_dir()
+        logger.error(f"❌ Transcription failed: {str(e)}")
         return f"Error: All transcription methods failed. {str(e)}"
+
+    try:
+        result, backend_name = router.route(
+            prepared.path, prepared.processed_seconds / 60, offsets=prepared.offsets,
+            hedge=ROUTER_HEDGING if hedge is None else hedge, waveform=prepared.samples,
+            on_settled=remove_prep_dir
+        )
+    except Exception as e:
+        logger.error(f"❌ Transcription failed: {str(e)}")
+        return f"Error: All transcription methods failed. {str(e)}"
+
+    if result is None:
+        logger.error("❌ All transcription backends failed")
+        return "Error: All transcription methods failed."
+
+    logger.info(f"Transcript produced by '{backend_name}'")
+    return result
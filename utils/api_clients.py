@@ -0,0 +1,242 @@
+# utils/api_clients.py
+# Shared, pooled API clients for Groq and Deepgram
+# This file contains:
+# 1. A registry that builds each SDK client once per process (per API key) and reuses it.
+# 2. httpx connection pools with keep-alive, configurable size and timeouts.
+# 3. Connection tracing that reports reuse rate and per-call connection setup time.
+# 4. A response hook that feeds rate-limit headers to the API scheduler (utils/api_scheduler.py).
+#
+# The sync clients are safe to share across worker threads (httpx pools are thread-safe).
+# Async clients are bound to an event loop, so one is kept per loop.
+# httpx and the SDKs are imported when the first client is built, not at app startup.
+#
+# Configuration (environment variables):
+#   API_POOL_MAX_CONNECTIONS   Maximum open connections per client (default: 20)
+#   API_POOL_MAX_KEEPALIVE     Idle keep-alive connections kept per client (default: 10)
+#   API_KEEPALIVE_EXPIRY       Seconds an idle connection is kept open (default: 60)
+#   API_CONNECT_TIMEOUT        Connect timeout in seconds (default: 10)
+#   API_READ_TIMEOUT           Read/write timeout in seconds; uploads of long meetings need headroom (default: 600)
+#   API_MAX_RETRIES            Retries of 5xx and connection errors (default: 2); done by the API scheduler
+#                              when it is enabled, by the SDK otherwise
+#   GROQ_BASE_URL              Alternative Groq endpoint, read by the Groq SDK (e.g. a local stand-in server)
+#   DEEPGRAM_BASE_URL          Alternative Deepgram endpoint (e.g. a local stand-in server)
+
+import os
+import threading
+import time
+from utils.logger import get_logger
+
+logger = get_logger("APIClients")
+
+POOL_MAX_CONNECTIONS = int(os.getenv("API_POOL_MAX_CONNECTIONS", 20))
+POOL_MAX_KEEPALIVE = int(os.getenv("API_POOL_MAX_KEEPALIVE", 10))
+KEEPALIVE_EXPIRY = float(os.getenv("API_KEEPALIVE_EXPIRY", 60))
+CONNECT_TIMEOUT = float(os.getenv("API_CONNECT_TIMEOUT", 10))
+READ_TIMEOUT = float(os.getenv("API_READ_TIMEOUT", 600))
+MAX_RETRIES = int(os.getenv("API_MAX_RETRIES", 2))
+
+_lock = threading.Lock()
+_clients = {}   # (name, api_key, loop_id) -> client
+_stats = {}     # name -> ConnectionStats
+
+
+class ConnectionStats:
+    """
+    Counts requests and new connections for one API so reuse can be reported.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.new_connections = 0
+        self.setup_time = 0.0      # total seconds spent on TCP connect + TLS handshakes
+        self.client_build_time = 0.0
+
+    def record(self, connected, setup_time):
+        with self._lock:
+            self.requests += 1
+            if connected:
+                self.new_connections += 1
+                self.setup_time += setup_time
+            return self.reuse_rate()
+
+    def reuse_rate(self):
+        if not self.requests:
+            return 0.0
+        return 1 - self.new_connections / self.requests
+
+    def to_dict(self):
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "new_connections": self.new_connections,
+                "reuse_rate": round(self.reuse_rate(), 3),
+                "avg_setup_time": round(self.setup_time / self.new_connections, 4) if self.new_connections else 0.0,
+                "client_build_time": round(self.client_build_time, 4),
+            }
+
+
+class _ConnectionTracer:
+    """
+    httpcore trace callback attached to a single request. It records whether a
+    new connection had to be opened and how long the TCP/TLS setup took.
+    """
+
+    def __init__(self):
+        self.connected = False
+        self.setup_time = 0.0
+        self._started = None
+
+    def _handle(self, event_name):
+        if event_name in ("connection.connect_tcp.started", "connection.start_tls.started"):
+            self.connected = True
+            self._started = time.perf_counter()
+        elif event_name in ("connection.connect_tcp.complete", "connection.start_tls.complete") and self._started:
+            self.setup_time += time.perf_counter() - self._started
+            self._started = None
+
+    def __call__(self, event_name, info):
+        self._handle(event_name)
+
+
+class _AsyncConnectionTracer(_ConnectionTracer):
+    async def __call__(self, event_name, info):
+        self._handle(event_name)
+
+
+def _report(stats, response):
+    tracer = response.request.extensions.get("trace")
+    if not isinstance(tracer, _ConnectionTracer):
+        return
+    reuse_rate = stats.record(tracer.connected, tracer.setup_time)
+    if tracer.connected:
+        logger.info(f"🔌 {stats.name}: new connection set up in {tracer.setup_time * 1000:.0f} ms "
+                    f"(reuse rate {reuse_rate:.0%} over {stats.requests} requests)")
+    else:
+        logger.info(f"🔁 {stats.name}: reused pooled connection "
+                    f"(reuse rate {reuse_rate:.0%} over {stats.requests} requests)")
+
+
+def _pool_settings():
+    import httpx
+
+    return {
+        "limits": httpx.Limits(
+            max_connections=POOL_MAX_CONNECTIONS,
+            max_keepalive_connections=POOL_MAX_KEEPALIVE,
+            keepalive_expiry=KEEPALIVE_EXPIRY,
+        ),
+        "timeout": httpx.Timeout(READ_TIMEOUT, connect=CONNECT_TIMEOUT),
+    }
+
+
+def _build_http_client(name):
+    from utils.api_scheduler import observe_response
+
+    stats = _stats.setdefault(name, ConnectionStats(name))
+
+    def on_request(request):
+        request.extensions["trace"] = _ConnectionTracer()
+
+    def on_response(response):
+        _report(stats, response)
+        observe_response(response)
+
+    import httpx
+    return httpx.Client(event_hooks={"request": [on_request], "response": [on_response]}, **_pool_settings())
+
+
+def _build_async_http_client(name):
+    stats = _stats.setdefault(name, ConnectionStats(name))
+
+    async def on_request(request):
+        request.extensions["trace"] = _AsyncConnectionTracer()
+
+    async def on_response(response):
+        _report(stats, response)
+
+    import httpx
+    return httpx.AsyncClient(event_hooks={"request": [on_request], "response": [on_response]}, **_pool_settings())
+
+
+def _get_or_build(name, api_key, builder, loop_id=None):
+    key = (name, api_key, loop_id)
+    with _lock:
+        client = _clients.get(key)
+        if client is None:
+            build_start = time.perf_counter()
+            client = builder()
+            build_time = time.perf_counter() - build_start
+            _clients[key] = client
+            _stats.setdefault(name, ConnectionStats(name)).client_build_time += build_time
+            logger.info(f"🧰 Built shared {name} client in {build_time * 1000:.0f} ms")
+        return client
+
+
+def get_groq_client():
+    """
+    Returns the process-wide Groq client for the current GROQ_API_KEY.
+    SDK retries are off when the API scheduler retries instead.
+    """
+    from groq import Groq
+    from utils.api_scheduler import API_SCHEDULER_ENABLED
+
+    api_key = os.getenv("GROQ_API_KEY")
+    max_retries = 0 if API_SCHEDULER_ENABLED else MAX_RETRIES
+    return _get_or_build(
+        "groq",
+        api_key,
+        lambda: Groq(api_key=api_key, http_client=_build_http_client("groq"), max_retries=max_retries)
+    )
+
+
+def get_async_groq_client():
+    """
+    Returns the AsyncGroq client for the running event loop.
+    """
+    import asyncio
+    from groq import AsyncGroq
+
+    api_key = os.getenv("GROQ_API_KEY")
+    loop_id = id(asyncio.get_running_loop())
+    return _get_or_build(
+        "groq-async",
+        api_key,
+        lambda: AsyncGroq(api_key=api_key, http_client=_build_async_http_client("groq-async"), max_retries=MAX_RETRIES),
+        loop_id=loop_id
+    )
+
+
+def _deepgram_options():
+    base_url = os.getenv("DEEPGRAM_BASE_URL")
+    if not base_url:
+        return {}
+    from deepgram.environment import DeepgramClientEnvironment
+
+    base_url = base_url.rstrip("/")
+    ws_url = "ws" + base_url[len("http"):] if base_url.startswith("http") else base_url
+    return {"environment": DeepgramClientEnvironment(base=base_url, production=ws_url, agent=ws_url)}
+
+
+def get_deepgram_client():
+    """
+    Returns the process-wide Deepgram client for the current DEEPGRAM_API_KEY.
+    """
+    from deepgram import DeepgramClient
+
+    api_key = os.getenv("DEEPGRAM_API_KEY")
+    return _get_or_build(
+        "deepgram",
+        api_key,
+        lambda: DeepgramClient(api_key=api_key, httpx_client=_build_http_client("deepgram"),
+                               timeout=READ_TIMEOUT, **_deepgram_options())
+    )
+
+
+def get_client_stats():
+    """
+    Returns connection reuse and setup-time statistics per API.
+    """
+    with _lock:
+        return {name: stats.to_dict() for name, stats in _stats.items()}
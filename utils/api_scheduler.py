@@ -0,0 +1,435 @@
+# utils/api_scheduler.py
+# Rate-limit-aware scheduler for outbound Groq and Deepgram calls
+# This file contains:
+# 1. Token buckets per lane (one API + model): requests per minute, tokens per minute for
+#    chat completions, audio seconds per hour for Whisper, and a concurrency cap for Deepgram.
+#    Calls reserve their estimated cost (prompt + max_tokens, audio duration) before they start.
+# 2. Fair queuing: when a lane is out of capacity, waiting calls are served round-robin by job,
+#    so a meeting uploading twenty chunks cannot starve another meeting's single summary call.
+# 3. Retries: 429 responses pause the whole lane for Retry-After (or an exponential backoff)
+#    instead of surfacing as errors; 5xx and connection errors are retried with backoff.
+# 4. Limits learned from Groq's x-ratelimit-* response headers, and queue depth, in-flight and
+#    wait-time metrics (see utils/telemetry.py).
+#
+# Configuration (environment variables; 0 disables a limit):
+#   API_SCHEDULER_ENABLED              Set to 0/false to call the APIs directly (default: true)
+#   GROQ_CHAT_RPM / GROQ_CHAT_TPM      Chat completions: requests and tokens per minute (default: 30 / 12000)
+#   GROQ_WHISPER_RPM                   Whisper requests per minute (default: 20)
+#   GROQ_WHISPER_AUDIO_SECONDS_PER_HOUR  Whisper audio seconds per hour (default: 7200)
+#   DEEPGRAM_RPM / DEEPGRAM_MAX_CONCURRENT  Deepgram requests per minute and concurrent requests (default: 0 / 50)
+#   API_RATE_LIMIT_BURST_SECONDS       Seconds of a per-minute budget a lane may spend at once (default: 60;
+#                                      hourly budgets can be spent at once)
+#   API_RATE_LIMIT_RETRIES             Retries of a rate-limited call (default: 8)
+#   API_MAX_RETRIES                    Retries of a 5xx or connection error (see utils/api_clients.py)
+#   API_BACKOFF_SECONDS / API_BACKOFF_MAX  First backoff and its cap without Retry-After (default: 1 / 60)
+
+import math
+import os
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from utils.api_clients import MAX_RETRIES
+from utils.logger import get_logger
+from utils.telemetry import current_span, increment, observe, set_gauge
+
+logger = get_logger("APIScheduler")
+
+API_SCHEDULER_ENABLED = os.getenv("API_SCHEDULER_ENABLED", "true").lower() in ("1", "true", "yes")
+API_RATE_LIMIT_BURST_SECONDS = float(os.getenv("API_RATE_LIMIT_BURST_SECONDS", 60))
+API_RATE_LIMIT_RETRIES = int(os.getenv("API_RATE_LIMIT_RETRIES", 8))
+API_BACKOFF_SECONDS = float(os.getenv("API_BACKOFF_SECONDS", 1))
+API_BACKOFF_MAX = float(os.getenv("API_BACKOFF_MAX", 60))
+
+# (limit, window in seconds) of each kind of lane (Groq's free tier; its headers raise the limits)
+LANE_LIMITS = {
+    "chat": {
+        "requests": (float(os.getenv("GROQ_CHAT_RPM", 30)), 60),
+        "tokens": (float(os.getenv("GROQ_CHAT_TPM", 12000)), 60),
+    },
+    "whisper": {
+        "requests": (float(os.getenv("GROQ_WHISPER_RPM", 20)), 60),
+        "audio_seconds": (float(os.getenv("GROQ_WHISPER_AUDIO_SECONDS_PER_HOUR", 7200)), 3600),
+    },
+    "deepgram": {
+        "requests": (float(os.getenv("DEEPGRAM_RPM", 0)), 60),
+    },
+}
+LANE_MAX_CONCURRENT = {"deepgram": int(os.getenv("DEEPGRAM_MAX_CONCURRENT", 50))}
+
+# Groq reports the tokens-per-minute and audio-seconds-per-hour budgets in these headers
+# (the requests headers are per day)
+_HEADER_UNITS = {"tokens": "tokens", "audio_seconds": "audio-seconds"}
+_RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+_CONNECTION_ERRORS = ("APIConnectionError", "APITimeoutError", "TransportError", "ConnectionError", "TimeoutError")
+
+_local = threading.local()
+
+
+class RateLimitExceeded(Exception):
+    """
+    Raised when a call is still rate limited after API_RATE_LIMIT_RETRIES retries.
+    """
+
+
+class TokenBucket:
+    """
+    Refills `limit` units per `window` seconds up to `capacity`. A call larger than the
+    capacity waits for a full bucket and leaves it in debt, so large calls are never starved.
+    """
+
+    def __init__(self, limit, window=60):
+        self.limit = limit
+        self.window = window
+        self.capacity = self._capacity(limit)
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def _capacity(self, limit):
+        # A per-minute limit is spent at most API_RATE_LIMIT_BURST_SECONDS at a time; a longer
+        # window (Whisper's audio seconds per hour) can be spent at once, as the server allows
+        return limit * API_RATE_LIMIT_BURST_SECONDS / 60 if self.window <= 60 else limit
+
+    def available(self, now):
+        return min(self.capacity, self.level + (now - self.updated) * self.limit / self.window)
+
+    def _refill(self, now):
+        self.level = self.available(now)
+        self.updated = now
+
+    def wait_time(self, amount, now):
+        self._refill(now)
+        needed = min(amount, self.capacity)
+        return 0.0 if self.level >= needed else (needed - self.level) * self.window / self.limit
+
+    def consume(self, amount, now):
+        self._refill(now)
+        self.level -= amount
+
+    def refund(self, amount):
+        self._refill(time.monotonic())
+        self.level = min(self.capacity, self.level + amount)
+
+    def resize(self, limit):
+        self._refill(time.monotonic())
+        self.limit = limit
+        self.capacity = self._capacity(limit)
+        self.level = min(self.level, self.capacity)
+
+
+class Lane:
+    """
+    One rate-limited endpoint (an API and model) with its buckets and fair wait queue.
+
+    Args:
+        name (str): e.g. "groq:chat:llama-3.3-70b-versatile".
+        limits (dict): (limit, window seconds) by unit ("requests", "tokens", "audio_seconds").
+        max_concurrent (int): Calls running at once (0 = unlimited).
+    """
+
+    def __init__(self, name, limits, max_concurrent=0):
+        self.name = name
+        self.buckets = {unit: TokenBucket(limit, window) for unit, (limit, window) in limits.items() if limit > 0}
+        self.max_concurrent = max_concurrent
+        self.in_flight = 0
+        self.paused_until = 0.0
+        self._condition = threading.Condition()
+        self._queues = {}      # job -> deque of waiting tickets
+        self._turns = deque()  # jobs with waiting calls, in round-robin order
+        self._waiting = 0
+        self._stats = {"requests": 0, "rate_limited": 0, "retries": 0, "wait_seconds": 0.0}
+
+    def _wait_time(self, cost, now):
+        if self.max_concurrent and self.in_flight >= self.max_concurrent:
+            return math.inf  # woken by release()
+        wait = self.paused_until - now
+        for unit, bucket in self.buckets.items():
+            if cost.get(unit):
+                wait = max(wait, bucket.wait_time(cost[unit], now))
+        return wait
+
+    def acquire(self, cost, job):
+        """
+        Blocks until this call's turn comes and the lane has capacity for `cost`, then
+        reserves it. Returns the seconds spent waiting.
+        """
+        started = time.monotonic()
+        ticket = object()
+        with self._condition:
+            queue = self._queues.get(job)
+            if queue is None:
+                queue = self._queues[job] = deque()
+                self._turns.append(job)
+            queue.append(ticket)
+            self._set_depth(self._waiting + 1)
+            try:
+                while True:
+                    now = time.monotonic()
+                    if self._turns[0] == job and queue[0] is ticket:
+                        wait = self._wait_time(cost, now)
+                        if wait <= 0:
+                            break
+                        self._condition.wait(None if wait == math.inf else wait)
+                    else:
+                        self._condition.wait()
+                for unit, bucket in self.buckets.items():
+                    if cost.get(unit):
+                        bucket.consume(cost[unit], now)
+                self.in_flight += 1
+                waited = now - started
+                self._stats["requests"] += 1
+                self._stats["wait_seconds"] += waited
+            finally:
+                # Leave the queue (also when interrupted) and hand the turn to the next job
+                queue.remove(ticket)
+                if self._turns and self._turns[0] == job:
+                    self._turns.popleft()
+                    if queue:
+                        self._turns.append(job)
+                elif not queue:
+                    self._turns.remove(job)
+                if not queue:
+                    del self._queues[job]
+                self._set_depth(self._waiting - 1)
+                self._condition.notify_all()
+        set_gauge("meeting_api_in_flight", self.in_flight, lane=self.name)
+        return waited
+
+    def _set_depth(self, depth):
+        # Caller holds the condition
+        self._waiting = depth
+        set_gauge("meeting_api_queue_depth", depth, lane=self.name)
+
+    def release(self):
+        with self._condition:
+            self.in_flight -= 1
+            self._condition.notify_all()
+        set_gauge("meeting_api_in_flight", self.in_flight, lane=self.name)
+
+    def pause(self, seconds):
+        """
+        Stops starting calls on this lane for `seconds` (after a 429, every caller would get one).
+        """
+        with self._condition:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+            self._stats["rate_limited"] += 1
+            self._condition.notify_all()
+
+    def record_retry(self):
+        with self._condition:
+            self._stats["retries"] += 1
+
+    def refund(self, cost):
+        """
+        Returns the units of a call the server rejected. The request itself still counts.
+        """
+        with self._condition:
+            for unit, amount in cost.items():
+                if unit != "requests" and unit in self.buckets:
+                    self.buckets[unit].refund(amount)
+            self._condition.notify_all()
+
+    def settle(self, unit, reserved, actual):
+        """
+        Corrects a reservation once the real usage is known (e.g. completion tokens).
+        """
+        bucket = self.buckets.get(unit)
+        if bucket is None or actual is None:
+            return
+        with self._condition:
+            if actual < reserved:
+                bucket.refund(reserved - actual)
+            else:
+                bucket.consume(actual - reserved, time.monotonic())
+            self._condition.notify_all()
+
+    def observe_headers(self, headers):
+        """
+        Aligns the buckets with the server's view: the advertised limit replaces the
+        configured one, and the remaining budget caps the local level (other processes
+        may share the API key).
+        """
+        with self._condition:
+            for unit, header in _HEADER_UNITS.items():
+                bucket = self.buckets.get(unit)
+                if bucket is None:
+                    continue
+                limit = _number(headers.get(f"x-ratelimit-limit-{header}"))
+                if limit and abs(limit - bucket.limit) > 0.5:
+                    logger.info(f"📏 {self.name}: {unit} limit is {limit:g} per {bucket.window:g}s "
+                                f"(configured {bucket.limit:g})")
+                    bucket.resize(limit)
+                remaining = _number(headers.get(f"x-ratelimit-remaining-{header}"))
+                if remaining is not None:
+                    bucket.level = min(bucket.level, remaining)
+
+    def to_dict(self):
+        with self._condition:
+            now = time.monotonic()
+            return {
+                "waiting": self._waiting,
+                "jobs_waiting": len(self._queues),
+                "in_flight": self.in_flight,
+                "paused_for": round(max(0.0, self.paused_until - now), 3),
+                "limits": {unit: {"limit": bucket.limit, "window_seconds": bucket.window}
+                           for unit, bucket in self.buckets.items()},
+                "available": {unit: round(bucket.available(now), 1) for unit, bucket in self.buckets.items()},
+                **{key: round(value, 3) for key, value in self._stats.items()},
+            }
+
+
+def _number(value):
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _job_key():
+    """
+    The job (or live meeting) the current call belongs to, from the telemetry span stack.
+    Calls outside a job are queued per thread.
+    """
+    node = current_span()
+    while node is not None:
+        for attribute in ("job_id", "live_id"):
+            if node.attributes.get(attribute) is not None:
+                return node.attributes[attribute]
+        node = node.parent
+    return threading.current_thread().name
+
+
+def _status_and_headers(error):
+    # Groq raises APIStatusError (.status_code, .response.headers); Deepgram raises ApiError (.status_code, .headers)
+    status = getattr(error, "status_code", None)
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or getattr(error, "headers", None) or {}
+    return status, {key.lower(): value for key, value in headers.items()}
+
+
+def _retry_after(headers):
+    """
+    Seconds to wait from Retry-After / retry-after-ms, or None.
+    """
+    milliseconds = _number(headers.get("retry-after-ms"))
+    if milliseconds is not None:
+        return milliseconds / 1000
+    return _number(headers.get("retry-after"))
+
+
+def _backoff(attempt):
+    # Exponential with full jitter, so callers released together do not retry together
+    return random.uniform(0.5, 1.0) * min(API_BACKOFF_MAX, API_BACKOFF_SECONDS * 2 ** attempt)
+
+
+class APIScheduler:
+    """
+    Process-wide registry of lanes; every scheduled Groq and Deepgram call goes through call().
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._lanes = {}
+
+    def lane(self, api, model, kind):
+        """
+        Returns the lane for (api, model), creating it with the limits of `kind`
+        ("chat", "whisper" or "deepgram").
+        """
+        name = f"{api}:{model}"
+        with self._lock:
+            lane = self._lanes.get(name)
+            if lane is None:
+                lane = self._lanes[name] = Lane(name, LANE_LIMITS.get(kind, {}), LANE_MAX_CONCURRENT.get(kind, 0))
+            return lane
+
+    @contextmanager
+    def slot(self, lane, cost):
+        """
+        Holds a reserved slot on the lane for the duration of the block. Responses received
+        in the block update the lane's limits from their headers (see observe_response).
+        """
+        waited = lane.acquire(cost, _job_key())
+        observe(f"api_wait.{lane.name}", waited)
+        increment("meeting_api_requests_total", lane=lane.name)
+        if waited >= 1:
+            logger.info(f"🚦 {lane.name}: waited {waited:.1f}s for rate-limit capacity")
+        previous, _local.lane = getattr(_local, "lane", None), lane
+        try:
+            yield lane
+        finally:
+            _local.lane = previous
+            lane.release()
+
+    def call(self, lane, fn, cost=None):
+        """
+        Runs fn() in a slot of `lane` and returns its result. Rate-limited calls wait and
+        are retried; server and connection errors are retried with backoff; anything else,
+        or a call out of retries, raises.
+
+        Args:
+            lane (Lane): From lane().
+            fn (callable): Makes the request. The SDK's own retries should be off
+                (see utils/api_clients.py), or a 429 is retried blindly before we see it.
+            cost (dict): Reserved units, e.g. {"requests": 1, "tokens": 3000}.
+        """
+        cost = {"requests": 1, **(cost or {})}
+        if not API_SCHEDULER_ENABLED:
+            return fn()
+        rate_limited = failures = 0
+        while True:
+            with self.slot(lane, cost):
+                try:
+                    return fn()
+                except Exception as e:
+                    status, headers = _status_and_headers(e)
+                    if status == 429:
+                        rate_limited += 1
+                        increment("meeting_api_rate_limited_total", lane=lane.name)
+                        if rate_limited > API_RATE_LIMIT_RETRIES:
+                            raise RateLimitExceeded(f"{lane.name} still rate limited after "
+                                                    f"{API_RATE_LIMIT_RETRIES} retries: {str(e)}") from e
+                        delay = _retry_after(headers)
+                        delay = _backoff(rate_limited - 1) if delay is None else delay
+                        lane.pause(delay)
+                        reason = "rate_limited"
+                    elif status in _RETRYABLE_STATUS or (status is None and any(
+                            cls.__name__ in _CONNECTION_ERRORS for cls in type(e).__mro__)):
+                        failures += 1
+                        if failures > MAX_RETRIES:
+                            raise
+                        delay = _retry_after(headers) or _backoff(failures - 1)
+                        reason = "server_error" if status else "connection_error"
+                    else:
+                        raise
+                    lane.record_retry()
+                    lane.refund(cost)
+                    increment("meeting_api_retries_total", lane=lane.name, reason=reason)
+                    logger.warning(f"⏳ {lane.name}: {reason.replace('_', ' ')} ({status or type(e).__name__}), "
+                                   f"retrying in {delay:.1f}s")
+            if reason != "rate_limited":
+                # A paused lane already delays the retry; other errors back off on this call only
+                time.sleep(delay)
+
+    def stats(self):
+        """
+        Returns the state of every lane (queue depth, in-flight calls, budgets, 429s, waits).
+        """
+        with self._lock:
+            lanes = dict(self._lanes)
+        return {name: lane.to_dict() for name, lane in lanes.items()}
+
+
+def observe_response(response):
+    """
+    httpx response hook (see utils/api_clients.py): feeds rate-limit headers to the lane
+    of the call running on this thread, if any.
+    """
+    lane = getattr(_local, "lane", None)
+    if lane is not None:
+        lane.observe_headers(response.headers)
+
+
+# Process-wide scheduler shared by transcription, summarization and Deepgram
+api_scheduler = APIScheduler()
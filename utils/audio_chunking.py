@@ -0,0 +1,170 @@
+# utils/audio_chunking.py
+# Silence-aware audio chunking for long recordings
+# This file contains:
+# 1. Planning of chunk boundaries at silence points, bounded by a maximum chunk length.
+# 2. Export of each chunk to a compact temporary file for upload.
+# 3. Stitching of per-chunk Whisper results back onto the global timeline,
+#    removing text duplicated where neighbouring chunks overlap.
+
+import bisect
+import os
+import re
+import tempfile
+from utils.logger import get_logger
+
+logger = get_logger("AudioChunking")
+
+# Chunks are cut at the quietest point in the last part of each window
+MAX_CHUNK_SECONDS = float(os.getenv("CHUNK_MAX_SECONDS", 600))
+SILENCE_SEARCH_SECONDS = float(os.getenv("CHUNK_SILENCE_SEARCH_SECONDS", 60))
+MIN_SILENCE_MS = int(os.getenv("CHUNK_MIN_SILENCE_MS", 500))
+SILENCE_THRESH_DB = float(os.getenv("CHUNK_SILENCE_THRESH_DB", -16))  # relative to the chunk's loudness
+# Overlap used only when no silence is found and a chunk has to be cut mid-speech
+HARD_CUT_OVERLAP_SECONDS = float(os.getenv("CHUNK_OVERLAP_SECONDS", 2))
+
+
+def plan_chunks(audio, max_chunk_ms=None, search_ms=None, overlap_ms=None):
+    """
+    Chooses (start_ms, end_ms) boundaries that keep every chunk under max_chunk_ms.
+
+    Each boundary is placed in the middle of the longest silence found in the
+    final `search_ms` of the window. If the window has no silence, the chunk is
+    cut at the limit and the next one starts `overlap_ms` earlier so no words are lost.
+
+    Args:
+        audio (AudioSegment): Decoded audio.
+
+    Returns:
+        list: (start_ms, end_ms) tuples covering the whole recording.
+    """
+    from pydub.silence import detect_silence
+
+    max_chunk_ms = int((max_chunk_ms or MAX_CHUNK_SECONDS * 1000))
+    search_ms = int(search_ms or SILENCE_SEARCH_SECONDS * 1000)
+    overlap_ms = int(HARD_CUT_OVERLAP_SECONDS * 1000 if overlap_ms is None else overlap_ms)
+    total_ms = len(audio)
+
+    chunks = []
+    start = 0
+    while start < total_ms:
+        limit = start + max_chunk_ms
+        if limit >= total_ms:
+            chunks.append((start, total_ms))
+            break
+
+        window_start = max(start + 1, limit - search_ms)
+        window = audio[window_start:limit]
+        silences = detect_silence(
+            window,
+            min_silence_len=MIN_SILENCE_MS,
+            silence_thresh=window.dBFS + SILENCE_THRESH_DB,
+            seek_step=10
+        )
+
+        if silences:
+            s_start, s_end = max(silences, key=lambda s: s[1] - s[0])
+            cut = window_start + (s_start + s_end) // 2
+            chunks.append((start, cut))
+            start = cut
+        else:
+            chunks.append((start, limit))
+            start = limit - overlap_ms
+
+    return chunks
+
+
+def export_chunks(audio, chunks, directory=None):
+    """
+    Writes each planned chunk as 16 kHz mono WAV (what Whisper consumes anyway),
+    which keeps every upload bounded regardless of the source format.
+
+    Returns:
+        list: (path, offset_seconds) tuples, in timeline order.
+    """
+    directory = directory or tempfile.mkdtemp(prefix="meeting_chunks_")
+    exported = []
+    for index, (start_ms, end_ms) in enumerate(chunks):
+        path = os.path.join(directory, f"chunk_{index:04d}.wav")
+        audio[start_ms:end_ms].set_channels(1).set_frame_rate(16000).export(path, format="wav")
+        exported.append((path, start_ms / 1000.0))
+    return exported
+
+
+def split_audio(file_path, directory=None):
+    """
+    Decodes an audio file and splits it into silence-aligned chunk files.
+
+    Returns:
+        list: (path, offset_seconds, end_seconds) tuples.
+    """
+    from pydub import AudioSegment
+
+    audio = AudioSegment.from_file(file_path)
+    chunks = plan_chunks(audio)
+    exported = export_chunks(audio, chunks, directory)
+    logger.info(f"✂️ Split {len(audio) / 1000:.0f}s of audio into {len(chunks)} chunks")
+    return [(path, offset, end_ms / 1000.0) for (path, offset), (_, end_ms) in zip(exported, chunks)]
+
+
+def _normalize(text):
+    return re.sub(r"[^a-z0-9 ]", "", text.lower()).strip()
+
+
+def stitch_transcriptions(results):
+    """
+    Merges per-chunk verbose_json results into one transcription on the global timeline.
+
+    Args:
+        results (list): (transcription_dict, offset_seconds, end_seconds) in timeline order.
+
+    Returns:
+        dict: verbose_json-shaped dict with 'text', 'segments', 'words' and 'duration',
+        compatible with align_segments.
+    """
+    segments, segment_words = [], []  # segment_words[i]: the words of segments[i]
+    previous_end = None
+
+    for transcription, offset, chunk_end in results:
+        # Where chunks overlap, split ownership at the middle of the shared region
+        boundary = offset if previous_end is None else (offset + previous_end) / 2
+        overlapping = previous_end is not None and previous_end > offset
+        if overlapping:
+            while segments and segments[-1]['start'] >= boundary:
+                segments.pop()
+                segment_words.pop()
+
+        chunk_segments = transcription.get('segments') or []
+        kept = [None] * len(chunk_segments)  # index into segment_words of each kept segment
+        last_text = _normalize(segments[-1]['text']) if overlapping and segments else None
+        for index, seg in enumerate(chunk_segments):
+            start, end = seg.get('start', 0) + offset, seg.get('end', 0) + offset
+            if previous_end is not None and start < boundary:
+                continue
+            # Guard against the same sentence being emitted on both sides of a cut
+            if last_text and _normalize(seg.get('text', "")) == last_text:
+                last_text = None
+                continue
+            last_text = None
+            shifted = dict(seg, start=start, end=end, id=len(segments))
+            kept[index] = len(segments)
+            segments.append(shifted)
+            segment_words.append([])
+
+        # Words follow the segment they fall in, so the seam keeps or drops them together
+        starts = [seg.get('start', 0) for seg in chunk_segments]
+        for word in transcription.get('words') or []:
+            middle = (word.get('start', 0) + word.get('end', word.get('start', 0))) / 2
+            owner = kept[max(0, bisect.bisect_right(starts, middle) - 1)] if starts else None
+            if owner is not None:
+                segment_words[owner].append(dict(word, start=word.get('start', 0) + offset,
+                                                 end=word.get('end', 0) + offset))
+
+        previous_end = chunk_end
+
+    words = [word for owned in segment_words for word in owned]
+    return {
+        "text": " ".join(s.get('text', "").strip() for s in segments),
+        "segments": segments,
+        "words": words,
+        "duration": previous_end or 0.0,
+    }
@@ -0,0 +1,95 @@
+# utils/audio_io.py
+# Streaming helpers for uploading audio without loading whole files into memory
+# This file contains:
+# 1. A re-iterable chunk stream over a file (plain reads or a memory-mapped buffer).
+# 2. Multipart uploads (Groq) pass the open file handle instead, which httpx reads in blocks.
+# 3. A cheap duration estimate used for backend routing.
+#
+# Peak memory per upload is bounded by UPLOAD_CHUNK_SIZE regardless of file size.
+
+import mmap
+import os
+import shutil
+
+# Size of each block handed to the HTTP client
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", 1024 * 1024))
+# Serve chunks as zero-copy slices of a memory-mapped file instead of read() calls
+UPLOAD_USE_MMAP = os.getenv("UPLOAD_USE_MMAP", "false").lower() in ("1", "true", "yes")
+
+
+class FileChunkStream:
+    """
+    Iterable of fixed-size byte chunks read from a file.
+
+    Each iteration reopens the file, so the HTTP client can safely replay the
+    body when it retries a request (a plain generator could only be sent once).
+
+    Args:
+        file_path (str): File to stream.
+        chunk_size (int): Bytes per chunk.
+        use_mmap (bool): Yield zero-copy memoryview slices of a memory-mapped file.
+            Touched pages are file-backed and reclaimable, but they do show up in RSS,
+            so plain reads (the default) give the lowest reported peak.
+    """
+
+    def __init__(self, file_path, chunk_size=None, use_mmap=None):
+        self.file_path = file_path
+        self.chunk_size = chunk_size or UPLOAD_CHUNK_SIZE
+        self.use_mmap = UPLOAD_USE_MMAP if use_mmap is None else use_mmap
+
+    def __len__(self):
+        return os.path.getsize(self.file_path)
+
+    def __iter__(self):
+        if self.use_mmap and len(self) > 0:
+            return self._iter_mmap()
+        return self._iter_reads()
+
+    def _iter_reads(self):
+        with open(self.file_path, "rb") as f:
+            while True:
+                chunk = f.read(self.chunk_size)
+                if not chunk:
+                    return
+                yield chunk
+
+    def _iter_mmap(self):
+        with open(self.file_path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        # The mapping is not closed explicitly: consumers may still hold the last
+        # slice, and the OS unmaps it once the final memoryview is garbage collected.
+        view = memoryview(mapped)
+        for offset in range(0, len(view), self.chunk_size):
+            yield view[offset:offset + self.chunk_size]
+
+
+
+# Typical compressed meeting audio (~128 kbps) when the real duration cannot be read cheaply
+_FALLBACK_BYTES_PER_SECOND = 16000
+
+
+def estimate_duration_seconds(file_path):
+    """
+    Returns the audio duration in seconds without decoding the samples.
+
+    WAV headers are read directly; other formats use pydub's ffprobe wrapper
+    when available and fall back to a bitrate-based estimate from the file size.
+    """
+    import wave
+
+    try:
+        with wave.open(file_path, "rb") as wav:
+            return wav.getnframes() / float(wav.getframerate())
+    except (wave.Error, EOFError, OSError):
+        pass
+
+    if shutil.which("ffprobe"):
+        try:
+            from pydub.utils import mediainfo
+            duration = mediainfo(file_path).get("duration")
+            if duration:
+                return float(duration)
+        except Exception:
+            pass
+
+    return os.path.getsize(file_path) / _FALLBACK_BYTES_PER_SECOND
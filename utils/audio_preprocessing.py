@@ -0,0 +1,346 @@
+# utils/audio_preprocessing.py
+# Audio preprocessing before upload
+# This file contains:
+# 1. Decoding the upload once and converting it to 16 kHz mono 16-bit PCM.
+# 2. Energy-based voice activity detection that removes long silences.
+# 3. An OffsetMap that translates times in the trimmed audio back to the original recording.
+# 4. Encoding of the result to a compact format (FLAC by default) for Groq and Deepgram.
+# 5. Optionally, the decoded samples of that file, so local diarization can use them
+#    without decoding the upload again.
+#
+# WAV uploads (what gr.Audio produces) are decoded with the standard library in blocks,
+# so a long 48 kHz stereo recording is never held in memory at full resolution.
+# Other formats are decoded by ffmpeg straight to 16 kHz mono.
+
+import bisect
+import os
+import shutil
+import wave
+from utils.audio_io import estimate_duration_seconds
+from utils.logger import get_logger
+
+logger = get_logger("AudioPreprocessing")
+
+PREPROCESS_ENABLED = os.getenv("AUDIO_PREPROCESSING", "true").lower() in ("1", "true", "yes")
+# Upload encoding: "flac" (lossless), "opus" (low bitrate) or "wav"; the first two need ffmpeg
+PREPROCESS_FORMAT = os.getenv("PREPROCESS_FORMAT", "flac").lower()
+# Only silences at least this long are cut out
+PREPROCESS_MIN_SILENCE_MS = int(os.getenv("PREPROCESS_MIN_SILENCE_MS", 1500))
+# Silence kept on each side of speech so word onsets and endings are not clipped
+PREPROCESS_PADDING_MS = int(os.getenv("PREPROCESS_PADDING_MS", 300))
+# Frames quieter than the recording's average loudness by this much count as silence
+PREPROCESS_SILENCE_THRESH_DB = float(os.getenv("PREPROCESS_SILENCE_THRESH_DB", -20))
+
+TARGET_SAMPLE_RATE = 16000
+VAD_FRAME_MS = 30
+# Input frames decoded per block while resampling WAV files (~10 s at 48 kHz)
+_DECODE_BLOCK_FRAMES = 480000
+
+_ENCODINGS = {
+    "flac": {"format": "flac"},
+    "opus": {"format": "ogg", "codec": "libopus", "bitrate": "32k"},
+    "wav": {"format": "wav"},
+}
+
+
+class OffsetMap:
+    """
+    Piecewise mapping from times in preprocessed audio to the original recording.
+
+    Each kept region of the original starts at `original_starts[i]` and was placed at
+    `processed_starts[i]` in the trimmed file; inside a region time advances 1:1.
+
+    Args:
+        spans (list): (processed_start, original_start) pairs in seconds, sorted.
+    """
+
+    def __init__(self, spans=None):
+        spans = spans or [(0.0, 0.0)]
+        self.processed_starts = [processed for processed, _ in spans]
+        self.original_starts = [original for _, original in spans]
+
+    @property
+    def is_identity(self):
+        return len(self.processed_starts) == 1 and self.processed_starts[0] == self.original_starts[0]
+
+    def to_original(self, t):
+        """
+        Returns the original-recording time for time t in the preprocessed audio.
+        """
+        index = max(0, bisect.bisect_right(self.processed_starts, t) - 1)
+        return self.original_starts[index] + (t - self.processed_starts[index])
+
+    def remap(self, items):
+        """
+        Returns copies of dicts with 'start'/'end' moved onto the original timeline.
+        """
+        if self.is_identity or not items:
+            return items
+        remapped = []
+        for item in items:
+            moved = dict(item)
+            if 'start' in item:
+                moved['start'] = self.to_original(item['start'])
+            if 'end' in item:
+                moved['end'] = self.to_original(item['end'])
+            remapped.append(moved)
+        return remapped
+
+
+class PreparedAudio:
+    """
+    The file to upload plus what is needed to interpret results against the original.
+    `samples` holds the audio of `path` as 16 kHz mono int16 when it was requested and
+    decoded, else None.
+    """
+
+    def __init__(self, path, offsets, original_seconds, processed_seconds, original_bytes, processed_bytes,
+                 samples=None):
+        self.path = path
+        self.offsets = offsets
+        self.original_seconds = original_seconds
+        self.processed_seconds = processed_seconds
+        self.original_bytes = original_bytes
+        self.processed_bytes = processed_bytes
+        self.samples = samples
+
+    @classmethod
+    def passthrough(cls, file_path, samples=None):
+        duration = estimate_duration_seconds(file_path)
+        size = os.path.getsize(file_path)
+        return cls(file_path, OffsetMap(), duration, duration, size, size, samples)
+
+
+def _to_int16(samples):
+    import numpy as np
+
+    return np.clip(samples, -32768, 32767).astype(np.int16)
+
+
+class Resampler:
+    """
+    Converts a stream of mono float samples at `rate` to 16 kHz int16, block by block.
+
+    Integer rate ratios (48k, 32k) are box-filtered, which also low-passes before
+    decimating; other rates are interpolated linearly, carrying the last sample of
+    each block over so no output sample is skipped or repeated at block edges.
+    Blocks may have any length; leftover input is kept for the next call.
+    """
+
+    def __init__(self, rate):
+        import numpy as np
+
+        self.rate = rate
+        self.factor = rate // TARGET_SAMPLE_RATE if rate % TARGET_SAMPLE_RATE == 0 else None
+        self.ratio = rate / TARGET_SAMPLE_RATE
+        self.carry = np.zeros(0, dtype=np.float32)
+        self.offset = 0        # global input index of the first sample in the next block
+        self.next_output = 0   # index of the next output sample to produce
+
+    def feed(self, mono):
+        import numpy as np
+
+        block = np.concatenate([self.carry, mono]) if len(self.carry) else mono
+        if self.factor:
+            usable = len(block) - len(block) % self.factor
+            self.carry = block[usable:]
+            return _to_int16(block[:usable].reshape(-1, self.factor).mean(axis=1))
+
+        if len(block) == 0:
+            return np.zeros(0, dtype=np.int16)
+        last = int(np.floor((self.offset + len(block) - 1) / self.ratio))
+        output = np.zeros(0, dtype=np.int16)
+        if last >= self.next_output:
+            positions = np.arange(self.next_output, last + 1) * self.ratio - self.offset
+            output = _to_int16(np.interp(positions, np.arange(len(block)), block))
+            self.next_output = last + 1
+        self.offset += len(block) - 1
+        self.carry = block[-1:]
+        return output
+
+
+def _decode_wav(file_path):
+    """
+    Decodes a PCM WAV to 16 kHz mono int16 samples, block by block.
+    """
+    import numpy as np
+
+    with wave.open(file_path, "rb") as wav:
+        channels, width, rate = wav.getnchannels(), wav.getsampwidth(), wav.getframerate()
+        if width not in (1, 2, 4):
+            raise wave.Error(f"Unsupported sample width {width}")
+        dtype = {1: np.uint8, 2: np.int16, 4: np.int32}[width]
+        scale = {1: 256.0, 2: 1.0, 4: 1 / 65536.0}[width]
+        resampler = Resampler(rate)
+        block_frames = _DECODE_BLOCK_FRAMES - _DECODE_BLOCK_FRAMES % (resampler.factor or 1)
+
+        pieces = []
+        while True:
+            raw = wav.readframes(block_frames)
+            if not raw:
+                break
+            samples = np.frombuffer(raw, dtype=dtype).astype(np.float32)
+            if width == 1:
+                samples -= 128.0
+            pieces.append(resampler.feed(samples.reshape(-1, channels).mean(axis=1) * scale))
+
+    return np.concatenate(pieces) if pieces else np.zeros(0, dtype=np.int16)
+
+
+def _decode_with_ffmpeg(file_path):
+    """
+    Decodes any ffmpeg-readable format straight to 16 kHz mono int16 samples.
+    """
+    import numpy as np
+    from pydub import AudioSegment
+
+    audio = AudioSegment.from_file(file_path, parameters=["-ac", "1", "-ar", str(TARGET_SAMPLE_RATE)])
+    audio = audio.set_channels(1).set_frame_rate(TARGET_SAMPLE_RATE).set_sample_width(2)
+    return np.frombuffer(audio.raw_data, dtype=np.int16)
+
+
+def detect_speech(pcm, sample_rate=TARGET_SAMPLE_RATE):
+    """
+    Finds the regions to keep: everything except silences longer than PREPROCESS_MIN_SILENCE_MS,
+    with PREPROCESS_PADDING_MS of context left around speech.
+
+    Args:
+        pcm (numpy.ndarray): Mono int16 samples.
+
+    Returns:
+        list: (start_sample, end_sample) regions in order.
+    """
+    import numpy as np
+
+    frame = sample_rate * VAD_FRAME_MS // 1000
+    frames = len(pcm) // frame
+    if frames == 0:
+        return [(0, len(pcm))]
+
+    # Mean energy per frame, computed in slices to keep float temporaries small
+    energy = np.empty(frames, dtype=np.float64)
+    step = 4096
+    for first in range(0, frames, step):
+        last = min(frames, first + step)
+        chunk = pcm[first * frame:last * frame].astype(np.float32).reshape(-1, frame)
+        energy[first:last] = np.mean(chunk * chunk, axis=1)
+
+    overall = float(np.mean(energy))
+    if overall <= 0:
+        return [(0, len(pcm))]
+    threshold = overall * 10 ** (PREPROCESS_SILENCE_THRESH_DB / 10)
+    voiced = energy > threshold
+    if not voiced.any():
+        return [(0, len(pcm))]
+
+    min_silence = max(1, PREPROCESS_MIN_SILENCE_MS // VAD_FRAME_MS)
+    padding = PREPROCESS_PADDING_MS // VAD_FRAME_MS
+
+    # Run-length encode the silent frames and keep everything but long runs
+    edges = np.flatnonzero(np.diff(np.concatenate(([1], voiced.astype(np.int8), [1]))))
+    regions, keep_from = [], 0
+    for silent_start, silent_end in zip(edges[::2], edges[1::2]):
+        if silent_end - silent_start < min_silence:
+            continue
+        cut_start = silent_start + padding if silent_start > 0 else 0
+        cut_end = silent_end - padding if silent_end < frames else frames
+        if cut_end <= cut_start:
+            continue
+        if cut_start > keep_from:
+            regions.append((keep_from * frame, cut_start * frame))
+        keep_from = cut_end
+    if keep_from < frames:
+        regions.append((keep_from * frame, len(pcm)))
+    return regions or [(0, len(pcm))]
+
+
+def _encode(pcm, path_base):
+    """
+    Writes samples in the configured format, falling back to WAV without ffmpeg.
+    """
+    encoding = PREPROCESS_FORMAT if PREPROCESS_FORMAT in _ENCODINGS else "flac"
+    if encoding != "wav" and not shutil.which("ffmpeg"):
+        logger.info(f"ffmpeg not found - uploading 16 kHz mono WAV instead of {encoding}")
+        encoding = "wav"
+
+    if encoding == "wav":
+        path = f"{path_base}.wav"
+        with wave.open(path, "wb") as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(TARGET_SAMPLE_RATE)
+            wav.writeframes(memoryview(pcm).cast("B"))
+        return path
+
+    from pydub import AudioSegment
+
+    options = _ENCODINGS[encoding]
+    path = f"{path_base}.{'opus' if encoding == 'opus' else options['format']}"
+    audio = AudioSegment(data=pcm.tobytes(), sample_width=2, frame_rate=TARGET_SAMPLE_RATE, channels=1)
+    audio.export(path, format=options["format"], codec=options.get("codec"), bitrate=options.get("bitrate"))
+    return path
+
+
+def preprocess_audio(file_path, output_dir, keep_samples=False):
+    """
+    Prepares an upload: 16 kHz mono, long silences removed, compact encoding.
+
+    Falls back to the original file (with an identity offset map) when preprocessing
+    is disabled, the format cannot be decoded here, or the result would not be smaller.
+
+    Args:
+        file_path (str): The uploaded recording.
+        output_dir (str): Where the preprocessed file is written.
+        keep_samples (bool): Keep the decoded 16 kHz samples on the result (2 bytes per
+            sample, ~115 MB per hour) for consumers that would decode the file again.
+
+    Returns:
+        PreparedAudio: The file to upload and the offset map back to the original.
+    """
+    if not PREPROCESS_ENABLED:
+        return PreparedAudio.passthrough(file_path)
+
+    import numpy as np
+
+    try:
+        try:
+            pcm = _decode_wav(file_path)
+        except (wave.Error, EOFError):
+            if not shutil.which("ffmpeg"):
+                logger.info("Not a PCM WAV and ffmpeg is unavailable - uploading the original file")
+                return PreparedAudio.passthrough(file_path)
+            pcm = _decode_with_ffmpeg(file_path)
+    except Exception as e:
+        logger.warning(f"⚠️ Could not decode audio for preprocessing, uploading the original: {str(e)}")
+        return PreparedAudio.passthrough(file_path)
+
+    regions = detect_speech(pcm)
+    spans, position = [], 0
+    for start, end in regions:
+        spans.append((float(position) / TARGET_SAMPLE_RATE, float(start) / TARGET_SAMPLE_RATE))
+        position += end - start
+    trimmed = pcm if len(regions) == 1 and regions[0] == (0, len(pcm)) else \
+        np.concatenate([pcm[start:end] for start, end in regions])
+
+    base_name = os.path.splitext(os.path.basename(file_path))[0]
+    path = _encode(trimmed, os.path.join(output_dir, f"{base_name}_16k"))
+    prepared = PreparedAudio(
+        path,
+        OffsetMap(spans),
+        original_seconds=len(pcm) / TARGET_SAMPLE_RATE,
+        processed_seconds=len(trimmed) / TARGET_SAMPLE_RATE,
+        original_bytes=os.path.getsize(file_path),
+        processed_bytes=os.path.getsize(path),
+        samples=trimmed if keep_samples else None,
+    )
+
+    if prepared.processed_bytes >= prepared.original_bytes and prepared.offsets.is_identity:
+        logger.info("Preprocessing would not shrink the upload - using the original file")
+        os.remove(path)
+        # Nothing was trimmed, so the decoded samples still match the original's timeline
+        return PreparedAudio.passthrough(file_path, prepared.samples)
+
+    logger.info(f"🎚️ Preprocessed audio: {prepared.original_seconds:.0f}s -> {prepared.processed_seconds:.0f}s "
+                f"({len(regions)} speech regions), {prepared.original_bytes / 1e6:.1f} MB -> "
+                f"{prepared.processed_bytes / 1e6:.1f} MB")
+    return prepared
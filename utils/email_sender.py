@@ -1,13 +1,18 @@
 # utils/email_sender.py
-# Optional email sending functions
-# This file will contain:
-# 1. Imports for SMTP or an email API client (e.g., smtplib, sendgrid).
-# 2. Configuration for email credentials and server settings.
-# 3. A `send_email` function that accepts recipient, subject, body, and attachments (PDF).
-# 4. Error handling for failed email delivery.
+# SMTP email delivery
+# This file contains:
+# 1. ReportMessage: the subject, body and PDF attachment of a report, encoded once and reused.
+# 2. SMTPTransport: a small pool of persistent, logged-in SMTP sessions.
+# 3. `send_meeting_report`, the synchronous single-recipient helper kept for direct use.
+#
+# Configuration comes from SMTP_SERVER, SMTP_PORT, SENDER_EMAIL, SENDER_PASSWORD and SMTP_STARTTLS.
+# Queued, retried delivery lives in outbox.py.
 
 import os
+import queue
 import smtplib
+import threading
+import time
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 from email.mime.base import MIMEBase
@@ -17,54 +22,249 @@ from utils.logger import get_logger
 # Initialize logger for email operations
 logger = get_logger("EmailSender")
 
-def send_meeting_report(recipient_email, pdf_path, summary_text):
+# Persistent SMTP sessions kept open for reuse
+SMTP_POOL_SIZE = int(os.getenv("SMTP_POOL_SIZE", 2))
+# Idle sessions older than this are checked with NOOP before reuse
+SMTP_KEEPALIVE_SECONDS = float(os.getenv("SMTP_KEEPALIVE_SECONDS", 60))
+SMTP_TIMEOUT = float(os.getenv("SMTP_TIMEOUT", 30))
+
+# OSErrors raised by reading the report itself; retrying will not make the file appear
+_LOCAL_FILE_ERRORS = (FileNotFoundError, IsADirectoryError, NotADirectoryError, PermissionError)
+
+REPORT_SUBJECT = "Meeting Summary & Report"
+
+
+class ReportMessage:
     """
-    Sends the generated meeting summary and PDF report via email.
-    Assumes standard SMTP configuration from environment variables.
+    The content of one meeting report email.
+
+    The PDF is read once; its MIME part and its base64 form (for SendGrid) are built
+    on first use and shared by every batch that sends this report.
     """
-    logger.info(f"Preparing to send email to: {recipient_email}")
-    
-    # Step 1: Retrieve credentials from environment variables
-    smtp_server = os.getenv("SMTP_SERVER", "smtp.gmail.com")
-    smtp_port = int(os.getenv("SMTP_PORT", 587))
-    sender_email = os.getenv("SENDER_EMAIL")
-    sender_password = os.getenv("SENDER_PASSWORD") # Use an App Password for Gmail
-
-    if not sender_email or not sender_password:
-        logger.error("Email credentials missing in .env file.")
-        return "Error: Sender credentials not configured."
 
-    try:
-        # Step 2: Create the multi-part email message
-        msg = MIMEMultipart()
-        msg['From'] = sender_email
-        msg['To'] = recipient_email
-        msg['Subject'] = "Meeting Summary & Report"
+    def __init__(self, pdf_path, summary_text):
+        self.pdf_path = pdf_path
+        self.subject = REPORT_SUBJECT
+        self.body = f"Hello,\n\nPlease find the meeting summary below and the full report attached.\n\n{summary_text}"
+        self.filename = os.path.basename(pdf_path) if pdf_path else None
+        self._lock = threading.Lock()
+        self._pdf_bytes = None
+        self._mime_part = None
+        self._base64 = None
+
+        if not pdf_path or not os.path.exists(pdf_path):
+            logger.warning(f"PDF attachment not found at {pdf_path}. Sending email without it.")
+            self.filename = None
 
-        # Step 3: Attach the body of the email (the summary text)
-        body = f"Hello,\n\nPlease find the meeting summary below and the full report attached.\n\n{summary_text}"
-        msg.attach(MIMEText(body, 'plain'))
+    def _read_pdf(self):
+        if self._pdf_bytes is None:
+            with open(self.pdf_path, "rb") as attachment:
+                self._pdf_bytes = attachment.read()
+        return self._pdf_bytes
 
-        # Step 4: Attach the PDF file
-        if os.path.exists(pdf_path):
-            with open(pdf_path, "rb") as attachment:
+    def mime_attachment(self):
+        """
+        Returns the base64-encoded MIME part for the PDF, or None without an attachment.
+        """
+        if self.filename is None:
+            return None
+        with self._lock:
+            if self._mime_part is None:
                 part = MIMEBase('application', 'octet-stream')
-                part.set_payload(attachment.read())
+                part.set_payload(self._read_pdf())
                 encoders.encode_base64(part)
-                part.add_header(
-                    'Content-Disposition',
-                    f'attachment; filename={os.path.basename(pdf_path)}'
-                )
-                msg.attach(part)
-        else:
-            logger.warning(f"PDF attachment not found at {pdf_path}. Sending email without it.")
+                part.add_header('Content-Disposition', f'attachment; filename={self.filename}')
+                self._mime_part = part
+            return self._mime_part
+
+    def base64_attachment(self):
+        """
+        Returns the PDF as a base64 string, or None without an attachment.
+        """
+        if self.filename is None:
+            return None
+        with self._lock:
+            if self._base64 is None:
+                # The MIME part already holds the same base64 text; reuse it when present
+                if self._mime_part is not None:
+                    self._base64 = self._mime_part.get_payload().replace("\n", "")
+                else:
+                    import base64
+                    self._base64 = base64.b64encode(self._read_pdf()).decode()
+            return self._base64
+
+    def to_mime(self, sender, recipients):
+        """
+        Builds the message for one batch. Recipients of a batch do not see each other:
+        the list only goes in the SMTP envelope, like SendGrid's per-recipient personalizations.
+        """
+        msg = MIMEMultipart()
+        msg['From'] = sender
+        msg['To'] = recipients[0] if len(recipients) == 1 else "undisclosed-recipients:;"
+        msg['Subject'] = self.subject
+        msg.attach(MIMEText(self.body, 'plain'))
+        attachment = self.mime_attachment()
+        if attachment is not None:
+            msg.attach(attachment)
+        return msg
+
+
+class _Session:
+    def __init__(self, connection):
+        self.connection = connection
+        self.last_used = time.monotonic()
+
+
+class SMTPTransport:
+    """
+    Sends reports over a pool of persistent SMTP sessions.
+
+    A session is connected, upgraded with STARTTLS and logged in once, then reused
+    for later batches. Sessions idle for longer than SMTP_KEEPALIVE_SECONDS are
+    checked with NOOP first, and a session the server dropped is replaced.
+    """
+    name = "smtp"
+
+    def __init__(self):
+        self.server = os.getenv("SMTP_SERVER", "smtp.gmail.com")
+        self.port = int(os.getenv("SMTP_PORT", 587))
+        self.sender = os.getenv("SENDER_EMAIL")
+        self.password = os.getenv("SENDER_PASSWORD") # Use an App Password for Gmail
+        # Plain-text relays (e.g. a local test server) can turn STARTTLS off
+        self.use_starttls = os.getenv("SMTP_STARTTLS", "true").lower() in ("1", "true", "yes")
+        self._idle = queue.LifoQueue(maxsize=SMTP_POOL_SIZE)
+        self._lock = threading.Lock()
+        self.connections_opened = 0
 
-        # Step 5: Connect to the SMTP server and send the email
-        with smtplib.SMTP(smtp_server, smtp_port) as server:
-            server.starttls() # Secure the connection
-            server.login(sender_email, sender_password)
-            server.send_message(msg)
-            
+    def configuration_error(self):
+        """
+        Returns an error message if credentials are missing, else None.
+        """
+        if not self.sender or not self.password:
+            return "Error: Sender credentials not configured."
+        return None
+
+    def _connect(self):
+        connection = smtplib.SMTP(self.server, self.port, timeout=SMTP_TIMEOUT)
+        try:
+            if self.use_starttls:
+                connection.starttls() # Secure the connection
+            connection.login(self.sender, self.password)
+        except Exception:
+            connection.close()
+            raise
+        with self._lock:
+            self.connections_opened += 1
+        logger.info(f"🔌 Opened SMTP session to {self.server}:{self.port}")
+        return _Session(connection)
+
+    def _acquire(self):
+        while True:
+            try:
+                session = self._idle.get_nowait()
+            except queue.Empty:
+                return self._connect()
+            if time.monotonic() - session.last_used < SMTP_KEEPALIVE_SECONDS:
+                return session
+            try:
+                if session.connection.noop()[0] == 250:
+                    return session
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._close(session)
+
+    def _release(self, session):
+        session.last_used = time.monotonic()
+        try:
+            self._idle.put_nowait(session)
+        except queue.Full:
+            self._close(session)
+
+    @staticmethod
+    def _close(session):
+        try:
+            session.connection.quit()
+        except (smtplib.SMTPException, OSError):
+            session.connection.close()
+
+    def send(self, report, recipients):
+        """
+        Sends one message to all recipients, who are only named in the envelope. Raises on failure.
+        """
+        msg = report.to_mime(self.sender, recipients)
+        session = self._acquire()
+        try:
+            refused = session.connection.send_message(msg, from_addr=self.sender, to_addrs=recipients)
+        except smtplib.SMTPServerDisconnected:
+            # The server closed an idle session between our check and the send; retry once on a new one
+            self._close(session)
+            session = self._connect()
+            try:
+                refused = session.connection.send_message(msg, from_addr=self.sender, to_addrs=recipients)
+            except Exception:
+                self._close(session)
+                raise
+        except Exception:
+            self._close(session)
+            raise
+        self._release(session)
+        if refused:
+            logger.warning(f"⚠️ Recipients refused by the SMTP server: {sorted(refused)}")
+        return refused
+
+    @staticmethod
+    def is_retryable(error):
+        """
+        Temporary failures (4xx replies, dropped connections, network errors) are worth retrying;
+        authentication problems, permanent 5xx rejections and local file errors (a missing
+        or unreadable report) are not.
+        """
+        if isinstance(error, (smtplib.SMTPAuthenticationError, _LOCAL_FILE_ERRORS)):
+            return False
+        if isinstance(error, smtplib.SMTPRecipientsRefused):
+            return any(400 <= code < 500 for code, _ in error.recipients.values())
+        if isinstance(error, smtplib.SMTPResponseException):
+            return 400 <= error.smtp_code < 500
+        return isinstance(error, (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError, OSError))
+
+    def close(self):
+        while True:
+            try:
+                self._close(self._idle.get_nowait())
+            except queue.Empty:
+                return
+
+
+_transport = None
+_transport_lock = threading.Lock()
+
+
+def get_smtp_transport():
+    """
+    Returns the process-wide SMTP transport.
+    """
+    global _transport
+    with _transport_lock:
+        if _transport is None:
+            _transport = SMTPTransport()
+        return _transport
+
+
+def send_meeting_report(recipient_email, pdf_path, summary_text):
+    """
+    Sends the generated meeting summary and PDF report via email, synchronously.
+    Assumes standard SMTP configuration from environment variables.
+    """
+    logger.info(f"Preparing to send email to: {recipient_email}")
+
+    transport = get_smtp_transport()
+    error = transport.configuration_error()
+    if error:
+        logger.error("Email credentials missing in .env file.")
+        return error
+
+    try:
+        transport.send(ReportMessage(pdf_path, summary_text), [recipient_email])
         logger.info("Email sent successfully!")
         return True
 
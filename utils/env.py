@@ -0,0 +1,16 @@
+# utils/env.py
+# One-time loading of the .env file
+# Entry points (app.py, batch.py) call load_env() before importing the modules that read
+# their configuration at import time; modules that need credentials call it as well.
+# The file is located and parsed once per process, however many callers ask for it.
+
+import functools
+
+
+@functools.lru_cache(maxsize=None)
+def load_env():
+    """
+    Loads .env into os.environ (variables that are already set win).
+    """
+    from dotenv import load_dotenv
+    load_dotenv()
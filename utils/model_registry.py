@@ -0,0 +1,137 @@
+# utils/model_registry.py
+# Process-wide cache for heavy models (e.g. the Pyannote diarization pipeline)
+# This file contains:
+# 1. A thread-safe registry that loads each model once per (name, token) key.
+# 2. An idle timeout that releases models when the app has been quiet for a while.
+# 3. Load-time and hit/miss counters so the effect of caching can be observed.
+
+import hashlib
+import threading
+import time
+from utils.logger import get_logger
+
+logger = get_logger("ModelRegistry")
+
+
+class ModelRegistry:
+    """
+    Loads models lazily, shares them across concurrent jobs and frees them when idle.
+
+    Args:
+        idle_timeout (float): Seconds without use after which a model is released.
+            Use 0 or None to keep models loaded for the lifetime of the process.
+    """
+
+    def __init__(self, idle_timeout=None):
+        self.idle_timeout = idle_timeout
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        self._models = {}       # key -> model
+        self._last_used = {}    # key -> monotonic timestamp
+        self._load_times = {}   # key -> seconds spent in the loader
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._reaper = None
+
+    @staticmethod
+    def make_key(name, token=None):
+        """
+        Builds a cache key without keeping the raw token around in memory dumps or logs.
+        """
+        token_hash = hashlib.sha256(token.encode()).hexdigest()[:12] if token else "anonymous"
+        return f"{name}:{token_hash}"
+
+    def get(self, name, loader, token=None):
+        """
+        Returns the cached model for (name, token), calling `loader()` on a miss.
+
+        Concurrent callers asking for the same key wait for a single load instead
+        of loading the weights several times.
+        """
+        key = self.make_key(name, token)
+
+        with self._lock:
+            if key in self._models:
+                self._hits += 1
+                self._last_used[key] = time.monotonic()
+                return self._models[key]
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            # Another thread may have finished loading while we waited
+            with self._lock:
+                if key in self._models:
+                    self._hits += 1
+                    self._last_used[key] = time.monotonic()
+                    return self._models[key]
+
+            logger.info(f"⏱️ Loading model '{name}'...")
+            load_start = time.time()
+            model = loader()
+            load_time = time.time() - load_start
+            logger.info(f"✅ Model '{name}' loaded in {load_time:.2f} seconds")
+
+            with self._lock:
+                self._misses += 1
+                self._models[key] = model
+                self._last_used[key] = time.monotonic()
+                self._load_times[key] = load_time
+                self._start_reaper()
+            return model
+
+    def release(self, name=None, token=None):
+        """
+        Drops one model (or all of them when name is None) from the cache.
+        """
+        with self._lock:
+            keys = list(self._models) if name is None else [self.make_key(name, token)]
+            for key in keys:
+                if self._models.pop(key, None) is not None:
+                    self._last_used.pop(key, None)
+                    self._evictions += 1
+                    logger.info(f"🧹 Released model '{key.split(':')[0]}'")
+
+    def stats(self):
+        """
+        Returns a snapshot of cache counters and per-model load times.
+        """
+        with self._lock:
+            now = time.monotonic()
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "loaded": [
+                    {
+                        "model": key.split(':')[0],
+                        "load_time": round(self._load_times.get(key, 0.0), 3),
+                        "idle_for": round(now - self._last_used[key], 1),
+                    }
+                    for key in self._models
+                ],
+            }
+
+    def _start_reaper(self):
+        # Caller holds self._lock
+        if not self.idle_timeout or (self._reaper and self._reaper.is_alive()):
+            return
+        self._reaper = threading.Thread(target=self._reap_idle, name="model-registry-reaper", daemon=True)
+        self._reaper.start()
+
+    def _reap_idle(self):
+        interval = max(1.0, self.idle_timeout / 4)
+        while True:
+            time.sleep(interval)
+            with self._lock:
+                now = time.monotonic()
+                idle = [key for key, used in self._last_used.items() if now - used >= self.idle_timeout]
+                for key in idle:
+                    self._models.pop(key, None)
+                    self._last_used.pop(key, None)
+                    self._evictions += 1
+                    logger.info(f"🧹 Released idle model '{key.split(':')[0]}' after {self.idle_timeout:.0f}s")
+                if not self._models:
+                    # Nothing left to watch; the next load starts a new reaper
+                    self._reaper = None
+                    return
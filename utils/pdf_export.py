@@ -1,85 +1,277 @@
 # utils/pdf_export.py
 # PDF generation functions
-# This file will contain:
-# 1. Imports for PDF creation libraries (e.g., FPDF, reportlab).
-# 2. A `save_summary_to_pdf` function.
-# 3. Logic to format the summary text, headers, and bullet points into a readable PDF document.
-# 4. Saving the generated PDF to the output path (potentially in the assets folder).
+# This file contains:
+# 1. The MeetingPDF layout (header, footer, summary and transcript sections).
+# 2. A line wrapper with cached font metrics, so long transcripts are written
+#    line by line in speaker-turn batches instead of one huge multi_cell call.
+# 3. A process pool that renders reports off the job worker (and outside its GIL).
+# 4. Saving the generated PDF to the per-job output path.
+#
+# fpdf is only imported where reports are rendered (normally the worker processes), so
+# importing this module costs the app nothing at startup.
 
+import functools
+import multiprocessing
 import os
-from fpdf import FPDF
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from utils.logger import get_logger
+from utils.transcript import Transcript
 
 # Initialize logger
 logger = get_logger("PDFExport")
 
-class MeetingPDF(FPDF):
+# Worker processes rendering reports; 0 renders on the calling thread
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", 2))
+# Speaker turns wrapped and written per batch (bounds the memory used for wrapped lines)
+PDF_TURN_BATCH = int(os.getenv("PDF_TURN_BATCH", 200))
+# Distinct words whose widths are remembered per font before the cache is reset
+_WORD_CACHE_LIMIT = 100000
+
+_pool = None
+_pool_lock = threading.Lock()
+_wrappers = {}
+
+@functools.lru_cache(maxsize=None)
+def _meeting_pdf_class():
+    """
+    Defines MeetingPDF on first use, so fpdf is imported only when a report is rendered.
+    """
+    from fpdf import FPDF
+
+    class MeetingPDF(FPDF):
+        """
+        Custom PDF class to handle consistent headers and footers across pages.
+        """
+        def header(self):
+            # Set font for the header: Helvetica, Bold, size 15
+            self.set_font('helvetica', 'B', 15)
+            # Add a centered title to the top of every page
+            self.cell(0, 10, 'Meeting Summary & Transcript', border=False, ln=True, align='C')
+            # Add a small vertical space after the header title
+            self.ln(5)
+
+        def footer(self):
+            # Position the footer at 15mm from the bottom of the page
+            self.set_y(-15)
+            # Set font for the footer: Helvetica, Italic, size 8
+            self.set_font('helvetica', 'I', 8)
+            # Print "Page X/{total_pages}" centered in the footer
+            self.cell(0, 10, f'Page {self.page_no()}/{{nb}}', align='C')
+
+    return MeetingPDF
+
+def __getattr__(name):
+    # utils.pdf_export.MeetingPDF stays importable without importing fpdf up front
+    if name == "MeetingPDF":
+        return _meeting_pdf_class()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+class LineWrapper:
+    """
+    Greedy word wrapper for one font, size and line width.
+
+    Character and word widths are measured once and cached, so wrapping cost is
+    linear in the text length (fpdf's own line breaker re-measures the growing
+    line on every character). Instances are shared across pages and documents.
+    """
+
+    def __init__(self, pdf, width):
+        self.width = width
+        self.bind(pdf)
+        self._chars = {}
+        self._words = {}
+        self.space = self.char_width(" ")
+
+    def bind(self, pdf):
+        """
+        Measures new characters with `pdf`, which must have this wrapper's font selected.
+        """
+        self._pdf = pdf
+
+    def char_width(self, char):
+        width = self._chars.get(char)
+        if width is None:
+            width = self._chars[char] = self._pdf.get_string_width(char)
+        return width
+
+    def word_width(self, word):
+        width = self._words.get(word)
+        if width is None:
+            if len(self._words) >= _WORD_CACHE_LIMIT:
+                self._words.clear()
+            width = self._words[word] = sum(self.char_width(char) for char in word)
+        return width
+
+    def _split_long_word(self, word):
+        piece, piece_width = "", 0.0
+        for char in word:
+            char_width = self.char_width(char)
+            if piece and piece_width + char_width > self.width:
+                yield piece
+                piece, piece_width = "", 0.0
+            piece += char
+            piece_width += char_width
+        if piece:
+            yield piece
+
+    def wrap(self, text):
+        """
+        Returns the lines `text` occupies, breaking at spaces where possible.
+        """
+        lines, current, current_width = [], [], 0.0
+        for word in text.split(" "):
+            word_width = self.word_width(word)
+            if word_width > self.width:
+                if current:
+                    lines.append(" ".join(current))
+                    current, current_width = [], 0.0
+                *full, word = self._split_long_word(word)
+                lines.extend(full)
+                word_width = self.word_width(word)
+            extra = word_width + (self.space if current else 0.0)
+            if current and current_width + extra > self.width:
+                lines.append(" ".join(current))
+                current, current_width = [word], word_width
+            else:
+                current.append(word)
+                current_width += extra
+        lines.append(" ".join(current))
+        return lines
+
+def _get_wrapper(pdf, width):
+    key = (pdf.font_family, pdf.font_style, pdf.font_size_pt, round(width, 3))
+    wrapper = _wrappers.get(key)
+    if wrapper is None:
+        wrapper = _wrappers[key] = LineWrapper(pdf, width)
+    wrapper.bind(pdf)
+    return wrapper
+
+def _latin1(text):
+    """
+    The built-in Helvetica font only covers Latin-1; other characters become '?'
+    instead of failing the whole report.
     """
-    Custom PDF class to handle consistent headers and footers across pages.
+    return text.encode("latin-1", "replace").decode("latin-1")
+
+def _turn_batches(transcript, size):
+    """
+    Yields lists of at most `size` speaker turns (transcript lines) without
+    splitting the whole transcript up front.
+    """
+    if isinstance(transcript, Transcript):
+        for start in range(0, len(transcript), size):
+            yield list(transcript.lines(start, start + size))
+        return
+    batch, start = [], 0
+    while start <= len(transcript):
+        end = transcript.find("\n", start)
+        if end == -1:
+            end = len(transcript)
+        batch.append(transcript[start:end])
+        if len(batch) >= size:
+            yield batch
+            batch = []
+        start = end + 1
+    if batch:
+        yield batch
+
+def _write_transcript(pdf, transcript, line_height):
+    """
+    Writes the transcript line by line, one batch of speaker turns at a time.
     """
-    def header(self):
-        # Set font for the header: Helvetica, Bold, size 15
-        self.set_font('helvetica', 'B', 15)
-        # Add a centered title to the top of every page
-        self.cell(0, 10, 'Meeting Summary & Transcript', border=False, ln=True, align='C')
-        # Add a small vertical space after the header title
-        self.ln(5)
-
-    def footer(self):
-        # Position the footer at 15mm from the bottom of the page
-        self.set_y(-15)
-        # Set font for the footer: Helvetica, Italic, size 8
-        self.set_font('helvetica', 'I', 8)
-        # Print "Page X/{total_pages}" centered in the footer
-        self.cell(0, 10, f'Page {self.page_no()}/{{nb}}', align='C')
+    from fpdf.enums import XPos, YPos
+
+    wrapper = _get_wrapper(pdf, pdf.epw)
+    for batch in _turn_batches(transcript, PDF_TURN_BATCH):
+        for turn in batch:
+            for line in wrapper.wrap(_latin1(turn.rstrip("\r"))):
+                pdf.cell(0, line_height, line, new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+
+def render_pdf(summary, transcript, output_path):
+    """
+    Builds the report and writes it to output_path. Raises on failure.
+    Runs inside a PDF worker process (or on the caller's thread when PDF_WORKERS=0).
+    """
+    from fpdf.enums import XPos, YPos
+
+    # Step 1: Create the output directory if it doesn't already exist
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+
+    # Step 2: Initialize the custom PDF object
+    pdf = _meeting_pdf_class()()
+    pdf.alias_nb_pages() # Required to calculate the total page count for the footer
+    pdf.add_page()
+
+    # --- Meeting Summary Section ---
+    # Define a high-level header style for the summary section
+    pdf.set_font('helvetica', 'B', 14)
+    pdf.set_text_color(44, 62, 80) # Use a professional dark blue/gray shade
+    pdf.cell(0, 10, "Meeting Summary", new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+    pdf.ln(2) # Extra spacing
+
+    # Switch to the body font style for the summary itself
+    pdf.set_font('helvetica', '', 11)
+    pdf.set_text_color(0, 0, 0) # Basic black text
+    # Write the summary. Note: We strip '#' to remove basic markdown headers for a cleaner look.
+    pdf.multi_cell(0, 7, _latin1(summary.replace('#', '')))
+    pdf.ln(10) # Add a larger gap before starting the transcript section
+
+    # --- Full Transcript Section ---
+    # Set up a new section header for the transcript
+    pdf.set_font('helvetica', 'B', 14)
+    pdf.set_text_color(44, 62, 80)
+    pdf.cell(0, 10, "Full Transcript", new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+    pdf.ln(2)
+
+    # Use a slightly smaller font for the transcript to fit more content per page
+    pdf.set_font('helvetica', '', 10)
+    pdf.set_text_color(30, 30, 30) # Dark gray text
+    _write_transcript(pdf, transcript, 6)
+
+    # Step 3: Write the finalized content to the PDF file
+    pdf.output(output_path)
+    return output_path
+
+def _get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn: the app process runs many threads, which fork() does not copy safely
+            _pool = ProcessPoolExecutor(max_workers=PDF_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+def _reset_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
 
 def export_to_pdf(summary, transcript, output_path="assets/meeting_report.pdf"):
     """
-    Creates a professional PDF report containing both the meeting summary and the full transcript.
+    Creates a professional PDF report containing both the meeting summary and the full transcript
+    (a Transcript, or its "Speaker: text" form).
+
+    Rendering happens in a worker process so long reports do not stall other jobs;
+    if the pool is unavailable the report is rendered on the calling thread instead.
     """
     logger.info(f"Generating PDF report at: {output_path}")
-    
+
     try:
-        # Step 1: Create the 'assets' directory if it doesn't already exist
-        os.makedirs(os.path.dirname(output_path), exist_ok=True)
-        
-        # Step 2: Initialize the custom PDF object
-        pdf = MeetingPDF()
-        pdf.alias_nb_pages() # Required to calculate the total page count for the footer
-        pdf.add_page()
-        
-        # --- Meeting Summary Section ---
-        # Define a high-level header style for the summary section
-        pdf.set_font('helvetica', 'B', 14)
-        pdf.set_text_color(44, 62, 80) # Use a professional dark blue/gray shade
-        pdf.cell(0, 10, "Meeting Summary", ln=True)
-        pdf.ln(2) # Extra spacing
-        
-        # Switch to the body font style for the summary itself
-        pdf.set_font('helvetica', '', 11)
-        pdf.set_text_color(0, 0, 0) # Basic black text
-        # Write the summary. Note: We strip '#' to remove basic markdown headers for a cleaner look.
-        pdf.multi_cell(0, 7, summary.replace('#', '')) 
-        pdf.ln(10) # Add a larger gap before starting the transcript section
-        
-        # --- Full Transcript Section ---
-        # Set up a new section header for the transcript
-        pdf.set_font('helvetica', 'B', 14)
-        pdf.set_text_color(44, 62, 80)
-        pdf.cell(0, 10, "Full Transcript", ln=True)
-        pdf.ln(2)
-        
-        # Use a slightly smaller font for the transcript to fit more content per page
-        pdf.set_font('helvetica', '', 10)
-        pdf.set_text_color(30, 30, 30) # Dark gray text
-        # Write the full, multi-line transcript
-        pdf.multi_cell(0, 6, transcript)
-        
-        # Step 3: Write the finalized content to the PDF file
-        pdf.output(output_path)
+        if PDF_WORKERS > 0:
+            try:
+                _get_pool().submit(render_pdf, summary, transcript, output_path).result()
+            except (BrokenProcessPool, OSError) as e:
+                logger.warning(f"⚠️ PDF worker pool unavailable ({str(e)}), rendering in-process")
+                _reset_pool()
+                render_pdf(summary, transcript, output_path)
+        else:
+            render_pdf(summary, transcript, output_path)
         logger.info("PDF document generated successfully.")
         return output_path
-    
+
     except Exception as e:
         # Capture and log any issues during PDF creation (e.g., file permissions)
         error_msg = f"Failed to generate PDF: {str(e)}"
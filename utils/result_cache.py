@@ -0,0 +1,239 @@
+# utils/result_cache.py
+# Content-addressed on-disk cache for pipeline stage results
+# This file contains:
+# 1. Hashing helpers for audio files and transcript text.
+# 2. Atomic, concurrency-safe reads and writes of JSON results.
+# 3. Size-bounded LRU eviction based on file access times.
+# 4. A `cached_call` helper used by transcription, diarization, Deepgram and summarization.
+#
+# Configuration (environment variables):
+#   RESULT_CACHE_DIR       Where results are stored (default: .cache/results)
+#   RESULT_CACHE_MAX_MB    Size bound before least-recently-used entries are evicted (default: 512)
+#   RESULT_CACHE_DISABLED  Set to 1/true to bypass the cache entirely
+#   RESULT_CACHE_SCAN_EVERY  Writes between full size scans, to catch entries written by other workers (default: 200)
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from utils.logger import get_logger
+
+logger = get_logger("ResultCache")
+
+CACHE_DIR = os.getenv("RESULT_CACHE_DIR", os.path.join(".cache", "results"))
+CACHE_MAX_BYTES = int(float(os.getenv("RESULT_CACHE_MAX_MB", 512)) * 1024 * 1024)
+# This process only tracks its own writes; rescan now and then to count other workers' too
+CACHE_SCAN_EVERY = max(1, int(os.getenv("RESULT_CACHE_SCAN_EVERY", 200)))
+# Eviction frees down to this fraction of the bound so a full cache is not rescanned on every put
+_EVICT_LOW_WATER = 0.9
+
+_HASH_CHUNK_SIZE = 1024 * 1024
+
+# Several stages hash the same upload; remember the most recent digests by (path, size, mtime)
+_DIGEST_MEMO_SIZE = 256
+_digest_memo = OrderedDict()
+_digest_lock = threading.Lock()
+_evict_lock = threading.Lock()
+
+# Running estimate of the cache size in bytes (None until the first scan) and writes since that scan
+_size_estimate = None
+_puts_since_scan = 0
+_size_lock = threading.Lock()
+
+
+def is_enabled():
+    """
+    Returns False when the cache is bypassed via RESULT_CACHE_DISABLED.
+    """
+    return os.getenv("RESULT_CACHE_DISABLED", "false").lower() not in ("1", "true", "yes")
+
+
+def file_digest(file_path):
+    """
+    Returns the SHA-256 of a file's contents, streaming it in fixed-size chunks.
+    """
+    stat = os.stat(file_path)
+    memo_key = (os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns)
+    with _digest_lock:
+        if memo_key in _digest_memo:
+            _digest_memo.move_to_end(memo_key)
+            return _digest_memo[memo_key]
+
+    sha = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK_SIZE), b""):
+            sha.update(chunk)
+    digest = sha.hexdigest()
+
+    with _digest_lock:
+        _digest_memo[memo_key] = digest
+        if len(_digest_memo) > _DIGEST_MEMO_SIZE:
+            _digest_memo.popitem(last=False)
+    return digest
+
+
+def text_digest(text):
+    """
+    Returns the SHA-256 of a text payload (e.g. a transcript).
+    """
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def make_key(stage, content_digest, config):
+    """
+    Combines the stage name, content hash and stage configuration into one cache key.
+    Any change to the model, backend options or prompt version yields a new key.
+    """
+    payload = json.dumps({"stage": stage, "content": content_digest, "config": config}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _entry_path(key):
+    return os.path.join(CACHE_DIR, key[:2], f"{key}.json")
+
+
+def get(key):
+    """
+    Returns the cached value for a key, or None on a miss.
+    A hit refreshes the entry's access time so eviction is least-recently-used.
+    """
+    path = _entry_path(key)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            value = json.load(f)["value"]
+        os.utime(path, None)
+        return value
+    except FileNotFoundError:
+        return None
+    except (ValueError, KeyError, OSError) as e:
+        # A corrupt entry is treated as a miss and overwritten by the next put()
+        logger.warning(f"⚠️ Ignoring unreadable cache entry {key[:12]}: {str(e)}")
+        return None
+
+
+def put(key, value):
+    """
+    Stores a JSON-serializable value atomically, then enforces the size bound.
+    Writers race safely: each writes a private temp file and renames it into place.
+    The directory is only rescanned once the running size estimate crosses the bound
+    (or every CACHE_SCAN_EVERY writes), not on every put.
+    """
+    global _size_estimate, _puts_since_scan
+    path = _entry_path(key)
+    directory = os.path.dirname(path)
+    try:
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"value": value}, f)
+                written = f.tell()
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+    except (TypeError, OSError) as e:
+        logger.warning(f"⚠️ Could not write cache entry {key[:12]}: {str(e)}")
+        return False
+
+    with _size_lock:
+        _puts_since_scan += 1
+        if _size_estimate is not None:
+            # Overwrites are counted twice; that only brings the next scan forward
+            _size_estimate += written
+        needs_scan = (_size_estimate is None or _size_estimate > CACHE_MAX_BYTES
+                      or _puts_since_scan >= CACHE_SCAN_EVERY)
+    # Skip if another thread is scanning; the estimate stays high, so the next put checks again
+    if needs_scan and _evict_lock.acquire(blocking=False):
+        try:
+            _evict_locked(CACHE_MAX_BYTES, int(CACHE_MAX_BYTES * _EVICT_LOW_WATER))
+        finally:
+            _evict_lock.release()
+    return True
+
+
+def evict(max_bytes=None):
+    """
+    Deletes least-recently-used entries until the cache fits within max_bytes.
+    """
+    max_bytes = CACHE_MAX_BYTES if max_bytes is None else max_bytes
+    with _evict_lock:
+        return _evict_locked(max_bytes, max_bytes)
+
+
+def _evict_locked(max_bytes, target_bytes):
+    """
+    Scans the cache and, if it exceeds max_bytes, evicts down to target_bytes.
+    Resets the running size estimate. The caller holds _evict_lock.
+    """
+    entries = []
+    total = 0
+    for root, _, files in os.walk(CACHE_DIR):
+        for name in files:
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(root, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+
+    if total <= max_bytes:
+        _reset_estimate(total)
+        return 0
+
+    removed = 0
+    for _, size, path in sorted(entries):
+        if total <= target_bytes:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass  # Another worker evicted it first
+        total -= size
+        removed += 1
+    _reset_estimate(total)
+    logger.info(f"🧹 Evicted {removed} cache entries to stay under {max_bytes / (1024 * 1024):.0f} MB")
+    return removed
+
+
+def _reset_estimate(total):
+    global _size_estimate, _puts_since_scan
+    with _size_lock:
+        _size_estimate = total
+        _puts_since_scan = 0
+
+
+def cached_call(stage, content_digest, config, compute, should_store):
+    """
+    Returns a cached stage result if its input and config are unchanged, otherwise computes it.
+
+    Args:
+        stage (str): Stage name, e.g. "whisper" or "summary".
+        content_digest (str): Hash of the stage input (audio file or transcript).
+        config (dict): Everything else that affects the output (model, options, prompt version).
+        compute (callable): Produces the result on a miss.
+        should_store (callable): Decides whether a computed result is worth caching
+            (errors are never cached).
+
+    Returns:
+        The cached or freshly computed result.
+    """
+    if not is_enabled():
+        return compute()
+
+    key = make_key(stage, content_digest, config)
+    cached = get(key)
+    if cached is not None:
+        logger.info(f"♻️ Cache hit for {stage} ({key[:12]})")
+        return cached
+
+    result = compute()
+    if should_store(result):
+        put(key, result)
+    return result
@@ -1,49 +1,107 @@
 # utils/sendgrid_handler.py
+# SendGrid email delivery, sharing ReportMessage with the SMTP transport
 import os
-from sendgrid import SendGridAPIClient
-from sendgrid.helpers.mail import Mail, Attachment, FileContent, FileName, FileType, Disposition
+import threading
+from utils.email_sender import ReportMessage
 from utils.logger import get_logger
-import base64
 
 logger = get_logger("SendGridHandler")
 
-def send_meeting_report(recipient_email, pdf_path, summary_text):
-    logger.info(f"Preparing to send email via SendGrid to: {recipient_email}")
 
-    sender_email = os.getenv("SENDER_EMAIL")
-    api_key = os.getenv("SENDGRID_API_KEY")
+class SendGridTransport:
+    """
+    Sends reports through the SendGrid v3 API with one reusable client.
 
-    if not sender_email or not api_key:
-        logger.error("SendGrid credentials missing in .env file.")
-        return "Error: Credentials not configured."
-
-    # Step 1: Build the email
-    message = Mail(
-        from_email=sender_email,
-        to_emails=recipient_email,
-        subject="Meeting Summary & Report",
-        plain_text_content=f"Hello,\n\nPlease find the meeting summary below and the full report attached.\n\n{summary_text}"
-    )
-
-    # Step 2: Attach PDF if exists
-    if os.path.exists(pdf_path):
-        with open(pdf_path, "rb") as f:
-            encoded = base64.b64encode(f.read()).decode()
-            attachment = Attachment(
+    A batch is a single API call with one personalization per recipient, so every
+    recipient gets their own copy; the attachment is base64-encoded once per report.
+    """
+    name = "sendgrid"
+
+    def __init__(self):
+        self.sender = os.getenv("SENDER_EMAIL")
+        self.api_key = os.getenv("SENDGRID_API_KEY")
+        self._client = None
+        self._lock = threading.Lock()
+
+    def configuration_error(self):
+        if not self.sender or not self.api_key:
+            return "Error: Credentials not configured."
+        return None
+
+    def _get_client(self):
+        with self._lock:
+            if self._client is None:
+                from sendgrid import SendGridAPIClient
+                self._client = SendGridAPIClient(self.api_key)
+            return self._client
+
+    def send(self, report, recipients):
+        """
+        Sends one batch to all recipients. Raises on failure.
+        """
+        from sendgrid.helpers.mail import Mail, Attachment, FileContent, FileName, FileType, Disposition
+
+        message = Mail(
+            from_email=self.sender,
+            to_emails=list(recipients),
+            subject=report.subject,
+            plain_text_content=report.body,
+            is_multiple=True
+        )
+        encoded = report.base64_attachment()
+        if encoded is not None:
+            message.attachment = Attachment(
                 FileContent(encoded),
-                FileName(os.path.basename(pdf_path)),
+                FileName(report.filename),
                 FileType('application/pdf'),
                 Disposition('attachment')
             )
-            message.attachment = attachment
-    else:
-        logger.warning(f"PDF attachment not found at {pdf_path}. Sending email without it.")
 
-    # Step 3: Send the email
+        response = self._get_client().send(message)
+        logger.info(f"SendGrid accepted the batch. Status code: {response.status_code}")
+        return {}
+
+    @staticmethod
+    def is_retryable(error):
+        """
+        Rate limits (429), server errors and network failures are retried; other 4xx are not.
+        """
+        status = getattr(error, "status_code", None) or getattr(error, "code", None)
+        if isinstance(status, int):
+            return status == 429 or status >= 500
+        return isinstance(error, OSError)
+
+    def close(self):
+        pass
+
+
+_transport = None
+_transport_lock = threading.Lock()
+
+
+def get_sendgrid_transport():
+    """
+    Returns the process-wide SendGrid transport.
+    """
+    global _transport
+    with _transport_lock:
+        if _transport is None:
+            _transport = SendGridTransport()
+        return _transport
+
+
+def send_meeting_report(recipient_email, pdf_path, summary_text):
+    logger.info(f"Preparing to send email via SendGrid to: {recipient_email}")
+
+    transport = get_sendgrid_transport()
+    error = transport.configuration_error()
+    if error:
+        logger.error("SendGrid credentials missing in .env file.")
+        return error
+
     try:
-        sg = SendGridAPIClient(api_key)
-        response = sg.send(message)
-        logger.info(f"Email sent successfully! Status code: {response.status_code}")
+        transport.send(ReportMessage(pdf_path, summary_text), [recipient_email])
+        logger.info("Email sent successfully!")
         return True
     except Exception as e:
         logger.error(f"Failed to send email via SendGrid: {str(e)}")
@@ -0,0 +1,122 @@
+# utils/speaker_tracking.py
+# Incremental speaker labelling for live transcription
+# This file contains:
+# 1. A cheap voice signature (cepstrum of the average log spectrum) computed from an utterance's samples.
+# 2. An IncrementalSpeakerTracker that gives every new utterance a stable "Speaker N" label,
+#    either by mapping a backend's own speaker ids or by online clustering of voice signatures.
+#
+# Labels are assigned once and never rewritten, so lines already shown in the UI keep their speaker.
+
+import os
+import threading
+from utils.logger import get_logger
+
+logger = get_logger("SpeakerTracking")
+
+# Cosine similarity above which an utterance joins an existing speaker
+LIVE_SPEAKER_SIMILARITY = float(os.getenv("LIVE_SPEAKER_SIMILARITY", 0.85))
+# Upper bound on distinct speakers; beyond it utterances go to the closest known speaker
+LIVE_MAX_SPEAKERS = int(os.getenv("LIVE_MAX_SPEAKERS", 8))
+
+_FFT_SIZE = 512
+_BANDS = 24
+_MIN_HZ, _MAX_HZ = 80.0, 4000.0
+_CEPSTRA = 12
+# Bands more than this far below the loudest one are floored, so near-silent bands add no noise
+_DYNAMIC_RANGE_DB = 50.0
+
+
+def voice_signature(pcm, sample_rate=16000):
+    """
+    Returns a unit-length vector describing the spectral envelope of an utterance,
+    or None if it is too short or silent.
+
+    The average power spectrum is pooled into log-spaced bands, and the DCT of the
+    log band energies (without the 0th coefficient) is kept, as in MFCCs: loudness
+    drops out, while pitch and formant structure remain.
+    """
+    import numpy as np
+
+    frames = len(pcm) // _FFT_SIZE
+    if frames == 0:
+        return None
+    window = np.hanning(_FFT_SIZE).astype(np.float32)
+    blocks = pcm[:frames * _FFT_SIZE].astype(np.float32).reshape(frames, _FFT_SIZE) * window
+    power = np.mean(np.abs(np.fft.rfft(blocks, axis=1)) ** 2, axis=0)
+    if not np.any(power > 0):
+        return None
+
+    frequencies = np.fft.rfftfreq(_FFT_SIZE, 1.0 / sample_rate)
+    edges = np.geomspace(_MIN_HZ, _MAX_HZ, _BANDS + 1)
+    band = np.digitize(frequencies, edges) - 1
+    inside = (band >= 0) & (band < _BANDS)
+    energies = np.bincount(band[inside], weights=power[inside], minlength=_BANDS)
+    log_energies = 10 * np.log10(energies + 1e-10)
+    log_energies = np.maximum(log_energies, log_energies.max() - _DYNAMIC_RANGE_DB)
+
+    positions = np.arange(_BANDS)
+    basis = np.cos(np.pi * np.arange(1, _CEPSTRA + 1)[:, None] * (2 * positions + 1) / (2 * _BANDS))
+    signature = basis @ log_energies
+    norm = np.linalg.norm(signature)
+    return signature / norm if norm > 0 else None
+
+
+class IncrementalSpeakerTracker:
+    """
+    Assigns "Speaker N" labels to utterances in arrival order.
+
+    Utterances that carry a backend speaker id (Deepgram streams them) are mapped to
+    labels in order of first appearance. Utterances that carry a voice signature are
+    clustered online: each joins the most similar known speaker if the similarity is
+    at least LIVE_SPEAKER_SIMILARITY, and otherwise starts a new one.
+    """
+
+    def __init__(self, similarity=LIVE_SPEAKER_SIMILARITY, max_speakers=LIVE_MAX_SPEAKERS):
+        self.similarity = similarity
+        self.max_speakers = max_speakers
+        self._lock = threading.Lock()
+        self._by_backend_id = {}
+        self._centroids = []  # running sum of signatures per speaker
+        self._last = None
+
+    @property
+    def speakers(self):
+        return max(len(self._by_backend_id), len(self._centroids))
+
+    def _new_label(self, index):
+        return f"Speaker {index}"
+
+    def label(self, backend_id=None, signature=None):
+        """
+        Returns the label for one utterance.
+
+        Args:
+            backend_id: Speaker id reported by the streaming backend, if any.
+            signature (numpy.ndarray): voice_signature() of the utterance, if any.
+        """
+        with self._lock:
+            if backend_id is not None:
+                if backend_id not in self._by_backend_id:
+                    self._by_backend_id[backend_id] = self._new_label(len(self._by_backend_id))
+                return self._by_backend_id[backend_id]
+            if signature is not None:
+                self._last = self._cluster(signature)
+            # Without a signature (a very short utterance) the previous speaker is assumed
+            return self._last or self._new_label(0)
+
+    def _cluster(self, signature):
+        import numpy as np
+
+        best, best_similarity = None, -1.0
+        for index, centroid in enumerate(self._centroids):
+            similarity = float(np.dot(centroid, signature) / (np.linalg.norm(centroid) or 1.0))
+            if similarity > best_similarity:
+                best, best_similarity = index, similarity
+
+        if best is None or (best_similarity < self.similarity and len(self._centroids) < self.max_speakers):
+            self._centroids.append(np.array(signature, dtype=np.float64))
+            logger.info(f"🗣️ New live speaker detected ({len(self._centroids)} so far)")
+            return self._new_label(len(self._centroids) - 1)
+
+        self._centroids[best] += signature
+        return self._new_label(best)
@@ -0,0 +1,296 @@
+# utils/telemetry.py
+# Lightweight tracing and metrics for the meeting pipeline
+# This file contains:
+# 1. Nested spans (per job) built on contextvars, so worker threads keep their parent.
+# 2. Counters for audio minutes, uploaded bytes, LLM tokens and hedged requests, and gauges
+#    for current values such as API queue depths.
+# 3. Per-stage latency histograms with p50/p95/p99.
+# 4. A Prometheus text-format endpoint served on its own port next to the Gradio app.
+
+import contextvars
+import functools
+import math
+import os
+import threading
+import time
+from collections import deque
+from utils.logger import get_logger
+
+logger = get_logger("Telemetry")
+
+# Observations kept per stage for quantile estimates
+HISTOGRAM_WINDOW = int(os.getenv("METRICS_HISTOGRAM_WINDOW", 2048))
+# Completed job traces kept in memory for inspection
+TRACE_HISTORY = int(os.getenv("METRICS_TRACE_HISTORY", 20))
+QUANTILES = (0.5, 0.95, 0.99)
+
+_current_span = contextvars.ContextVar("current_span", default=None)
+_lock = threading.Lock()
+_counters = {}     # (name, labels) -> value
+_gauges = {}       # (name, labels) -> value
+_histograms = {}   # stage -> Histogram
+_traces = deque(maxlen=TRACE_HISTORY)
+
+COUNTER_HELP = {
+    "meeting_audio_minutes_total": "Minutes of meeting audio processed.",
+    "meeting_upload_bytes_total": "Audio bytes uploaded to speech-to-text APIs.",
+    "meeting_llm_tokens_total": "LLM tokens consumed by summarization.",
+    "meeting_transcript_tokens_total": "Estimated transcript tokens before (raw) and after (compacted) compaction.",
+    "meeting_hedged_requests_total": "Hedged transcription requests by winning backend.",
+    "meeting_hedge_seconds_saved_total": "Seconds of transcription latency saved by hedging, by winning backend.",
+    "meeting_api_requests_total": "Outbound API calls started by the scheduler, by lane.",
+    "meeting_api_rate_limited_total": "429 (rate limited) responses received, by lane.",
+    "meeting_api_retries_total": "Outbound API calls retried by the scheduler, by lane and reason.",
+}
+
+GAUGE_HELP = {
+    "meeting_api_queue_depth": "Outbound API calls waiting for rate-limit capacity, by lane.",
+    "meeting_api_in_flight": "Outbound API calls currently running, by lane.",
+}
+
+
+class Histogram:
+    """
+    Sliding-window latency histogram with cumulative sum and count.
+    """
+
+    def __init__(self):
+        self.window = deque(maxlen=HISTOGRAM_WINDOW)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.window.append(value)
+        self.total += value
+        self.count += 1
+
+    def quantile(self, q):
+        if not self.window:
+            return float("nan")
+        ordered = sorted(self.window)
+        index = min(len(ordered) - 1, max(0, math.ceil(q * len(ordered)) - 1))
+        return ordered[index]
+
+
+class Span:
+    """
+    One timed stage. Spans opened inside another span become its children.
+    """
+
+    def __init__(self, name, parent=None, **attributes):
+        self.name = name
+        self.parent = parent
+        self.attributes = attributes
+        self.children = []
+        self.start = time.perf_counter()
+        self.started_at = time.time()
+        self.duration = None
+        self.error = None
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "started_at": self.started_at,
+            "duration": round(self.duration, 4) if self.duration is not None else None,
+            "attributes": dict(self.attributes),
+            "error": self.error,
+            "children": [child.to_dict() for child in self.children],
+        }
+
+
+class span:
+    """
+    Context manager that times a pipeline stage.
+
+    The duration is recorded in the stage histogram and logged; root spans
+    (e.g. a whole job) are kept as traces.
+
+        with span("summarization", job_id=job.job_id) as s:
+            ...
+            s.set(tokens=123)
+    """
+
+    def __init__(self, name, log=True, **attributes):
+        self.name = name
+        self.log = log
+        self.attributes = attributes
+        self._token = None
+        self.span = None
+
+    def __enter__(self):
+        parent = _current_span.get()
+        self.span = Span(self.name, parent, **self.attributes)
+        if parent is not None:
+            parent.children.append(self.span)
+        self._token = _current_span.set(self.span)
+        if self.log:
+            logger.info(f"⏱️ Starting {self.name}...")
+        return self.span
+
+    def __exit__(self, exc_type, exc, tb):
+        current = self.span
+        current.duration = time.perf_counter() - current.start
+        _current_span.reset(self._token)
+        if exc is not None:
+            current.error = str(exc)
+
+        with _lock:
+            _histograms.setdefault(self.name, Histogram()).observe(current.duration)
+            if current.parent is None:
+                _traces.append(current)
+
+        if self.log:
+            if exc is not None:
+                logger.error(f"❌ {self.name} failed after {current.duration:.2f}s: {str(exc)}")
+            else:
+                logger.info(f"✅ {self.name} completed in {current.duration:.2f} seconds")
+        return False
+
+
+def current_span():
+    """
+    Returns the innermost active span, or None.
+    """
+    return _current_span.get()
+
+
+def propagate(fn):
+    """
+    Wraps fn so it runs in a copy of the caller's context. Use it for work handed
+    to thread pools, so spans opened there nest under the submitting span.
+    """
+    context = contextvars.copy_context()
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        return context.copy().run(fn, *args, **kwargs)
+    return wrapper
+
+
+def increment(name, value=1, **labels):
+    """
+    Adds value to a counter identified by name and labels.
+    """
+    key = (name, tuple(sorted(labels.items())))
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def set_gauge(name, value, **labels):
+    """
+    Sets a gauge identified by name and labels to its current value.
+    """
+    key = (name, tuple(sorted(labels.items())))
+    with _lock:
+        _gauges[key] = value
+
+
+def observe(stage, seconds):
+    """
+    Records a duration in a stage histogram without opening a span (e.g. time spent queued).
+    """
+    with _lock:
+        _histograms.setdefault(stage, Histogram()).observe(seconds)
+
+
+def get_stage_stats():
+    """
+    Returns count, sum and p50/p95/p99 per stage.
+    """
+    with _lock:
+        return {
+            stage: {
+                "count": hist.count,
+                "sum": round(hist.total, 4),
+                **{f"p{int(q * 100)}": round(hist.quantile(q), 4) for q in QUANTILES},
+            }
+            for stage, hist in _histograms.items()
+        }
+
+
+def get_recent_traces():
+    """
+    Returns the most recent completed root spans as nested dicts.
+    """
+    with _lock:
+        return [trace.to_dict() for trace in _traces]
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"') for _, value in labels)
+    return "{" + ",".join(f'{key}="{value}"' for (key, _), value in zip(labels, escaped)) + "}"
+
+
+def render_prometheus():
+    """
+    Renders all counters, gauges and stage histograms in the Prometheus text exposition format.
+    """
+    lines = []
+    with _lock:
+        counters = sorted(_counters.items())
+        gauges = sorted(_gauges.items())
+        histograms = sorted(_histograms.items())
+
+        seen = set()
+        for (name, labels), value in counters:
+            if name not in seen:
+                seen.add(name)
+                lines.append(f"# HELP {name} {COUNTER_HELP.get(name, name)}")
+                lines.append(f"# TYPE {name} counter")
+            lines.append(f"{name}{_format_labels(labels)} {value}")
+
+        for (name, labels), value in gauges:
+            if name not in seen:
+                seen.add(name)
+                lines.append(f"# HELP {name} {GAUGE_HELP.get(name, name)}")
+                lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name}{_format_labels(labels)} {value}")
+
+        if histograms:
+            lines.append("# HELP meeting_stage_duration_seconds Duration of pipeline stages.")
+            lines.append("# TYPE meeting_stage_duration_seconds summary")
+        for stage, hist in histograms:
+            for q in QUANTILES:
+                labels = _format_labels((("stage", stage), ("quantile", q)))
+                lines.append(f"meeting_stage_duration_seconds{labels} {hist.quantile(q)}")
+            labels = _format_labels((("stage", stage),))
+            lines.append(f"meeting_stage_duration_seconds_sum{labels} {hist.total}")
+            lines.append(f"meeting_stage_duration_seconds_count{labels} {hist.count}")
+    return "\n".join(lines) + "\n"
+
+
+def start_metrics_server(port=None, host="0.0.0.0"):
+    """
+    Serves /metrics on a background thread. Returns the server, or None if disabled (port 0).
+    """
+    port = int(os.getenv("METRICS_PORT", 9090)) if port is None else port
+    if not port:
+        return None
+    # Only the app serves metrics, so the HTTP server modules are imported here
+    import http.server
+
+    class _MetricsHandler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.rstrip("/") not in ("", "/metrics"):
+                self.send_response(404)
+                self.end_headers()
+                return
+            body = render_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = http.server.ThreadingHTTPServer((host, port), _MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    logger.info(f"📈 Metrics endpoint listening on http://{host}:{port}/metrics")
+    return server
@@ -0,0 +1,251 @@
+# utils/transcript.py
+# Compact speaker-labelled transcript shared by every pipeline stage
+# This file contains:
+# 1. The Transcript container: speaker ids, start/end times and text offsets in typed arrays,
+#    all turn texts in one string buffer, and a small speaker table.
+# 2. Segment, a __slots__ view of one speaker turn produced on demand while iterating.
+# 3. Serialization to the "Speaker: text" form (summarization, UI), JSON, SRT and WebVTT.
+#
+# A transcript is built once per job (by alignment or a transcription backend) and then
+# passed as-is to summarization and PDF export. Per turn it costs 24 bytes of arrays plus its
+# text, instead of a dict, three floats and two strings.
+
+import json
+import math
+from array import array
+
+_NO_TIME = float("nan")
+
+
+class Segment:
+    """
+    One speaker turn. Created while iterating a Transcript; not stored by it.
+    """
+    __slots__ = ("speaker", "start", "end", "text")
+
+    def __init__(self, speaker, start, end, text):
+        self.speaker = speaker
+        self.start = start
+        self.end = end
+        self.text = text
+
+    def __repr__(self):
+        return f"Segment({self.speaker!r}, {self.start!r}, {self.end!r}, {self.text!r})"
+
+
+class Transcript:
+    """
+    Speaker turns in recording order.
+
+    Turns are added with append(); their texts are joined into the single buffer the
+    first time the transcript is read. Times are seconds on the original recording's
+    timeline, or NaN when the backend did not report them. A turn with an empty speaker
+    label is rendered as plain text.
+    """
+    __slots__ = ("speakers", "_speaker_index", "_speaker_ids", "_starts", "_ends", "_offsets", "_text", "_pending")
+
+    def __init__(self):
+        self.speakers = []         # speaker table; _speaker_ids index into it
+        self._speaker_index = {}   # label -> id
+        self._speaker_ids = array("H")
+        self._starts = array("d")
+        self._ends = array("d")
+        self._offsets = array("I")  # end offset of every turn's text in the buffer
+        self._text = ""
+        self._pending = []          # texts appended since the buffer was last joined
+
+    # --- Building ---
+
+    def append(self, speaker, text, start=None, end=None):
+        """
+        Adds one speaker turn at the end of the transcript.
+        """
+        speaker = speaker or ""
+        speaker_id = self._speaker_index.get(speaker)
+        if speaker_id is None:
+            speaker_id = self._speaker_index[speaker] = len(self.speakers)
+            self.speakers.append(speaker)
+        total = self._offsets[-1] if self._offsets else 0
+        self._speaker_ids.append(speaker_id)
+        self._starts.append(_NO_TIME if start is None else start)
+        self._ends.append(_NO_TIME if end is None else end)
+        self._offsets.append(total + len(text))
+        self._pending.append(text)
+
+    @classmethod
+    def from_records(cls, records, text_key="text"):
+        """
+        Builds a transcript from dicts with 'speaker', 'start', 'end' and `text_key` keys.
+        """
+        transcript = cls()
+        for record in records:
+            transcript.append(record.get("speaker"), record.get(text_key, "").strip(),
+                              record.get("start"), record.get("end"))
+        return transcript
+
+    @classmethod
+    def from_text(cls, text):
+        """
+        Parses a "Speaker: text" transcript (one turn per line, no times).
+        """
+        transcript = cls()
+        for line in text.splitlines():
+            speaker, separator, rest = line.partition(": ")
+            if separator:
+                transcript.append(speaker, rest)
+            elif line.strip():
+                transcript.append("", line)
+        return transcript
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Inverse of to_dict().
+        """
+        return cls.from_records(data.get("segments", []))
+
+    # --- Reading ---
+
+    def _buffer(self):
+        if self._pending:
+            self._text += "".join(self._pending)
+            self._pending = []
+        return self._text
+
+    def __len__(self):
+        return len(self._offsets)
+
+    def __bool__(self):
+        return len(self._offsets) > 0
+
+    def text_of(self, index):
+        buffer = self._buffer()
+        return buffer[self._offsets[index - 1] if index else 0:self._offsets[index]]
+
+    def speaker_of(self, index):
+        return self.speakers[self._speaker_ids[index]]
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("transcript index out of range")
+        return Segment(self.speaker_of(index), self._time(self._starts[index]), self._time(self._ends[index]),
+                       self.text_of(index))
+
+    def __iter__(self):
+        buffer = self._buffer()
+        speakers, begin = self.speakers, 0
+        for speaker_id, start, end, offset in zip(self._speaker_ids, self._starts, self._ends, self._offsets):
+            yield Segment(speakers[speaker_id], self._time(start), self._time(end), buffer[begin:offset])
+            begin = offset
+
+    @staticmethod
+    def _time(value):
+        return None if math.isnan(value) else value
+
+    @property
+    def has_timestamps(self):
+        return any(not math.isnan(start) for start in self._starts)
+
+    @property
+    def duration(self):
+        ends = [end for end in self._ends if not math.isnan(end)]
+        return max(ends) if ends else 0.0
+
+    # --- Serialization ---
+
+    def lines(self, start=0, end=None):
+        """
+        Yields the "Speaker: text" line of every turn in [start, end).
+        """
+        buffer = self._buffer()
+        stop = len(self) if end is None else min(end, len(self))
+        begin = self._offsets[start - 1] if start else 0
+        for index in range(start, stop):
+            offset = self._offsets[index]
+            speaker = self.speakers[self._speaker_ids[index]]
+            yield f"{speaker}: {buffer[begin:offset]}" if speaker else buffer[begin:offset]
+            begin = offset
+
+    def to_text(self, start=0, end=None):
+        """
+        Returns the newline-joined "Speaker: text" form used by prompts and the UI.
+        """
+        return "\n".join(self.lines(start, end))
+
+    def __str__(self):
+        return self.to_text()
+
+    def __repr__(self):
+        return f"<Transcript {len(self)} turns, {len(self.speakers)} speakers>"
+
+    def to_dict(self):
+        return {
+            "speakers": [speaker for speaker in self.speakers if speaker],
+            "segments": [{"speaker": segment.speaker, "start": segment.start, "end": segment.end,
+                          "text": segment.text} for segment in self],
+        }
+
+    def to_json(self, **kwargs):
+        return json.dumps(self.to_dict(), ensure_ascii=False, **kwargs)
+
+    def to_srt(self):
+        """
+        Returns the transcript as SubRip subtitles; turns without times are skipped.
+        """
+        parts = []
+        for number, (segment, start, end) in enumerate(self._timed_segments(), 1):
+            text = f"{segment.speaker}: {segment.text}" if segment.speaker else segment.text
+            parts.append(f"{number}\n{_clock(start, ',')} --> {_clock(end, ',')}\n{text}\n")
+        return "\n".join(parts)
+
+    def to_vtt(self):
+        """
+        Returns the transcript as WebVTT with <v> speaker tags; turns without times are skipped.
+        """
+        parts = ["WEBVTT\n"]
+        for segment, start, end in self._timed_segments():
+            text = segment.text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+            if segment.speaker:
+                text = f"<v {segment.speaker}>{text}"
+            parts.append(f"{_clock(start, '.')} --> {_clock(end, '.')}\n{text}\n")
+        return "\n".join(parts)
+
+    def _timed_segments(self):
+        for segment in self:
+            if segment.start is None:
+                continue
+            end = segment.end if segment.end is not None and segment.end >= segment.start else segment.start
+            yield segment, segment.start, end
+
+    # Pickled (e.g. for the PDF worker processes) as the arrays and the joined buffer
+    def __reduce__(self):
+        return _restore, (self.speakers, self._speaker_ids, self._starts, self._ends, self._offsets, self._buffer())
+
+
+def _restore(speakers, speaker_ids, starts, ends, offsets, text):
+    transcript = Transcript()
+    transcript.speakers = speakers
+    transcript._speaker_index = {speaker: index for index, speaker in enumerate(speakers)}
+    transcript._speaker_ids = speaker_ids
+    transcript._starts = starts
+    transcript._ends = ends
+    transcript._offsets = offsets
+    transcript._text = text
+    return transcript
+
+
+def _clock(seconds, separator):
+    milliseconds = int(round(seconds * 1000))
+    hours, milliseconds = divmod(milliseconds, 3600000)
+    minutes, milliseconds = divmod(milliseconds, 60000)
+    seconds, milliseconds = divmod(milliseconds, 1000)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d}{separator}{milliseconds:03d}"
+
+
+def as_text(transcript):
+    """
+    Returns the "Speaker: text" form of a Transcript, or the argument itself if it is already a string.
+    """
+    return transcript.to_text() if isinstance(transcript, Transcript) else transcript
@@ -0,0 +1,253 @@
+# utils/transcript_compaction.py
+# Transcript compaction before summarization
+# This file contains:
+# 1. CompactionRules: which filler words are removed and which short turns count as backchannels,
+#    configurable through environment variables.
+# 2. compact_transcript(): removes fillers and stutters, drops backchannel turns ("yeah", "okay",
+#    "mm-hmm") and merges consecutive turns of the same speaker, so "Speaker N:" is paid once per turn.
+# 3. compact_to_budget(): compacts with the configured rules, then with aggressive ones if the
+#    result still does not fit a token budget.
+#
+# Compaction only shapes the LLM input; the transcript shown in the UI and PDF is untouched.
+
+import os
+import re
+from utils.transcript import Transcript
+
+# Filler words and phrases removed inside turns (comma-separated, lowercase; matched as written,
+# or capitalized at the start of a sentence, so "ER doctor" or "UM campus" are left alone)
+COMPACTION_FILLERS = os.getenv("COMPACTION_FILLERS", "um,umm,uh,uhh,uhm,er,erm,ah,hmm,mm,mhm")
+# Extra fillers removed only when the configured rules do not fit the budget
+COMPACTION_AGGRESSIVE_FILLERS = os.getenv("COMPACTION_AGGRESSIVE_FILLERS",
+                                          "you know,i mean,sort of,kind of,basically,actually")
+# Short turns made only of these words/phrases are dropped as backchannels
+COMPACTION_BACKCHANNELS = os.getenv(
+    "COMPACTION_BACKCHANNELS",
+    "yeah,yes,yep,ok,okay,right,sure,mm-hmm,uh-huh,got it,i see,exactly,cool,great,alright,all right,true,oh,wow"
+)
+# Longest turn (in words) that can be a backchannel
+COMPACTION_BACKCHANNEL_MAX_WORDS = int(os.getenv("COMPACTION_BACKCHANNEL_MAX_WORDS", 4))
+# Keep a backchannel that answers a question from the previous speaker ("Ship Friday?" - "Yes.")
+COMPACTION_KEEP_ANSWERS = os.getenv("COMPACTION_KEEP_ANSWERS", "true").lower() in ("1", "true", "yes")
+
+# Immediately repeated words that are usually grammatical, not stutters ("that that", "had had").
+# A word said twice is collapsed only when both are written alike ("we we", not "We we");
+# three or more in a row are always a stutter.
+_KEEP_REPEATS = {"that", "had"}
+_STUTTER = re.compile(r"\b(\w+)(?:,?\s+(?i:\1)\b)+")
+_WORD = re.compile(r"[\w'-]+")
+_SPACES = re.compile(r"\s{2,}")
+_SENTENCE_START = re.compile(r"([.?!]\s+)([a-z])")
+_STRAY_PUNCTUATION = re.compile(r"(^|[\s,])[,;]+(?=\s|$)|\s+(?=[,.?!;])")
+
+
+def estimate_tokens(text):
+    """
+    Cheap token estimate (~4 characters per token for English with Llama tokenizers).
+    Good enough to decide when a transcript needs compacting or splitting.
+    """
+    return len(text) // 4 + 1
+
+
+def _split_list(value):
+    return tuple(item.strip().lower() for item in value.split(",") if item.strip())
+
+
+def _phrase_pattern(phrase):
+    # Case-sensitive, except that the pronoun is always "I" ("i mean" matches "I mean")
+    return r"\s+".join("I" if word == "i" else re.escape(word) for word in phrase.split())
+
+
+def _collapse(match):
+    words = _WORD.findall(match.group(0))
+    if len(words) == 2 and (words[0] != words[1] or words[0].lower() in _KEEP_REPEATS):
+        return match.group(0)
+    return match.group(1)
+
+
+class CompactionRules:
+    """
+    Configurable compaction rules. The defaults come from the COMPACTION_* variables.
+
+    Args:
+        fillers (str or tuple): Words and phrases removed inside turns.
+        backchannels (str or tuple): Words and phrases that make up backchannel turns.
+        backchannel_max_words (int): Longest turn that can be a backchannel.
+        keep_answers (bool): Keep backchannels that follow a question from another speaker.
+        collapse_repeats (bool): Collapse stutters ("we we we need" -> "we need").
+    """
+
+    def __init__(self, fillers=COMPACTION_FILLERS, backchannels=COMPACTION_BACKCHANNELS,
+                 backchannel_max_words=COMPACTION_BACKCHANNEL_MAX_WORDS, keep_answers=COMPACTION_KEEP_ANSWERS,
+                 collapse_repeats=True):
+        self.fillers = _split_list(fillers) if isinstance(fillers, str) else tuple(fillers)
+        self.backchannels = _split_list(backchannels) if isinstance(backchannels, str) else tuple(backchannels)
+        self.backchannel_max_words = backchannel_max_words
+        self.keep_answers = keep_answers
+        self.collapse_repeats = collapse_repeats
+
+        # Longest phrases first so "you know" wins over a single-word filler inside it
+        phrases = sorted(self.fillers, key=len, reverse=True)
+        self._filler = None
+        if phrases:
+            lower = "|".join(_phrase_pattern(phrase) for phrase in phrases)
+            upper = "|".join(_phrase_pattern(phrase[0].upper() + phrase[1:]) for phrase in phrases)
+            # Not after a number ("5 mm", "2 ah"); a following comma goes with the filler, a period stays
+            self._filler = re.compile(rf"(?:,\s*)?(?<![\w'-])(?<!\d\s)(?:{lower}|(?:^|(?<=[.?!]\s))(?:{upper}))"
+                                      rf"(?![\w'-]),?")
+        self._backchannel_words = {phrase for phrase in self.backchannels if " " not in phrase}
+        self._backchannel_phrases = sorted((phrase for phrase in self.backchannels if " " in phrase),
+                                           key=len, reverse=True)
+
+    def aggressive(self):
+        """
+        Returns stricter rules: extra fillers and no exceptions for answers.
+        """
+        return CompactionRules(self.fillers + _split_list(COMPACTION_AGGRESSIVE_FILLERS), self.backchannels,
+                               self.backchannel_max_words, keep_answers=False, collapse_repeats=self.collapse_repeats)
+
+    def signature(self):
+        """
+        Everything that changes the compacted text (part of the summary cache key).
+        """
+        return {"fillers": list(self.fillers), "backchannels": list(self.backchannels),
+                "backchannel_max_words": self.backchannel_max_words, "keep_answers": self.keep_answers,
+                "collapse_repeats": self.collapse_repeats}
+
+    def clean(self, text):
+        """
+        Returns (text without fillers and stutters, number of fillers removed).
+        """
+        removed = 0
+        if self._filler is not None:
+            text, removed = self._filler.subn("", text)
+        if self.collapse_repeats:
+            text = _STUTTER.sub(_collapse, text)
+        if removed:
+            text = _STRAY_PUNCTUATION.sub(r"\1", text)
+            text = _SPACES.sub(" ", text).strip(" ,;").lstrip(".?! ")
+            text = _SENTENCE_START.sub(lambda m: m.group(1) + m.group(2).upper(), text)
+            if text and text[0].islower():
+                text = text[0].upper() + text[1:]
+        return text.strip(), removed
+
+    def is_backchannel(self, text):
+        words = [word.lower() for word in _WORD.findall(text)]
+        if not words:
+            return True
+        if len(words) > self.backchannel_max_words:
+            return False
+        phrase = " ".join(words)
+        if phrase in self._backchannel_phrases:
+            return True
+        # Every word must be a backchannel on its own, or start a backchannel phrase ("all right")
+        rest = phrase
+        while rest:
+            for candidate in self._backchannel_phrases:
+                if rest == candidate or rest.startswith(candidate + " "):
+                    rest = rest[len(candidate):].strip()
+                    break
+            else:
+                word, _, rest = rest.partition(" ")
+                if word not in self._backchannel_words:
+                    return False
+        return True
+
+
+class CompactionResult:
+    """
+    A compacted transcript with before/after statistics.
+    """
+
+    def __init__(self, transcript, text, tokens_before, turns_before, level):
+        self.transcript = transcript
+        self.text = text
+        self.tokens_before = tokens_before
+        self.tokens_after = estimate_tokens(text)
+        self.turns_before = turns_before
+        self.turns_after = len(transcript)
+        self.level = level
+        self.fillers_removed = 0
+        self.backchannels_dropped = 0
+        self.turns_merged = 0
+
+    @property
+    def reduction(self):
+        return 1 - self.tokens_after / self.tokens_before if self.tokens_before else 0.0
+
+    def to_dict(self):
+        return {
+            "level": self.level,
+            "tokens_before": self.tokens_before,
+            "tokens_after": self.tokens_after,
+            "reduction": round(self.reduction, 3),
+            "turns_before": self.turns_before,
+            "turns_after": self.turns_after,
+            "fillers_removed": self.fillers_removed,
+            "backchannels_dropped": self.backchannels_dropped,
+            "turns_merged": self.turns_merged,
+        }
+
+
+def compact_transcript(transcript, rules=None, level="standard"):
+    """
+    Compacts a Transcript (or its "Speaker: text" form) for the summarization prompt.
+
+    Fillers and stutters are removed, backchannel turns dropped, and consecutive turns of
+    the same speaker merged (times span the merged turns).
+
+    Returns:
+        CompactionResult
+    """
+    rules = rules or CompactionRules()
+    if not isinstance(transcript, Transcript):
+        transcript = Transcript.from_text(transcript or "")
+    tokens_before = estimate_tokens(transcript.to_text())
+
+    turns = []  # [speaker, start, end, [texts]]
+    fillers = dropped = merged = 0
+    previous_text = ""
+    for segment in transcript:
+        text, removed = rules.clean(segment.text)
+        fillers += removed
+        answers_question = (rules.keep_answers and turns and turns[-1][0] != segment.speaker
+                            and previous_text.rstrip().endswith("?"))
+        if not text or (rules.is_backchannel(text) and not answers_question):
+            dropped += 1
+            continue
+        if turns and turns[-1][0] == segment.speaker:
+            turns[-1][2] = segment.end if segment.end is not None else turns[-1][2]
+            turns[-1][3].append(text)
+            merged += 1
+        else:
+            turns.append([segment.speaker, segment.start, segment.end, [text]])
+        previous_text = text
+
+    compacted = Transcript()
+    for speaker, start, end, texts in turns:
+        compacted.append(speaker, " ".join(texts), start, end)
+    result = CompactionResult(compacted, compacted.to_text(), tokens_before, len(transcript), level)
+    result.fillers_removed, result.backchannels_dropped, result.turns_merged = fillers, dropped, merged
+    return result
+
+
+def compact_to_budget(transcript, budget, overhead=0, rules=None):
+    """
+    Compacts with `rules`, then with rules.aggressive() if the text plus `overhead`
+    tokens (the prompt template) still exceeds `budget`.
+
+    Returns:
+        CompactionResult: The first result that fits, or the aggressive one if none does
+        (the caller then has to split the transcript).
+    """
+    rules = rules or CompactionRules()
+    result = compact_transcript(transcript, rules)
+    if result.tokens_after + overhead <= budget:
+        return result
+    aggressive = compact_transcript(result.transcript, rules.aggressive(), level="aggressive")
+    # Report the savings against the original transcript
+    aggressive.tokens_before, aggressive.turns_before = result.tokens_before, result.turns_before
+    aggressive.fillers_removed += result.fillers_removed
+    aggressive.backchannels_dropped += result.backchannels_dropped
+    aggressive.turns_merged += result.turns_merged
+    return aggressive